@@ -0,0 +1,135 @@
+import gzip
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available.
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+# Bodies above this size are compressed off the event loop.
+THREAD_OFFLOAD_BYTES = 256 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = None
+    best_quality = 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        start_message: Message | None = None
+        passthrough = False
+
+        async def _send(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            # Streamed bodies (SSE, NDJSON) are never buffered; only single-chunk responses are compressed.
+            if message.get("more_body", False):
+                await send(start_message)
+                await send(message)
+                return
+            not_modified = start_message["status"] == 304
+            if not_modified or self._compressible_type(headers):
+                # The representation depends on Accept-Encoding even when this client gets it uncompressed.
+                headers.add_vary_header("Accept-Encoding")
+            if encoding is None or not self._should_compress(headers, body):
+                if encoding is not None and not_modified and self._holds_weak_etag(request_headers, headers):
+                    # A 304 has no body to size up; the client's weak validator shows its 200 was encoded.
+                    self._weaken_etag(headers)
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_OFFLOAD_BYTES:
+                compressed = await anyio.to_thread.run_sync(self._compress, body, encoding)
+            else:
+                compressed = self._compress(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            # The encoded bytes differ from the identity body, so the route's strong ETag no longer holds.
+            self._weaken_etag(headers)
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, _send)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        if len(body) < self.minimum_size or "content-encoding" in headers or "content-range" in headers:
+            return False
+        return self._compressible_type(headers)
+
+    def _compressible_type(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return content_type in COMPRESSIBLE_CONTENT_TYPES
+
+    def _holds_weak_etag(self, request_headers: Headers, headers: MutableHeaders) -> bool:
+        etag = headers.get("etag")
+        if not etag or etag.startswith("W/"):
+            return False
+        candidates = {item.strip() for item in request_headers.get("if-none-match", "").split(",")}
+        return f"W/{etag}" in candidates
+
+    def _weaken_etag(self, headers: MutableHeaders) -> None:
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from pathlib import Path
 
+from backend.api.conditional import cache_headers, etag_matches, make_etag, not_modified
+from backend.api.responses import OrjsonResponse
 from backend.api.schemas import (
+    ExplainBatchRequest,
     ExplainFunctionRequest,
     ExplainSnippetRequest,
-    GraphEdge,
-    GraphNode,
     GraphResponse,
     IndexRepoRequest,
     SeedExternalKnowledgeRequest,
@@ -14,6 +19,7 @@ from backend.api.schemas import (
     SessionSwitchRequest,
 )
 from backend.services.service_factory import get_services
+from backend.utils.metrics import REGISTRY
 
 router = APIRouter()
 
@@ -21,28 +27,33 @@ router = APIRouter()
 @router.post("/index_repo")
 def index_repo(payload: IndexRepoRequest) -> dict:
     services = get_services()
-    try:
-        session = services["session_manager"].get_session(payload.session_id)
-        if session is None:
-            raise HTTPException(status_code=404, detail="Session not found.")
-
-        result = services["indexing_service"].index_repository(
-            session_id=payload.session_id,
-            repo_url=payload.repo_url,
-            branch=payload.branch,
-            reindex=payload.reindex,
-        )
-        if result.get("status") == "indexed" or payload.reindex:
-            services["structure_service"].extract_repo_structure(
-                Path(session.repo_path),
-                payload.session_id,
-                force_refresh=True,
-            )
-        return result
-    except HTTPException:
-        raise
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    session = services["session_manager"].get_session(payload.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return services["index_job_service"].submit(
+        payload.session_id,
+        repo_url=payload.repo_url,
+        branch=payload.branch,
+        reindex=payload.reindex,
+    )
+
+
+@router.get("/jobs/{job_id}")
+def get_index_job(job_id: str) -> dict:
+    services = get_services()
+    job = services["index_job_service"].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_index_job(job_id: str) -> dict:
+    services = get_services()
+    job = services["index_job_service"].cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
 
 @router.post("/seed_external_kb")
@@ -55,32 +66,159 @@ def seed_external_kb(payload: SeedExternalKnowledgeRequest) -> dict:
 
 
 @router.post("/explain_function")
-def explain_function(payload: ExplainFunctionRequest) -> dict:
+async def explain_function(payload: ExplainFunctionRequest) -> dict:
+    services = get_services()
+    session, context = await run_in_threadpool(_retrieve_for_explanation, services, payload)
+    return await services["llm_engine"].aexplain(
+        payload.function_name,
+        context,
+        repo_path=session.repo_path,
+        bypass_cache=payload.bypass_cache,
+    )
+
+
+@router.post("/explain_function/stream")
+def stream_explain_function(payload: ExplainFunctionRequest) -> StreamingResponse:
+    services = get_services()
+    session, context = _retrieve_for_explanation(services, payload)
+    events = services["llm_engine"].stream_explain(
+        payload.function_name,
+        context,
+        repo_path=session.repo_path,
+        bypass_cache=payload.bypass_cache,
+    )
+    return _sse_response(events)
+
+
+@router.post("/explain_snippet")
+async def explain_snippet(payload: ExplainSnippetRequest) -> dict:
+    services = get_services()
+    session = await run_in_threadpool(services["session_manager"].get_session, payload.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return await services["llm_engine"].aexplain_snippet(
+        payload.code,
+        payload.language,
+        bypass_cache=payload.bypass_cache,
+    )
+
+
+@router.post("/explain_snippet/stream")
+def stream_explain_snippet(payload: ExplainSnippetRequest) -> StreamingResponse:
     services = get_services()
     session = services["session_manager"].get_session(payload.session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
-    function_name = payload.function_name
-    context = services["retriever"].retrieve(
-        payload.session_id,
-        function_name,
-        {
-            "source_type": payload.source_type,
-            "domain": payload.domain,
-            "difficulty_level": payload.difficulty_level,
-            "library": payload.library,
-        },
+    events = services["llm_engine"].stream_explain_snippet(
+        payload.code,
+        payload.language,
+        bypass_cache=payload.bypass_cache,
     )
-    return services["llm_engine"].explain(function_name, context)
+    return _sse_response(events)
 
 
-@router.post("/explain_snippet")
-def explain_snippet(payload: ExplainSnippetRequest) -> dict:
+@router.post("/explain_batch")
+async def explain_batch(payload: ExplainBatchRequest) -> StreamingResponse:
+    services = get_services()
+    session = await run_in_threadpool(services["session_manager"].get_session, payload.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    try:
+        job = await run_in_threadpool(
+            services["explain_batch_service"].prepare_job,
+            payload.session_id,
+            payload.function_names,
+            _retrieval_filters(payload),
+            payload.job_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    events = services["explain_batch_service"].run(job, session.repo_path, bypass_cache=payload.bypass_cache)
+
+    async def _lines():
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Id": job["job_id"], "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/explain_batch/{job_id}")
+def get_explain_batch(job_id: str) -> dict:
     services = get_services()
+    job = services["explain_batch_service"].job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+def _retrieve_for_explanation(services: dict, payload: ExplainFunctionRequest) -> tuple:
     session = services["session_manager"].get_session(payload.session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
-    return services["llm_engine"].explain_snippet(payload.code, payload.language)
+    context = services["retriever"].retrieve(
+        payload.session_id,
+        payload.function_name,
+        _retrieval_filters(payload),
+    )
+    return session, context
+
+
+def _retrieval_filters(payload: ExplainFunctionRequest | ExplainBatchRequest) -> dict:
+    return {
+        "source_type": payload.source_type,
+        "domain": payload.domain,
+        "difficulty_level": payload.difficulty_level,
+        "library": payload.library,
+    }
+
+
+def _sse_response(events) -> StreamingResponse:
+    def _frames():
+        for event in events:
+            name = event.pop("event")
+            yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        _frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/explain/cache/stats")
+def get_explanation_cache_stats() -> dict:
+    services = get_services()
+    return services["explanation_cache"].stats()
+
+
+@router.get("/explain/upstream/stats")
+def get_explanation_upstream_stats() -> dict:
+    services = get_services()
+    return services["llm_engine"].get_upstream_stats()
+
+
+@router.get("/explain/warm/status")
+def get_explanation_warm_status(session_id: str) -> dict:
+    services = get_services()
+    return services["explanation_warmer"].status(session_id)
+
+
+@router.get("/resilience/breakers")
+def get_circuit_breakers() -> dict:
+    services = get_services()
+    return services["breakers"].stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    # Building the services registers the collector that folds cache, pool and breaker stats in.
+    get_services()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @router.get("/graph/stats")
@@ -95,6 +233,7 @@ def get_graph_stats(session_id: str, function_name: str | None = None) -> dict:
         "session_id": session_id,
         "repo_path": session.repo_path,
         "totals": totals,
+        "pool": services["graph_store"].get_pool_stats(session_id),
     }
 
     if function_name and function_name.strip():
@@ -106,25 +245,95 @@ def get_graph_stats(session_id: str, function_name: str | None = None) -> dict:
     return response
 
 
-@router.get("/graph/{function_name}", response_model=GraphResponse)
-def get_graph(function_name: str, session_id: str) -> GraphResponse:
+@router.get("/graph/reachability")
+def get_graph_reachability(session_id: str, function_name: str) -> dict:
     services = get_services()
     session = services["session_manager"].get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
 
-    nodes, edges = services["graph_store"].get_function_graph(session_id, function_name)
+    return {
+        "session_id": session_id,
+        **services["graph_store"].get_reachability(session_id, function_name),
+    }
+
+
+@router.get("/retrieval/cache/stats")
+def get_retrieval_cache_stats() -> dict:
+    services = get_services()
+    return services["retrieval_cache"].stats()
+
+
+@router.get("/graph/{function_name}/stream")
+def stream_graph(function_name: str, session_id: str) -> StreamingResponse:
+    services = get_services()
+    session = services["session_manager"].get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+
+    def _events():
+        counts = {"node": 0, "edge": 0}
+        for kind, depth, item in services["graph_store"].iter_function_graph(session_id, function_name):
+            counts[kind] += 1
+            payload = _graph_node_payload(item) if kind == "node" else _graph_edge_payload(item)
+            yield json.dumps({"event": kind, "depth": depth, kind: payload}) + "\n"
+        yield json.dumps({"event": "end", "nodes": counts["node"], "edges": counts["edge"]}) + "\n"
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
+@router.get("/graph/{function_name}", response_model=GraphResponse, response_class=OrjsonResponse)
+def get_graph(
+    function_name: str,
+    session_id: str,
+    cursor: str | None = None,
+    page_size: int | None = Query(default=None, ge=1),
+    if_none_match: str | None = Header(default=None),
+) -> OrjsonResponse:
+    services = get_services()
+    session = services["session_manager"].get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
+
+    etag = make_etag(
+        "graph",
+        session_id,
+        services["graph_store"].get_index_version(session_id),
+        function_name,
+        cursor,
+        page_size,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    try:
+        page = services["graph_store"].get_function_graph_page(
+            session_id,
+            function_name,
+            cursor=cursor,
+            page_size=page_size,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # The payload helpers already produce GraphResponse's shape; skipping per-item model validation
+    # matters on large graph pages.
+    return OrjsonResponse(
+        {
+            "nodes": [_graph_node_payload(item) for item in page["nodes"]],
+            "edges": [_graph_edge_payload(item) for item in page["edges"]],
+            "page": page["page"],
+        },
+        headers=cache_headers(etag),
+    )
+
 
-    graph_nodes = [
-        GraphNode(id=item["id"], type=item["type"], file=item["file_path"])
-        for item in nodes
-    ]
-    graph_edges = [
-        GraphEdge(source=item["source"], target=item["target"], type=item["type"])
-        for item in edges
-    ]
+def _graph_node_payload(item: dict) -> dict:
+    return {"id": item["id"], "type": item["type"], "file": item["file_path"]}
 
-    return GraphResponse(nodes=graph_nodes, edges=graph_edges)
+
+def _graph_edge_payload(item: dict) -> dict:
+    return {"source": item["source"], "target": item["target"], "type": item["type"]}
 
 
 @router.post("/session/create")
@@ -186,9 +395,13 @@ def reset_session(payload: SessionActionRequest) -> dict:
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
 
-    services["graph_store"].reset_session(payload.session_id)
-    services["vector_store"].reset_session(payload.session_id)
-    refreshed = services["session_manager"].reset_session(payload.session_id)
+    with services["index_job_service"].exclusive_session(payload.session_id):
+        services["explanation_warmer"].cancel(payload.session_id)
+        services["graph_store"].reset_session(payload.session_id)
+        services["vector_store"].reset_session(payload.session_id)
+        services["lexical_store"].reset_session(payload.session_id)
+        services["retrieval_cache"].invalidate(payload.session_id)
+        refreshed = services["session_manager"].reset_session(payload.session_id)
     return {"status": "reset", "session": refreshed.to_dict() if refreshed else None}
 
 
@@ -199,24 +412,108 @@ def get_active_session() -> dict:
     return {"session": active.to_dict() if active else None}
 
 
-@router.get("/session/structure")
-def get_session_structure(session_id: str) -> dict:
+@router.get("/session/structure", response_class=OrjsonResponse)
+def get_session_structure(
+    session_id: str,
+    if_none_match: str | None = Header(default=None),
+) -> OrjsonResponse:
     services = get_services()
     session = services["session_manager"].get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
 
+    updated_at = services["session_manager"].get_structure_updated_at(session_id)
+    if updated_at is not None:
+        etag = make_etag("structure", session_id, updated_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     structure = services["structure_service"].extract_repo_structure(
         Path(session.repo_path),
         session_id,
         force_refresh=False,
     )
-    return {"session_id": session_id, "repo_path": session.repo_path, "structure": structure}
+    if updated_at is None:
+        updated_at = services["session_manager"].get_structure_updated_at(session_id)
+    return OrjsonResponse(
+        {"session_id": session_id, "repo_path": session.repo_path, "structure": structure},
+        headers=cache_headers(make_etag("structure", session_id, updated_at)),
+    )
 
 
-@router.get("/session/file")
-def get_session_file_content(session_id: str, file_path: str) -> dict:
+@router.get("/session/file", response_class=OrjsonResponse)
+def get_session_file_content(
+    session_id: str,
+    file_path: str,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    byte_start: int | None = None,
+    byte_end: int | None = None,
+    if_none_match: str | None = Header(default=None),
+) -> OrjsonResponse:
     services = get_services()
+    repo_root, candidate = _resolve_session_file(services, session_id, file_path)
+    if (start_line is not None or end_line is not None) and (byte_start is not None or byte_end is not None):
+        raise HTTPException(status_code=400, detail="Use either a line range or a byte range, not both.")
+
+    stat = candidate.stat()
+    etag = make_etag(
+        "file",
+        session_id,
+        candidate,
+        stat.st_mtime_ns,
+        stat.st_size,
+        start_line,
+        end_line,
+        byte_start,
+        byte_end,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    payload = {
+        "session_id": session_id,
+        "repo_path": str(repo_root),
+        "file_path": str(candidate.relative_to(repo_root)),
+    }
+    try:
+        if start_line is not None or end_line is not None:
+            payload.update(services["file_content_service"].read_lines(candidate, start_line or 1, end_line))
+        elif byte_start is not None or byte_end is not None:
+            payload.update(services["file_content_service"].read_bytes(candidate, byte_start or 0, byte_end))
+        else:
+            payload["content"] = candidate.read_text(encoding="utf-8", errors="ignore")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=f"Failed to read file: {exc}") from exc
+
+    return OrjsonResponse(payload, headers=cache_headers(etag))
+
+
+@router.get("/session/file/raw")
+def get_session_file_raw(
+    session_id: str,
+    file_path: str,
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    services = get_services()
+    _, candidate = _resolve_session_file(services, session_id, file_path)
+    stat = candidate.stat()
+    # The raw bytes are a different representation from the JSON slices of /session/file.
+    etag = make_etag("file_raw", session_id, candidate, stat.st_mtime_ns, stat.st_size)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    # FileResponse streams in chunks and honours Range / If-Range headers.
+    return FileResponse(
+        candidate,
+        media_type="text/plain; charset=utf-8",
+        headers=cache_headers(etag),
+        stat_result=stat,
+    )
+
+
+def _resolve_session_file(services: dict, session_id: str, file_path: str) -> tuple[Path, Path]:
     session = services["session_manager"].get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
@@ -230,15 +527,4 @@ def get_session_file_content(session_id: str, file_path: str) -> dict:
 
     if not candidate.exists() or not candidate.is_file():
         raise HTTPException(status_code=404, detail="File not found.")
-
-    try:
-        content = candidate.read_text(encoding="utf-8", errors="ignore")
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=500, detail=f"Failed to read file: {exc}") from exc
-
-    return {
-        "session_id": session_id,
-        "repo_path": str(repo_root),
-        "file_path": str(candidate.relative_to(repo_root)),
-        "content": content,
-    }
+    return repo_root, candidate
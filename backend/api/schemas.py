@@ -12,6 +12,7 @@ class ExplainSnippetRequest(BaseModel):
     session_id: str
     code: str
     language: str = "python"
+    bypass_cache: bool = False
 
 
 class ExplainFunctionRequest(BaseModel):
@@ -21,6 +22,18 @@ class ExplainFunctionRequest(BaseModel):
     domain: str | None = None
     difficulty_level: str | None = None
     library: str | None = None
+    bypass_cache: bool = False
+
+
+class ExplainBatchRequest(BaseModel):
+    session_id: str
+    function_names: list[str] = Field(default_factory=list)
+    job_id: str | None = None
+    source_type: str | None = None
+    domain: str | None = None
+    difficulty_level: str | None = None
+    library: str | None = None
+    bypass_cache: bool = False
 
 
 class ExplanationResponse(BaseModel):
@@ -44,9 +57,17 @@ class GraphEdge(BaseModel):
     type: str
 
 
+class GraphPage(BaseModel):
+    page_size: int
+    depth: int
+    has_more: bool
+    next_cursor: str | None = None
+
+
 class GraphResponse(BaseModel):
     nodes: list[GraphNode]
     edges: list[GraphEdge]
+    page: GraphPage | None = None
 
 
 class SessionCreateRequest(BaseModel):
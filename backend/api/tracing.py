@@ -0,0 +1,117 @@
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import anyio
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.utils.sampling_profiler import SamplingProfiler
+from backend.utils.tracing import Span, start_trace
+
+TRACE_HEADER = "x-trace"
+TRACE_QUERY_PARAM = "trace"
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+def trace_requested(scope: Scope) -> bool:
+    if Headers(scope=scope).get(TRACE_HEADER, "").strip().lower() in TRUTHY:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.strip().lower() in TRUTHY for value in query.get(TRACE_QUERY_PARAM, []))
+
+
+def server_timing(root: Span) -> str:
+    entries = [f"total;dur={root.duration_ms}"]
+    entries.extend(
+        f'{index};desc="{child.name}";dur={child.duration_ms}' for index, child in enumerate(root.children)
+    )
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        profile_slow_ms: float = 0.0,
+        profile_interval_ms: float = 5.0,
+        profile_dir: str = "./data/profiles",
+    ) -> None:
+        self.app = app
+        self.profile_slow_ms = profile_slow_ms
+        self.profile_interval_ms = profile_interval_ms
+        self.profile_dir = Path(profile_dir)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not trace_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        if self.profile_slow_ms > 0:
+            profiler = SamplingProfiler(self.profile_interval_ms / 1000)
+            profiler.start()
+
+        start_message: Message | None = None
+        passthrough = False
+        profiled = False
+        with start_trace(f"{scope['method']} {scope['path']}") as root:
+
+            async def _send(message: Message) -> None:
+                nonlocal start_message, passthrough, profiled
+                if passthrough:
+                    await send(message)
+                    return
+                if message["type"] == "http.response.start":
+                    start_message = message
+                    return
+                if message["type"] != "http.response.body" or start_message is None:
+                    await send(message)
+                    return
+
+                passthrough = True
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+                body = message.get("body", b"")
+                # Streamed responses (SSE, NDJSON, raw files) have already started; only whole JSON
+                # bodies can carry the span tree.
+                if message.get("more_body", False) or content_type != "application/json" or not body:
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                root.finish()
+                trace = root.to_dict()
+                trace["trace_id"] = root.trace_id
+                trace["profile"] = await self._finish_profile(profiler, root)
+                profiled = True
+                try:
+                    payload = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    payload = None
+                if isinstance(payload, dict):
+                    payload["trace"] = trace
+                    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+                    headers["content-length"] = str(len(body))
+                headers["server-timing"] = server_timing(root)
+                headers["x-trace-id"] = root.trace_id
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                if not profiled:
+                    root.finish()
+                    await self._finish_profile(profiler, root)
+
+    async def _finish_profile(self, profiler: SamplingProfiler | None, root: Span) -> dict | None:
+        if profiler is None:
+            return None
+        profiler.stop()
+        if root.duration_ms < self.profile_slow_ms:
+            return None
+        path = self.profile_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{root.trace_id}.folded"
+        await anyio.to_thread.run_sync(profiler.write_folded, path)
+        return {"path": str(path), "samples": profiler.samples}
@@ -0,0 +1,87 @@
+import argparse
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from backend.config.settings import load_config
+from backend.graph.sqlite_graph import SqliteGraphStore
+from backend.parser.tree_sitter_parser import ParsedEdge, ParsedSymbol, ParsedVariable
+
+
+def build_synthetic_graph(
+    files: int,
+    functions_per_file: int,
+    calls_per_function: int,
+) -> tuple[list[ParsedSymbol], list[ParsedEdge], list[ParsedVariable]]:
+    nodes: list[ParsedSymbol] = []
+    edges: list[ParsedEdge] = []
+    variables: list[ParsedVariable] = []
+    for file_index in range(files):
+        file_path = f"/srv/repos/benchmark/package_{file_index // 50}/module_{file_index}.py"
+        for function_index in range(functions_per_file):
+            line = function_index * 20 + 1
+            name = f"function_{file_index}_{function_index}"
+            symbol_id = f"{file_path}:{name}:{line}"
+            nodes.append(
+                ParsedSymbol(
+                    id=symbol_id,
+                    type="function",
+                    name=name,
+                    file_path=file_path,
+                    line_start=line,
+                    line_end=line + 18,
+                )
+            )
+            for call_index in range(calls_per_function):
+                target = f"function_{(file_index + call_index + 1) % files}_{function_index}"
+                call_line = line + call_index + 1
+                edges.append(
+                    ParsedEdge(
+                        id=f"{symbol_id}->call:{target}:{call_line}",
+                        source=symbol_id,
+                        target=target,
+                        type="calls",
+                        metadata={"line": call_line},
+                    )
+                )
+                variables.append(
+                    ParsedVariable(
+                        id=f"{file_path}:value_{call_index}:{call_line}",
+                        name=f"value_{call_index}",
+                        scope=symbol_id,
+                        file_path=file_path,
+                        metadata={"line": call_line},
+                    )
+                )
+    return nodes, edges, variables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure SqliteGraphStore.upsert_graph throughput.")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions-per-file", type=int, default=10)
+    parser.add_argument("--calls-per-function", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    nodes, edges, variables = build_synthetic_graph(
+        args.files,
+        args.functions_per_file,
+        args.calls_per_function,
+    )
+    total_rows = len(nodes) + len(edges) + len(variables)
+    store = SqliteGraphStore(load_config())
+
+    for run in range(args.runs):
+        session_id = f"benchmark-{uuid.uuid4()}"
+        started = time.perf_counter()
+        store.upsert_graph(session_id, nodes, edges, variables)
+        elapsed = time.perf_counter() - started
+        print(f"run {run + 1}: {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s)")
+        store.reset_session(session_id)
+        shutil.rmtree(Path("./data/graph_storage") / session_id, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import gzip
+import json
+import time
+
+import orjson
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_synthetic_structure(files: int, files_per_dir: int, functions_per_file: int) -> dict:
+    root = {"type": "repo", "name": "benchmark", "path": "/srv/repos/benchmark", "children": []}
+    directories: dict[int, dict] = {}
+    for file_index in range(files):
+        dir_index = file_index // files_per_dir
+        directory = directories.get(dir_index)
+        if directory is None:
+            directory = {
+                "type": "directory",
+                "name": f"package_{dir_index}",
+                "path": f"package_{dir_index}",
+                "children": [],
+            }
+            directories[dir_index] = directory
+            root["children"].append(directory)
+        functions = [
+            {"type": "function", "name": f"function_{file_index}_{index}", "line": index * 20 + 1}
+            for index in range(functions_per_file)
+        ]
+        directory["children"].append(
+            {
+                "type": "file",
+                "name": f"module_{file_index}.py",
+                "path": f"package_{dir_index}/module_{file_index}.py",
+                "children": [
+                    {
+                        "type": "module",
+                        "name": f"module_{file_index}",
+                        "path": f"package_{dir_index}/module_{file_index}.py",
+                        "children": [
+                            {"type": "class", "name": f"Model{file_index}", "line": 1, "children": functions[:2]},
+                            *functions[2:],
+                        ],
+                    }
+                ],
+            }
+        )
+    return root
+
+
+def _timed(label: str, fn, runs: int) -> bytes:
+    best = float("inf")
+    output = b""
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {best * 1000:9.1f} ms  {len(output) / 1_048_576:8.2f} MiB")
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure /session/structure serialization and compression cost.")
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--functions-per-file", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = {
+        "session_id": "benchmark",
+        "repo_path": "/srv/repos/benchmark",
+        "structure": build_synthetic_structure(args.files, args.files_per_dir, args.functions_per_file),
+    }
+
+    # Matches Starlette's JSONResponse.render, the previous serializer for these routes.
+    _timed(
+        "json.dumps",
+        lambda: json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+            "utf-8"
+        ),
+        args.runs,
+    )
+    body = _timed("orjson.dumps", lambda: orjson.dumps(payload), args.runs)
+    _timed(f"gzip (level {args.gzip_level})", lambda: gzip.compress(body, args.gzip_level, mtime=0), args.runs)
+    if brotli is not None:
+        _timed(f"brotli (quality {args.brotli_quality})", lambda: brotli.compress(body, quality=args.brotli_quality), args.runs)
+    else:
+        print("brotli not installed; skipping")
+
+
+if __name__ == "__main__":
+    main()
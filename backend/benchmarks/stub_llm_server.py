@@ -0,0 +1,128 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_EXPLANATION = {
+    "summary": "Stub explanation.",
+    "execution_flow": "Called, then returns.",
+    "dependencies": "None.",
+    "variables": "None.",
+    "improvements": "None.",
+    "confidence_score": 0.5,
+}
+
+
+class StubState:
+    def __init__(self, delay_seconds: float) -> None:
+        self.delay_seconds = delay_seconds
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+def make_handler(state: StubState) -> type[BaseHTTPRequestHandler]:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") != "/stats":
+                self._send_json(404, {"error": "not found"})
+                return
+            with state.lock:
+                payload = {
+                    "requests": state.requests,
+                    "in_flight": state.in_flight,
+                    "max_in_flight": state.max_in_flight,
+                }
+            self._send_json(200, payload)
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                time.sleep(state.delay_seconds)
+                content = json.dumps(STUB_EXPLANATION)
+                if body.get("stream"):
+                    self._send_stream(body.get("model", "stub"), content)
+                else:
+                    self._send_json(200, self._completion(body.get("model", "stub"), content))
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _completion(self, model: str, content: str) -> dict:
+            return {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+
+        def _send_stream(self, model: str, content: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for start in range(0, len(content), 16):
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[start : start + 16]}, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            raw = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return StubHandler
+
+
+def serve(host: str, port: int, delay_seconds: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(StubState(delay_seconds)))
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub for exercising the explanation path.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to hold each completion request.")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.delay)
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1 (GET /stats for request counts)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,18 @@ class LlmConfig(BaseModel):
     model: str
     api_key_env_var: str
     max_context_chars: int
+    context_token_budget: int
+    max_concurrency: int
+    cache_enabled: bool
+    cache_path: str
+    cache_ttl_seconds: int
+    cache_max_entries: int
+    batch_max_functions: int
+    batch_jobs_path: str
+    warm_enabled: bool
+    warm_top_n: int
+    warm_token_budget: int
+    warm_time_budget_seconds: float
 
 
 class FaissConfig(BaseModel):
@@ -22,8 +34,19 @@ class FaissConfig(BaseModel):
     search_metric: str
 
 
+class LexicalConfig(BaseModel):
+    index_dir: str
+    search_limit: int
+    k1: float
+    b: float
+    compact_dead_ratio: float
+
+
 class SqliteConfig(BaseModel):
     path: str
+    bulk_batch_size: int
+    bulk_load_threshold: int
+    busy_timeout_ms: int
 
 
 class IndexingConfig(BaseModel):
@@ -43,6 +66,20 @@ class GithubConfig(BaseModel):
 class GraphConfig(BaseModel):
     traversal_depth: int
     graph_page_size: int
+    graph_max_page_size: int
+    reachability_depth: int
+    reachability_hot_limit: int
+
+
+class RetrievalConfig(BaseModel):
+    max_workers: int
+    stage_timeout_seconds: float
+    vector_scope: str
+    rrf_k: int
+    batch_size: int
+    cache_max_entries: int
+    cache_path: str
+    cache_disk_max_entries: int
 
 
 class RuntimeConfig(BaseModel):
@@ -50,6 +87,10 @@ class RuntimeConfig(BaseModel):
     retry_attempts: int
     retry_backoff_seconds: float
     retry_backoff_multiplier: float
+    retry_max_backoff_seconds: float
+    deadline_seconds: float
+    breaker_failure_threshold: int
+    breaker_reset_seconds: float
 
 
 class ExternalKnowledgeConfig(BaseModel):
@@ -60,15 +101,42 @@ class ExternalKnowledgeConfig(BaseModel):
     github_issue_repos: list[str]
 
 
+class ApiConfig(BaseModel):
+    compression_enabled: bool
+    compression_min_bytes: int
+    gzip_level: int
+    brotli_quality: int
+    file_index_cache_entries: int
+    file_max_range_lines: int
+    file_max_range_bytes: int
+
+
+class JobsConfig(BaseModel):
+    path: str
+    max_workers: int
+
+
+class TracingConfig(BaseModel):
+    enabled: bool
+    profile_slow_ms: float
+    profile_interval_ms: float
+    profile_dir: str
+
+
 class AppConfig(BaseModel):
     embeddings: EmbeddingsConfig
     llm: LlmConfig
     faiss: FaissConfig
+    lexical: LexicalConfig
     sqlite: SqliteConfig
     indexing: IndexingConfig
     github: GithubConfig
     graph: GraphConfig
+    retrieval: RetrievalConfig
     runtime: RuntimeConfig
+    jobs: JobsConfig
+    api: ApiConfig
+    tracing: TracingConfig
     external_knowledge: ExternalKnowledgeConfig
 
 
@@ -108,6 +176,18 @@ def load_config(config_path: str | None = None) -> AppConfig:
             model=os.getenv("LLM_MODEL", "claude-sonnet-4-5-20250929|"),
             api_key_env_var=os.getenv("LLM_API_KEY_ENV_VAR", "MEGALLM_API_KEY"),
             max_context_chars=_getenv_int("LLM_MAX_CONTEXT_CHARS", 32000),
+            context_token_budget=_getenv_int("LLM_CONTEXT_TOKEN_BUDGET", 6000),
+            max_concurrency=_getenv_int("LLM_MAX_CONCURRENCY", 8),
+            cache_enabled=_getenv_bool("LLM_CACHE_ENABLED", True),
+            cache_path=os.getenv("LLM_CACHE_PATH", "./data/sqlite/explanations.db"),
+            cache_ttl_seconds=_getenv_int("LLM_CACHE_TTL_SECONDS", 604800),
+            cache_max_entries=_getenv_int("LLM_CACHE_MAX_ENTRIES", 5000),
+            batch_max_functions=_getenv_int("LLM_BATCH_MAX_FUNCTIONS", 2000),
+            batch_jobs_path=os.getenv("LLM_BATCH_JOBS_PATH", "./data/sqlite/explain_batches.db"),
+            warm_enabled=_getenv_bool("LLM_WARM_ENABLED", False),
+            warm_top_n=_getenv_int("LLM_WARM_TOP_N", 25),
+            warm_token_budget=_getenv_int("LLM_WARM_TOKEN_BUDGET", 150000),
+            warm_time_budget_seconds=_getenv_float("LLM_WARM_TIME_BUDGET_SECONDS", 600.0),
         ),
         faiss=FaissConfig(
             index_path=os.getenv("FAISS_INDEX_PATH", "./data/faiss/execution_aware_chunks.faiss"),
@@ -115,8 +195,18 @@ def load_config(config_path: str | None = None) -> AppConfig:
             search_limit=_getenv_int("FAISS_SEARCH_LIMIT", 8),
             search_metric=os.getenv("FAISS_SEARCH_METRIC", "COSINE"),
         ),
+        lexical=LexicalConfig(
+            index_dir=os.getenv("BM25_INDEX_DIR", "./data/bm25"),
+            search_limit=_getenv_int("BM25_SEARCH_LIMIT", 20),
+            k1=_getenv_float("BM25_K1", 1.2),
+            b=_getenv_float("BM25_B", 0.75),
+            compact_dead_ratio=_getenv_float("BM25_COMPACT_DEAD_RATIO", 0.25),
+        ),
         sqlite=SqliteConfig(
             path=os.getenv("SQLITE_PATH", "./data/sqlite/graph.db"),
+            bulk_batch_size=_getenv_int("SQLITE_BULK_BATCH_SIZE", 5000),
+            bulk_load_threshold=_getenv_int("SQLITE_BULK_LOAD_THRESHOLD", 20000),
+            busy_timeout_ms=_getenv_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
         ),
         indexing=IndexingConfig(
             batch_size=_getenv_int("INDEXING_BATCH_SIZE", 24),
@@ -133,12 +223,48 @@ def load_config(config_path: str | None = None) -> AppConfig:
         graph=GraphConfig(
             traversal_depth=_getenv_int("GRAPH_TRAVERSAL_DEPTH", 3),
             graph_page_size=_getenv_int("GRAPH_PAGE_SIZE", 100),
+            graph_max_page_size=_getenv_int("GRAPH_MAX_PAGE_SIZE", 1000),
+            reachability_depth=_getenv_int("GRAPH_REACHABILITY_DEPTH", 5),
+            reachability_hot_limit=_getenv_int("GRAPH_REACHABILITY_HOT_LIMIT", 50),
+        ),
+        retrieval=RetrievalConfig(
+            max_workers=_getenv_int("RETRIEVAL_MAX_WORKERS", 8),
+            stage_timeout_seconds=_getenv_float("RETRIEVAL_STAGE_TIMEOUT_SECONDS", 5.0),
+            vector_scope=os.getenv("RETRIEVAL_VECTOR_SCOPE", "graph").strip().lower(),
+            rrf_k=_getenv_int("RETRIEVAL_RRF_K", 60),
+            batch_size=_getenv_int("RETRIEVAL_BATCH_SIZE", 64),
+            cache_max_entries=_getenv_int("RETRIEVAL_CACHE_MAX_ENTRIES", 256),
+            cache_path=os.getenv("RETRIEVAL_CACHE_PATH", ""),
+            cache_disk_max_entries=_getenv_int("RETRIEVAL_CACHE_DISK_MAX_ENTRIES", 5000),
         ),
         runtime=RuntimeConfig(
             request_timeout_seconds=_getenv_int("RUNTIME_REQUEST_TIMEOUT_SECONDS", 90),
             retry_attempts=_getenv_int("RUNTIME_RETRY_ATTEMPTS", 3),
             retry_backoff_seconds=_getenv_float("RUNTIME_RETRY_BACKOFF_SECONDS", 1.0),
             retry_backoff_multiplier=_getenv_float("RUNTIME_RETRY_BACKOFF_MULTIPLIER", 2.0),
+            retry_max_backoff_seconds=_getenv_float("RUNTIME_RETRY_MAX_BACKOFF_SECONDS", 10.0),
+            deadline_seconds=_getenv_float("RUNTIME_DEADLINE_SECONDS", 120.0),
+            breaker_failure_threshold=_getenv_int("RUNTIME_BREAKER_FAILURE_THRESHOLD", 5),
+            breaker_reset_seconds=_getenv_float("RUNTIME_BREAKER_RESET_SECONDS", 30.0),
+        ),
+        jobs=JobsConfig(
+            path=os.getenv("JOBS_DB_PATH", "./data/sqlite/index_jobs.db"),
+            max_workers=_getenv_int("JOBS_MAX_WORKERS", 2),
+        ),
+        api=ApiConfig(
+            compression_enabled=_getenv_bool("API_COMPRESSION_ENABLED", True),
+            compression_min_bytes=_getenv_int("API_COMPRESSION_MIN_BYTES", 1024),
+            gzip_level=_getenv_int("API_GZIP_LEVEL", 6),
+            brotli_quality=_getenv_int("API_BROTLI_QUALITY", 5),
+            file_index_cache_entries=_getenv_int("API_FILE_INDEX_CACHE_ENTRIES", 64),
+            file_max_range_lines=_getenv_int("API_FILE_MAX_RANGE_LINES", 5000),
+            file_max_range_bytes=_getenv_int("API_FILE_MAX_RANGE_BYTES", 1048576),
+        ),
+        tracing=TracingConfig(
+            enabled=_getenv_bool("TRACING_ENABLED", True),
+            profile_slow_ms=_getenv_float("TRACING_PROFILE_SLOW_MS", 0.0),
+            profile_interval_ms=_getenv_float("TRACING_PROFILE_INTERVAL_MS", 5.0),
+            profile_dir=os.getenv("TRACING_PROFILE_DIR", "./data/profiles"),
         ),
         external_knowledge=ExternalKnowledgeConfig(
             enabled=_getenv_bool("EXTERNAL_KNOWLEDGE_ENABLED", False),
@@ -1,7 +1,6 @@
 from sentence_transformers import SentenceTransformer  # type: ignore
 
 from backend.config.settings import AppConfig
-from backend.utils.retry import retry_call
 
 
 class MiniLmEmbedder:
@@ -9,21 +8,25 @@ class MiniLmEmbedder:
         self.config = config
         self.model = SentenceTransformer(self.config.embeddings.model_name)
 
+    # Encoding is local and deterministic, so failures are raised rather than retried.
     def embed_text(self, text: str) -> list[float]:
-        def _embed() -> list[float]:
-            vector = self.model.encode(
-                text,
-                normalize_embeddings=True,
-                convert_to_numpy=True,
-            )
-            return vector.tolist()
+        vector = self.model.encode(
+            text,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return vector.tolist()
 
-        return retry_call(
-            fn=_embed,
-            attempts=self.config.runtime.retry_attempts,
-            initial_backoff_seconds=self.config.runtime.retry_backoff_seconds,
-            multiplier=self.config.runtime.retry_backoff_multiplier,
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.config.indexing.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
         )
+        return vectors.tolist()
 
     def embed_batch(self, chunks: list[dict]) -> list[dict]:
         out: list[dict] = []
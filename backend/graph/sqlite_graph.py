@@ -1,40 +1,136 @@
+import base64
+import binascii
 import json
 import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from itertools import zip_longest
 from pathlib import Path
 
 from backend.config.settings import AppConfig
 from backend.parser.tree_sitter_parser import ParsedEdge, ParsedSymbol, ParsedVariable
+from backend.utils.metrics import STAGE_SECONDS
+from backend.utils.sqlite_pool import SqliteConnectionPool
+from backend.utils.tracing import span
+
+SCHEMA_VERSION = 2
+
+SECONDARY_INDEXES = {
+    "idx_symbols_name": "CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols (LOWER(name))",
+    "idx_symbols_file": "CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols (file_id)",
+    "idx_edge_rows_source": "CREATE INDEX IF NOT EXISTS idx_edge_rows_source ON edge_rows (source_id)",
+    "idx_edge_rows_target": "CREATE INDEX IF NOT EXISTS idx_edge_rows_target ON edge_rows (target_id)",
+    "idx_edge_rows_target_name": (
+        "CREATE INDEX IF NOT EXISTS idx_edge_rows_target_name ON edge_rows (target_name_id)"
+    ),
+    "idx_variable_rows_scope": "CREATE INDEX IF NOT EXISTS idx_variable_rows_scope ON variable_rows (scope_id)",
+}
+
+NODE_SELECT = """
+    SELECT symbols.id AS rowid,
+           symbols.symbol_key AS id,
+           symbols.type,
+           symbols.name,
+           COALESCE(files.path, '') AS file_path,
+           symbols.line_start,
+           symbols.line_end,
+           symbols.metadata
+    FROM symbols
+    LEFT JOIN files ON files.id = symbols.file_id
+"""
+
+EDGE_SELECT = """
+    SELECT edge_rows.id AS rowid,
+           edge_rows.source_id,
+           edge_rows.target_id,
+           edge_rows.target_name_id,
+           source_symbol.symbol_key || '->' || CASE edge_rows.type
+               WHEN 'calls' THEN 'call'
+               WHEN 'imports' THEN 'import'
+               ELSE edge_rows.type
+           END || ':' || target_names.name || ':' || COALESCE(edge_rows.line, '') AS id,
+           source_symbol.symbol_key AS source,
+           COALESCE(target_symbol.symbol_key, target_names.name) AS target,
+           edge_rows.type,
+           edge_rows.metadata
+    FROM edge_rows
+    JOIN symbols AS source_symbol ON source_symbol.id = edge_rows.source_id
+    JOIN target_names ON target_names.id = edge_rows.target_name_id
+    LEFT JOIN symbols AS target_symbol ON target_symbol.id = edge_rows.target_id
+"""
+
+VARIABLE_SELECT = """
+    SELECT variable_rows.id AS rowid,
+           variable_rows.scope_id,
+           files.path || ':' || variable_rows.name || ':' || COALESCE(variable_rows.line, '') AS id,
+           variable_rows.name,
+           COALESCE(scope_symbol.symbol_key, 'module') AS scope,
+           files.path AS file_path,
+           variable_rows.metadata
+    FROM variable_rows
+    JOIN files ON files.id = variable_rows.file_id
+    LEFT JOIN symbols AS scope_symbol ON scope_symbol.id = variable_rows.scope_id
+"""
 
 
 class SqliteGraphStore:
     def __init__(self, config: AppConfig) -> None:
         self.config = config
-        self._connections: dict[str, sqlite3.Connection] = {}
+        self._pools: dict[str, SqliteConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+        self._fts_available = True
 
     def _session_db_path(self, session_id: str) -> Path:
         return Path("./data/graph_storage") / session_id / "graph.db"
 
-    def _get_connection(self, session_id: str) -> sqlite3.Connection:
-        existing = self._connections.get(session_id)
+    def _get_pool(self, session_id: str) -> SqliteConnectionPool:
+        existing = self._pools.get(session_id)
         if existing is not None:
             return existing
 
-        db_path = self._session_db_path(session_id)
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        self._init_schema(conn)
-        self._connections[session_id] = conn
-        return conn
+        with self._pools_lock:
+            existing = self._pools.get(session_id)
+            if existing is None:
+                existing = SqliteConnectionPool(
+                    self._session_db_path(session_id),
+                    busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+                    initializer=self._init_schema,
+                )
+                self._pools[session_id] = existing
+            return existing
+
+    def _reader(self, session_id: str) -> sqlite3.Connection:
+        return self._get_pool(session_id).reader()
 
     def _init_schema(self, conn: sqlite3.Connection) -> None:
+        legacy_graph = self._read_legacy_graph(conn)
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS target_names (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+            """
+        )
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS nodes (
-                id TEXT PRIMARY KEY,
+            CREATE TABLE IF NOT EXISTS symbols (
+                id INTEGER PRIMARY KEY,
+                symbol_key TEXT NOT NULL UNIQUE,
+                file_id INTEGER REFERENCES files (id),
                 type TEXT,
                 name TEXT,
-                file_path TEXT,
                 line_start INTEGER,
                 line_end INTEGER,
                 metadata TEXT
@@ -43,28 +139,191 @@ class SqliteGraphStore:
         )
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS edges (
-                id TEXT PRIMARY KEY,
-                source TEXT,
-                target TEXT,
-                type TEXT,
-                metadata TEXT
+            CREATE TABLE IF NOT EXISTS edge_rows (
+                id INTEGER PRIMARY KEY,
+                source_id INTEGER NOT NULL REFERENCES symbols (id),
+                target_id INTEGER REFERENCES symbols (id),
+                target_name_id INTEGER NOT NULL REFERENCES target_names (id),
+                type TEXT NOT NULL,
+                line INTEGER,
+                metadata TEXT,
+                UNIQUE (source_id, type, target_name_id, line)
             )
             """
         )
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS variables (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                scope TEXT,
-                file_path TEXT,
-                metadata TEXT
+            CREATE TABLE IF NOT EXISTS variable_rows (
+                id INTEGER PRIMARY KEY,
+                file_id INTEGER NOT NULL REFERENCES files (id),
+                scope_id INTEGER REFERENCES symbols (id),
+                name TEXT NOT NULL,
+                line INTEGER,
+                metadata TEXT,
+                UNIQUE (file_id, name, line)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_digests (
+                file_id INTEGER PRIMARY KEY REFERENCES files (id),
+                digest TEXT NOT NULL
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS graph_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+        )
+        # Generations restart at 1 when a session database is recreated; the creation stamp keeps
+        # index versions from repeating across resets.
+        conn.execute(
+            "INSERT OR IGNORE INTO graph_meta (key, value) VALUES ('created_ns', ?)",
+            (time.time_ns(),),
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reachability (
+                symbol_id INTEGER PRIMARY KEY REFERENCES symbols (id),
+                generation INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                fan_in INTEGER NOT NULL,
+                fan_out INTEGER NOT NULL,
+                callers TEXT NOT NULL,
+                callees TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE VIEW IF NOT EXISTS nodes AS
+            SELECT id, type, name, file_path, line_start, line_end, metadata
+            FROM ({NODE_SELECT} WHERE symbols.type IS NOT NULL)
+            """
+        )
+        conn.execute(
+            f"CREATE VIEW IF NOT EXISTS edges AS SELECT id, source, target, type, metadata FROM ({EDGE_SELECT})"
+        )
+        conn.execute(
+            f"""
+            CREATE VIEW IF NOT EXISTS variables AS
+            SELECT id, name, scope, file_path, metadata FROM ({VARIABLE_SELECT})
+            """
+        )
+        self._create_secondary_indexes(conn)
+        self._init_search_index(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
 
+        if legacy_graph is not None:
+            self._write_graph(conn, *legacy_graph)
+
+    def _read_legacy_graph(
+        self, conn: sqlite3.Connection
+    ) -> tuple[list[ParsedSymbol], list[ParsedEdge], list[ParsedVariable]] | None:
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'nodes'"
+        ).fetchone()
+        if legacy is None:
+            return None
+
+        nodes = [
+            ParsedSymbol(
+                id=row["id"],
+                type=row["type"],
+                name=row["name"],
+                file_path=row["file_path"],
+                line_start=row["line_start"],
+                line_end=row["line_end"],
+                metadata=self._decode_metadata(row["metadata"]),
+            )
+            for row in conn.execute("SELECT * FROM nodes").fetchall()
+        ]
+        edges = [
+            ParsedEdge(
+                id=row["id"],
+                source=row["source"],
+                target=row["target"],
+                type=row["type"],
+                metadata=self._decode_metadata(row["metadata"]),
+            )
+            for row in conn.execute("SELECT * FROM edges").fetchall()
+        ]
+        variables = [
+            ParsedVariable(
+                id=row["id"],
+                name=row["name"],
+                scope=row["scope"],
+                file_path=row["file_path"],
+                metadata=self._decode_metadata(row["metadata"]),
+            )
+            for row in conn.execute("SELECT * FROM variables").fetchall()
+        ]
+
+        for table in ("nodes_fts", "variables_fts", "nodes", "edges", "variables"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        return nodes, edges, variables
+
+    def _create_secondary_indexes(self, conn: sqlite3.Connection) -> None:
+        for statement in SECONDARY_INDEXES.values():
+            conn.execute(statement)
+
+    def _drop_secondary_indexes(self, conn: sqlite3.Connection) -> None:
+        for index_name in SECONDARY_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    def _init_search_index(self, conn: sqlite3.Connection) -> None:
+        if not self._fts_available:
+            return
+        existing = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'nodes_fts'").fetchone()
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts
+                USING fts5(id, name, file_path, tokenize = 'trigram')
+                """
+            )
+        except sqlite3.OperationalError:
+            self._fts_available = False
+            return
+
+        if existing is None:
+            self._index_search_rows(conn, None)
+
+    def _index_search_rows(self, conn: sqlite3.Connection, symbol_ids: list[int] | None) -> None:
+        if not self._fts_available:
+            return
+        if symbol_ids is None:
+            conn.execute("DELETE FROM nodes_fts")
+            conn.execute(
+                f"""
+                INSERT INTO nodes_fts (rowid, id, name, file_path)
+                SELECT rowid, id, name, file_path FROM ({NODE_SELECT} WHERE symbols.type IS NOT NULL)
+                """
+            )
+            return
+        if not symbol_ids:
+            return
+        encoded_ids = json.dumps(symbol_ids)
+        conn.execute(
+            "DELETE FROM nodes_fts WHERE rowid IN (SELECT value FROM json_each(?))",
+            (encoded_ids,),
+        )
+        conn.execute(
+            f"""
+            INSERT INTO nodes_fts (rowid, id, name, file_path)
+            SELECT rowid, id, name, file_path FROM ({NODE_SELECT}
+                WHERE symbols.type IS NOT NULL AND symbols.id IN (SELECT value FROM json_each(?)))
+            """,
+            (encoded_ids,),
+        )
+
     def upsert_graph(
         self,
         session_id: str,
@@ -72,163 +331,913 @@ class SqliteGraphStore:
         edges: list[ParsedEdge],
         variables: list[ParsedVariable],
     ) -> None:
-        conn = self._get_connection(session_id)
-        batch_size = self.config.indexing.batch_size
-        for start in range(0, len(nodes), batch_size):
-            batch = nodes[start : start + batch_size]
+        with self._get_pool(session_id).writer() as conn:
+            self._write_graph(conn, nodes, edges, variables)
+
+    def _write_graph(
+        self,
+        conn: sqlite3.Connection,
+        nodes: list[ParsedSymbol],
+        edges: list[ParsedEdge],
+        variables: list[ParsedVariable],
+    ) -> None:
+        # Relaxed durability and index rebuilds only pay off when loading a large graph into an empty
+        # store; a crash there loses nothing that re-indexing would not recreate anyway.
+        bulk = (
+            len(nodes) + len(edges) + len(variables) >= self.config.sqlite.bulk_load_threshold
+            and conn.execute("SELECT 1 FROM symbols LIMIT 1").fetchone() is None
+        )
+        if not bulk:
+            with conn:
+                self._write_nodes(conn, nodes, bulk)
+                self._write_edges(conn, edges)
+                self._write_variables(conn, variables)
+                self._bump_generation(conn)
+            return
+
+        conn.execute("PRAGMA synchronous = OFF")
+        try:
+            with conn:
+                self._drop_secondary_indexes(conn)
+                self._write_nodes(conn, nodes, bulk)
+                self._write_edges(conn, edges)
+                self._write_variables(conn, variables)
+                self._index_search_rows(conn, None)
+                self._create_secondary_indexes(conn)
+                self._bump_generation(conn)
+        finally:
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def replace_file(
+        self,
+        session_id: str,
+        file_path: str,
+        nodes: list[ParsedSymbol],
+        edges: list[ParsedEdge],
+        variables: list[ParsedVariable],
+        digest: str | None = None,
+    ) -> None:
+        with self._get_pool(session_id).writer() as conn, conn:
+            affected_names = self._remove_file_rows(conn, file_path)
+            self._write_nodes(conn, nodes, bulk=False)
+            self._write_edges(conn, edges)
+            self._write_variables(conn, variables)
+            affected_names.update(item.name for item in nodes)
+            affected_names.update(item.target for item in edges if item.type == "calls")
+            self._resolve_call_targets(conn, affected_names)
+            if digest is not None:
+                self._write_file_digests(conn, {file_path: digest})
+            self._bump_generation(conn)
+
+    def delete_file(self, session_id: str, file_path: str) -> None:
+        with self._get_pool(session_id).writer() as conn, conn:
+            affected_names = self._remove_file_rows(conn, file_path)
+            self._resolve_call_targets(conn, affected_names)
+            self._bump_generation(conn)
+
+    def get_file_digests(self, session_id: str) -> dict[str, str | None]:
+        # Files indexed before digests were recorded map to None so the next sync replaces them.
+        rows = self._reader(session_id).execute(
+            """
+            SELECT files.path, file_digests.digest
+            FROM files
+            LEFT JOIN file_digests ON file_digests.file_id = files.id
+            """
+        ).fetchall()
+        return {row["path"]: row["digest"] for row in rows}
+
+    def set_file_digests(self, session_id: str, digests: dict[str, str]) -> None:
+        with self._get_pool(session_id).writer() as conn, conn:
+            self._write_file_digests(conn, digests)
+
+    def _write_file_digests(self, conn: sqlite3.Connection, digests: dict[str, str]) -> None:
+        file_ids = self._intern(conn, "files", "path", set(digests))
+        conn.executemany(
+            """
+            INSERT INTO file_digests (file_id, digest) VALUES (?, ?)
+            ON CONFLICT (file_id) DO UPDATE SET digest = excluded.digest
+            """,
+            [(file_ids[path], digest) for path, digest in digests.items()],
+        )
+
+    def _bump_generation(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            INSERT INTO graph_meta (key, value) VALUES ('generation', 1)
+            ON CONFLICT (key) DO UPDATE SET value = value + 1
+            """
+        )
+        conn.execute("DELETE FROM reachability")
+
+    def _generation(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM graph_meta WHERE key = 'generation'").fetchone()
+        return int(row["value"]) if row is not None else 0
+
+    def get_generation(self, session_id: str) -> int:
+        return self._generation(self._reader(session_id))
+
+    def get_index_version(self, session_id: str) -> str:
+        rows = self._reader(session_id).execute(
+            "SELECT key, value FROM graph_meta WHERE key IN ('created_ns', 'generation')"
+        ).fetchall()
+        meta = {row["key"]: int(row["value"]) for row in rows}
+        return f"{meta.get('created_ns', 0)}.{meta.get('generation', 0)}"
+
+    def _remove_file_rows(self, conn: sqlite3.Connection, file_path: str) -> set[str]:
+        file_row = conn.execute("SELECT id FROM files WHERE path = ?", (file_path,)).fetchone()
+        if file_row is None:
+            return set()
+        file_id = file_row["id"]
+
+        symbol_rows = conn.execute("SELECT id, name FROM symbols WHERE file_id = ?", (file_id,)).fetchall()
+        encoded_ids = json.dumps([row["id"] for row in symbol_rows])
+        conn.execute("DELETE FROM variable_rows WHERE file_id = ?", (file_id,))
+        conn.execute(
+            "DELETE FROM edge_rows WHERE source_id IN (SELECT value FROM json_each(?))",
+            (encoded_ids,),
+        )
+        conn.execute(
+            "UPDATE edge_rows SET target_id = NULL WHERE target_id IN (SELECT value FROM json_each(?))",
+            (encoded_ids,),
+        )
+        conn.execute(
+            "UPDATE variable_rows SET scope_id = NULL WHERE scope_id IN (SELECT value FROM json_each(?))",
+            (encoded_ids,),
+        )
+        if self._fts_available:
+            conn.execute(
+                "DELETE FROM nodes_fts WHERE rowid IN (SELECT value FROM json_each(?))",
+                (encoded_ids,),
+            )
+        conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+        conn.execute("DELETE FROM file_digests WHERE file_id = ?", (file_id,))
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        return {row["name"] for row in symbol_rows if row["name"]}
+
+    def _resolve_call_targets(self, conn: sqlite3.Connection, names: set[str]) -> None:
+        if not names:
+            return
+        encoded_names = json.dumps(list(names))
+
+        symbols_by_name: dict[str, list[int]] = {}
+        symbols_by_file_and_name: dict[tuple[int, str], list[int]] = {}
+        for row in conn.execute(
+            """
+            SELECT id, name, file_id FROM symbols
+            WHERE type IS NOT NULL AND LOWER(name) IN (SELECT LOWER(value) FROM json_each(?))
+            """,
+            (encoded_names,),
+        ).fetchall():
+            if row["name"] not in names:
+                continue
+            symbols_by_name.setdefault(row["name"], []).append(row["id"])
+            symbols_by_file_and_name.setdefault((row["file_id"], row["name"]), []).append(row["id"])
+
+        updates: list[tuple[int | None, int]] = []
+        for row in conn.execute(
+            """
+            SELECT edge_rows.id, edge_rows.target_id, source_symbol.file_id, target_names.name
+            FROM target_names
+            JOIN edge_rows ON edge_rows.target_name_id = target_names.id
+            JOIN symbols AS source_symbol ON source_symbol.id = edge_rows.source_id
+            WHERE edge_rows.type = 'calls' AND target_names.name IN (SELECT value FROM json_each(?))
+            """,
+            (encoded_names,),
+        ).fetchall():
+            same_file_candidates = symbols_by_file_and_name.get((row["file_id"], row["name"]), [])
+            global_candidates = symbols_by_name.get(row["name"], [])
+            if len(same_file_candidates) == 1:
+                target_id = same_file_candidates[0]
+            elif len(global_candidates) == 1:
+                target_id = global_candidates[0]
+            else:
+                target_id = None
+            if target_id != row["target_id"]:
+                updates.append((target_id, row["id"]))
+
+        conn.executemany("UPDATE edge_rows SET target_id = ? WHERE id = ?", updates)
+
+    def _batches(self, items: list) -> list[list]:
+        batch_size = max(self.config.sqlite.bulk_batch_size, 1)
+        return [items[start : start + batch_size] for start in range(0, len(items), batch_size)]
+
+    def _encode_metadata(self, metadata: dict) -> str:
+        return json.dumps(metadata, separators=(",", ":")) if metadata else "{}"
+
+    def _decode_metadata(self, raw: str | None) -> dict:
+        try:
+            parsed = json.loads(raw or "{}")
+        except ValueError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def _metadata_line(self, metadata: dict) -> int | None:
+        line = metadata.get("line")
+        return line if isinstance(line, int) else None
+
+    def _intern(self, conn: sqlite3.Connection, table: str, column: str, values: set[str]) -> dict[str, int]:
+        if not values:
+            return {}
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)",
+            [(value,) for value in values],
+        )
+        rows = conn.execute(
+            f"SELECT id, {column} FROM {table} WHERE {column} IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(values)),),
+        ).fetchall()
+        return {row[column]: row["id"] for row in rows}
+
+    def _symbol_refs(self, conn: sqlite3.Connection, keys: set[str]) -> dict[str, sqlite3.Row]:
+        if not keys:
+            return {}
+        rows = conn.execute(
+            """
+            SELECT id, symbol_key, name, type FROM symbols
+            WHERE symbol_key IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(list(keys)),),
+        ).fetchall()
+        return {row["symbol_key"]: row for row in rows}
+
+    def _ensure_symbol_refs(self, conn: sqlite3.Connection, keys: set[str]) -> dict[str, sqlite3.Row]:
+        refs = self._symbol_refs(conn, keys)
+        missing = keys - refs.keys()
+        if not missing:
+            return refs
+
+        file_ids = self._intern(
+            conn,
+            "files",
+            "path",
+            {path for path in (self._file_hint(key) for key in missing) if path},
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO symbols (symbol_key, file_id) VALUES (?, ?)",
+            [(key, file_ids.get(self._file_hint(key) or "")) for key in missing],
+        )
+        refs.update(self._symbol_refs(conn, missing))
+        return refs
+
+    def _file_hint(self, symbol_key: str) -> str | None:
+        if symbol_key.startswith("module:"):
+            return symbol_key[len("module:") :]
+        return None
+
+    def _write_nodes(self, conn: sqlite3.Connection, nodes: list[ParsedSymbol], bulk: bool) -> None:
+        for batch in self._batches(nodes):
+            file_ids = self._intern(conn, "files", "path", {item.file_path for item in batch})
             conn.executemany(
                 """
-                INSERT OR REPLACE INTO nodes (id, type, name, file_path, line_start, line_end, metadata)
+                INSERT INTO symbols (symbol_key, file_id, type, name, line_start, line_end, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (symbol_key) DO UPDATE SET
+                    file_id = excluded.file_id,
+                    type = excluded.type,
+                    name = excluded.name,
+                    line_start = excluded.line_start,
+                    line_end = excluded.line_end,
+                    metadata = excluded.metadata
                 """,
                 [
                     (
                         item.id,
+                        file_ids[item.file_path],
                         item.type,
                         item.name,
-                        item.file_path,
                         item.line_start,
                         item.line_end,
-                        json.dumps(item.metadata),
+                        self._encode_metadata(item.metadata),
                     )
                     for item in batch
                 ],
             )
-            conn.commit()
+            if not bulk:
+                refs = self._symbol_refs(conn, {item.id for item in batch})
+                self._index_search_rows(conn, [row["id"] for row in refs.values()])
 
-        for start in range(0, len(edges), batch_size):
-            batch = edges[start : start + batch_size]
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO edges (id, source, target, type, metadata)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                [
+    def _write_edges(self, conn: sqlite3.Connection, edges: list[ParsedEdge]) -> None:
+        for batch in self._batches(edges):
+            sources = self._ensure_symbol_refs(conn, {item.source for item in batch})
+            targets = {
+                key: row
+                for key, row in self._symbol_refs(conn, {item.target for item in batch}).items()
+                if row["type"] is not None
+            }
+
+            rows: list[tuple] = []
+            for item in batch:
+                target = targets.get(item.target)
+                target_name = target["name"] if target is not None else item.target
+                rows.append(
                     (
-                        item.id,
-                        item.source,
-                        item.target,
+                        sources[item.source]["id"],
+                        target["id"] if target is not None else None,
+                        target_name,
                         item.type,
-                        json.dumps(item.metadata),
+                        self._metadata_line(item.metadata),
+                        self._encode_metadata(item.metadata),
                     )
-                    for item in batch
-                ],
+                )
+
+            name_ids = self._intern(conn, "target_names", "name", {row[2] for row in rows})
+            conn.executemany(
+                """
+                INSERT INTO edge_rows (source_id, target_id, target_name_id, type, line, metadata)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source_id, type, target_name_id, line) DO UPDATE SET
+                    target_id = excluded.target_id,
+                    metadata = excluded.metadata
+                """,
+                [(row[0], row[1], name_ids[row[2]], *row[3:]) for row in rows],
             )
-            conn.commit()
 
-        for start in range(0, len(variables), batch_size):
-            batch = variables[start : start + batch_size]
+    def _write_variables(self, conn: sqlite3.Connection, variables: list[ParsedVariable]) -> None:
+        for batch in self._batches(variables):
+            file_ids = self._intern(conn, "files", "path", {item.file_path for item in batch})
+            scopes = self._ensure_symbol_refs(
+                conn,
+                {item.scope for item in batch if item.scope != "module"},
+            )
             conn.executemany(
                 """
-                INSERT OR REPLACE INTO variables (id, name, scope, file_path, metadata)
+                INSERT INTO variable_rows (file_id, scope_id, name, line, metadata)
                 VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (file_id, name, line) DO UPDATE SET
+                    scope_id = excluded.scope_id,
+                    metadata = excluded.metadata
                 """,
                 [
                     (
-                        item.id,
+                        file_ids[item.file_path],
+                        scopes[item.scope]["id"] if item.scope in scopes else None,
                         item.name,
-                        item.scope,
-                        item.file_path,
-                        json.dumps(item.metadata),
+                        self._metadata_line(item.metadata),
+                        self._encode_metadata(item.metadata),
                     )
                     for item in batch
                 ],
             )
-            conn.commit()
 
-    def get_function_graph(self, session_id: str, function_name: str) -> tuple[list[dict], list[dict]]:
-        conn = self._get_connection(session_id)
+    @STAGE_SECONDS.time(stage="graph_traversal")
+    @span("graph.get_function_graph")
+    def get_function_graph(
+        self,
+        session_id: str,
+        function_name: str,
+        seed_ids: list[int] | None = None,
+    ) -> tuple[list[dict], list[dict]]:
+        conn = self._reader(session_id)
         depth = self.config.graph.traversal_depth
         page_size = self.config.graph.graph_page_size
 
-        lookup_names = self._candidate_function_names(function_name)
-        lowered_names = [item.lower() for item in lookup_names if item]
-
-        seed_rows: list[sqlite3.Row] = []
-        if lowered_names:
-            placeholders = ",".join(["?"] * len(lowered_names))
+        if seed_ids is None:
+            seed_rows = self._seed_rows(conn, function_name, page_size)
+        else:
             seed_rows = conn.execute(
-                f"SELECT * FROM nodes WHERE LOWER(name) IN ({placeholders}) LIMIT ?",
-                (*lowered_names, page_size),
+                f"""
+                {NODE_SELECT}
+                WHERE symbols.id IN (SELECT value FROM json_each(?)) AND symbols.type IS NOT NULL
+                ORDER BY symbols.id
+                """,
+                (json.dumps(seed_ids),),
             ).fetchall()
-
-        if not seed_rows:
-            fallback_term = function_name.strip().lower()
-            if fallback_term:
-                wildcard = f"%{fallback_term}%"
-                seed_rows = conn.execute(
-                    """
-                    SELECT * FROM nodes
-                    WHERE LOWER(id) LIKE ?
-                       OR LOWER(file_path) LIKE ?
-                       OR LOWER(name) LIKE ?
-                    LIMIT ?
-                    """,
-                    (wildcard, wildcard, wildcard, page_size),
-                ).fetchall()
-
-        seen_nodes = {row["id"]: dict(row) for row in seed_rows}
-        frontier = [row["id"] for row in seed_rows]
-        expanded_node_ids: set[str] = set()
-        all_edges: dict[str, dict] = {}
+        seen_nodes = {row["id"]: self._node_dict(row) for row in seed_rows}
+        seen_symbol_ids = {row["rowid"] for row in seed_rows}
+        frontier = [row["rowid"] for row in seed_rows]
+        expanded_symbol_ids: set[int] = set()
+        all_edges: dict[int, sqlite3.Row] = {}
 
         for _ in range(depth):
-            next_seed_ids = [node_id for node_id in frontier if node_id not in expanded_node_ids]
+            next_seed_ids = [symbol_id for symbol_id in frontier if symbol_id not in expanded_symbol_ids]
             if not next_seed_ids:
                 break
-            expanded_node_ids.update(next_seed_ids)
+            expanded_symbol_ids.update(next_seed_ids)
 
             placeholders = ",".join(["?"] * len(next_seed_ids))
             edge_rows = conn.execute(
                 f"""
-                SELECT * FROM edges
-                WHERE source IN ({placeholders}) OR target IN ({placeholders})
+                {EDGE_SELECT}
+                WHERE edge_rows.source_id IN ({placeholders}) OR edge_rows.target_id IN ({placeholders})
                 LIMIT ?
                 """,
                 (*next_seed_ids, *next_seed_ids, page_size),
             ).fetchall()
-            all_edges.update({row["id"]: dict(row) for row in edge_rows})
+            all_edges.update({row["rowid"]: row for row in edge_rows})
 
-            connected_node_ids = set()
+            connected_symbol_ids = set()
             for edge in edge_rows:
-                connected_node_ids.add(edge["source"])
-                connected_node_ids.add(edge["target"])
+                connected_symbol_ids.add(edge["source_id"])
+                if edge["target_id"] is not None:
+                    connected_symbol_ids.add(edge["target_id"])
 
-            if connected_node_ids:
-                placeholders = ",".join(["?"] * len(connected_node_ids))
+            if connected_symbol_ids:
+                placeholders = ",".join(["?"] * len(connected_symbol_ids))
                 node_rows = conn.execute(
-                    f"SELECT * FROM nodes WHERE id IN ({placeholders}) LIMIT ?",
-                    (*connected_node_ids, page_size),
+                    f"""
+                    {NODE_SELECT}
+                    WHERE symbols.id IN ({placeholders}) AND symbols.type IS NOT NULL
+                    LIMIT ?
+                    """,
+                    (*connected_symbol_ids, page_size),
                 ).fetchall()
                 frontier = []
                 for row in node_rows:
-                    node_id = row["id"]
-                    if node_id not in seen_nodes:
-                        seen_nodes[node_id] = dict(row)
-                        frontier.append(node_id)
+                    if row["rowid"] not in seen_symbol_ids:
+                        seen_symbol_ids.add(row["rowid"])
+                        seen_nodes[row["id"]] = self._node_dict(row)
+                        frontier.append(row["rowid"])
             else:
                 frontier = []
 
         valid_node_ids = set(seen_nodes.keys())
         valid_edges: list[dict] = []
-        for edge in all_edges.values():
+        for row in all_edges.values():
+            edge = self._edge_dict(row)
             if edge["source"] not in valid_node_ids:
                 continue
             if edge["target"] not in valid_node_ids:
-                seen_nodes[edge["target"]] = {
-                    "id": edge["target"],
-                    "type": "external",
-                    "name": edge["target"],
-                    "file_path": "",
-                    "line_start": None,
-                    "line_end": None,
-                    "metadata": "{}",
-                }
+                seen_nodes[edge["target"]] = self._external_node(edge["target"])
                 valid_node_ids.add(edge["target"])
             valid_edges.append(edge)
 
         return list(seen_nodes.values()), valid_edges
 
+    def iter_function_graph(self, session_id: str, function_name: str) -> Iterator[tuple[str, int, dict]]:
+        state = self._initial_walk_state()
+        for group in self._walk_function_graph(session_id, function_name, state, self.config.graph.graph_page_size):
+            yield from group
+
+    def get_function_graph_page(
+        self,
+        session_id: str,
+        function_name: str,
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> dict:
+        generation = self.get_generation(session_id)
+        # Oversized requests are clamped so a single page cannot pull in the whole graph.
+        size = max(min(page_size or self.config.graph.graph_page_size, self.config.graph.graph_max_page_size), 1)
+        state = self._initial_walk_state()
+        if cursor:
+            decoded = self._decode_cursor(cursor)
+            if decoded.get("generation") != generation or decoded.get("query") != function_name:
+                raise ValueError("Graph cursor is stale or belongs to another query; restart pagination.")
+            state = self._walk_state_from_cursor(decoded)
+
+        nodes: list[dict] = []
+        edges: list[dict] = []
+        depth = state["level"]
+        has_more = False
+        # The walk only advances its state once a group has been consumed; a group cut by the page
+        # boundary is replayed on the next page, skipping the items already returned.
+        skip = state["skip"]
+        for group in self._walk_function_graph(session_id, function_name, state, size):
+            remaining = group[skip:]
+            room = size - len(nodes) - len(edges)
+            if len(remaining) > room:
+                remaining = remaining[:room]
+                skip += room
+                has_more = True
+            else:
+                skip = 0
+            for kind, level, item in remaining:
+                depth = level
+                (nodes if kind == "node" else edges).append(item)
+            if has_more:
+                break
+
+        next_cursor = None
+        if has_more:
+            next_cursor = self._encode_cursor(
+                {
+                    "query": function_name,
+                    "generation": generation,
+                    "level": state["level"],
+                    "after": state["after"],
+                    "skip": skip,
+                    "expanded": self._delta_encode(state["expanded"]),
+                    "frontier": self._delta_encode(state["frontier"]),
+                    "discovered": self._delta_encode(state["discovered"]),
+                    "externals": self._delta_encode(state["externals"]),
+                }
+            )
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "page": {
+                "page_size": size,
+                "depth": depth,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
+            },
+        }
+
+    def _initial_walk_state(self) -> dict:
+        # Level 0 emits the seeds; level n expands the frontier found at level n - 1. "after" is the last
+        # edge_rows.id consumed at the current level, "discovered" collects the next frontier and "skip"
+        # counts items of a partly returned group.
+        return {
+            "level": 0,
+            "after": 0,
+            "skip": 0,
+            "expanded": set(),
+            "frontier": set(),
+            "discovered": set(),
+            "externals": set(),
+        }
+
+    def _walk_state_from_cursor(self, decoded: dict) -> dict:
+        try:
+            return {
+                "level": int(decoded["level"]),
+                "after": int(decoded["after"]),
+                "skip": max(int(decoded["skip"]), 0),
+                "expanded": self._delta_decode(decoded["expanded"]),
+                "frontier": self._delta_decode(decoded["frontier"]),
+                "discovered": self._delta_decode(decoded["discovered"]),
+                "externals": self._delta_decode(decoded["externals"]),
+            }
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError("Invalid graph cursor.") from exc
+
+    def _walk_function_graph(
+        self,
+        session_id: str,
+        function_name: str,
+        state: dict,
+        batch_size: int,
+    ) -> Iterator[list[tuple[str, int, dict]]]:
+        # Yields one group per seed or edge (the edge plus any nodes it introduces) and records the group
+        # in the state only when resumed, so a consumer can stop between groups and serialize the state.
+        # Streaming consumers may resume on another worker thread, so each query takes that thread's reader.
+        depth = self.config.graph.traversal_depth
+        if state["level"] == 0:
+            for row in self._seed_rows(self._reader(session_id), function_name, self.config.graph.graph_page_size):
+                if row["rowid"] in state["discovered"]:
+                    continue
+                yield [("node", 0, self._node_dict(row))]
+                state["discovered"].add(row["rowid"])
+            self._advance_walk_level(state)
+
+        while 1 <= state["level"] <= depth and state["frontier"]:
+            level = state["level"]
+            encoded_ids = json.dumps(sorted(state["frontier"]))
+            while True:
+                conn = self._reader(session_id)
+                edge_rows = conn.execute(
+                    f"""
+                    {EDGE_SELECT}
+                    WHERE edge_rows.id > :after
+                      AND (edge_rows.source_id IN (SELECT value FROM json_each(:ids))
+                           OR edge_rows.target_id IN (SELECT value FROM json_each(:ids)))
+                    ORDER BY edge_rows.id
+                    LIMIT :limit
+                    """,
+                    {"after": state["after"], "ids": encoded_ids, "limit": batch_size},
+                ).fetchall()
+                if not edge_rows:
+                    break
+
+                unseen_ids = {
+                    symbol_id
+                    for edge in edge_rows
+                    for symbol_id in (edge["source_id"], edge["target_id"])
+                    if symbol_id is not None and not self._walk_seen(state, symbol_id)
+                }
+                node_rows = {}
+                if unseen_ids:
+                    node_rows = {
+                        row["rowid"]: row
+                        for row in conn.execute(
+                            f"""
+                            {NODE_SELECT}
+                            WHERE symbols.id IN (SELECT value FROM json_each(?)) AND symbols.type IS NOT NULL
+                            """,
+                            (json.dumps(list(unseen_ids)),),
+                        ).fetchall()
+                    }
+
+                for edge in edge_rows:
+                    # Edges touching an already expanded symbol were handled at an earlier level.
+                    if edge["source_id"] in state["expanded"] or edge["target_id"] in state["expanded"]:
+                        state["after"] = edge["rowid"]
+                        continue
+                    group: list[tuple[str, int, dict]] = []
+                    new_ids: list[int] = []
+                    for symbol_id in (edge["source_id"], edge["target_id"]):
+                        if (
+                            symbol_id is None
+                            or symbol_id in new_ids
+                            or symbol_id not in node_rows
+                            or self._walk_seen(state, symbol_id)
+                        ):
+                            continue
+                        new_ids.append(symbol_id)
+                        group.append(("node", level, self._node_dict(node_rows[symbol_id])))
+                    new_external = None
+                    if self._walk_seen(state, edge["source_id"]) or edge["source_id"] in new_ids:
+                        if edge["target_id"] is None and edge["target_name_id"] not in state["externals"]:
+                            new_external = edge["target_name_id"]
+                            group.append(("node", level, self._external_node(edge["target"])))
+                        group.append(("edge", level, self._edge_dict(edge)))
+                    if group:
+                        yield group
+                    state["discovered"].update(new_ids)
+                    if new_external is not None:
+                        state["externals"].add(new_external)
+                    state["after"] = edge["rowid"]
+            self._advance_walk_level(state)
+
+    def _walk_seen(self, state: dict, symbol_id: int) -> bool:
+        return symbol_id in state["expanded"] or symbol_id in state["frontier"] or symbol_id in state["discovered"]
+
+    def _advance_walk_level(self, state: dict) -> None:
+        state["expanded"] |= state["frontier"]
+        state["frontier"] = state["discovered"]
+        state["discovered"] = set()
+        state["after"] = 0
+        state["level"] += 1
+
+    def _delta_encode(self, ids: set[int]) -> list[int]:
+        ordered = sorted(ids)
+        return [value - previous for previous, value in zip([0, *ordered], ordered)]
+
+    def _delta_decode(self, deltas: list[int]) -> set[int]:
+        ids: set[int] = set()
+        current = 0
+        for delta in deltas:
+            current += int(delta)
+            ids.add(current)
+        return ids
+
+    def _encode_cursor(self, payload: dict) -> str:
+        # Cursors carry the walk's symbol id sets, so they are compressed before encoding.
+        raw = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 9)
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> dict:
+        try:
+            raw = zlib.decompress(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            decoded = json.loads(raw)
+        except (binascii.Error, zlib.error, ValueError) as exc:
+            raise ValueError("Invalid graph cursor.") from exc
+        if not isinstance(decoded, dict):
+            raise ValueError("Invalid graph cursor.")
+        return decoded
+
+    def resolve_seed_ids(self, session_id: str, function_name: str) -> list[int]:
+        # Lets callers resolve a query once and share the seeds between graph and variable lookups.
+        seed_rows = self._seed_rows(self._reader(session_id), function_name, self.config.graph.graph_page_size)
+        return [row["rowid"] for row in seed_rows]
+
+    def _seed_rows(self, conn: sqlite3.Connection, function_name: str, limit: int) -> list[sqlite3.Row]:
+        lookup_names = self._candidate_function_names(function_name)
+        lowered_names = [item.lower() for item in lookup_names if item]
+
+        seed_rows: list[sqlite3.Row] = []
+        if lowered_names:
+            placeholders = ",".join(["?"] * len(lowered_names))
+            seed_rows = conn.execute(
+                f"""
+                {NODE_SELECT}
+                WHERE LOWER(symbols.name) IN ({placeholders}) AND symbols.type IS NOT NULL
+                LIMIT ?
+                """,
+                (*lowered_names, limit),
+            ).fetchall()
+
+        if not seed_rows:
+            fallback_term = function_name.strip().lower()
+            if fallback_term:
+                seed_rows = self._search_nodes(conn, fallback_term, limit)
+        return seed_rows
+
+    def get_reachability(self, session_id: str, function_name: str) -> dict:
+        conn = self._reader(session_id)
+        page_size = self.config.graph.graph_page_size
+        summaries: list[dict] = []
+        for seed in self._seed_rows(conn, function_name, page_size):
+            summary = self._reachability_summary(session_id, seed["rowid"])
+            callers = self._reachable_nodes(conn, summary["callers"], page_size)
+            callees = self._reachable_nodes(conn, summary["callees"], page_size)
+            summaries.append(
+                {
+                    "symbol": self._node_dict(seed),
+                    "fan_in": summary["fan_in"],
+                    "fan_out": summary["fan_out"],
+                    "callers_total": len(summary["callers"]),
+                    "callees_total": len(summary["callees"]),
+                    "callers": callers,
+                    "callees": callees,
+                }
+            )
+        return {
+            "query": function_name,
+            "depth": self.config.graph.reachability_depth,
+            "summaries": summaries,
+        }
+
+    def precompute_reachability(self, session_id: str, limit: int | None = None) -> int:
+        conn = self._reader(session_id)
+        hot_limit = self.config.graph.reachability_hot_limit if limit is None else limit
+        if hot_limit <= 0:
+            return 0
+        symbol_ids = self._hot_symbol_ids(conn, hot_limit)
+        for symbol_id in symbol_ids:
+            self._reachability_summary(session_id, symbol_id)
+        return len(symbol_ids)
+
+    def get_hot_functions(self, session_id: str, limit: int) -> list[dict]:
+        if limit <= 0:
+            return []
+        conn = self._reader(session_id)
+        symbol_ids = self._hot_symbol_ids(conn, limit)
+        rows = conn.execute(
+            f"{NODE_SELECT} WHERE symbols.id IN (SELECT value FROM json_each(?)) AND symbols.type IS NOT NULL",
+            (json.dumps(symbol_ids),),
+        ).fetchall()
+        nodes_by_id = {row["rowid"]: self._node_dict(row) for row in rows}
+        hot: list[dict] = []
+        for symbol_id in symbol_ids:
+            if symbol_id not in nodes_by_id:
+                continue
+            summary = self._reachability_summary(session_id, symbol_id)
+            hot.append({**nodes_by_id[symbol_id], "fan_in": summary["fan_in"], "fan_out": summary["fan_out"]})
+        return hot
+
+    def _hot_symbol_ids(self, conn: sqlite3.Connection, limit: int) -> list[int]:
+        hub_rows = conn.execute(
+            """
+            SELECT edge_rows.target_id AS symbol_id
+            FROM edge_rows
+            WHERE edge_rows.type = 'calls' AND edge_rows.target_id IS NOT NULL
+            GROUP BY edge_rows.target_id
+            ORDER BY COUNT(DISTINCT edge_rows.source_id) DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        entry_rows = conn.execute(
+            """
+            SELECT edge_rows.source_id AS symbol_id
+            FROM edge_rows
+            JOIN symbols ON symbols.id = edge_rows.source_id
+            WHERE edge_rows.type = 'calls'
+              AND symbols.type IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM edge_rows AS incoming
+                  WHERE incoming.target_id = edge_rows.source_id AND incoming.type = 'calls'
+              )
+            GROUP BY edge_rows.source_id
+            ORDER BY COUNT(*) DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        # Hubs (highest fan-in) and entry points (no callers) are interleaved so both
+        # kinds stay near the top when the caller only takes a prefix.
+        interleaved = [
+            row["symbol_id"]
+            for pair in zip_longest(hub_rows, entry_rows)
+            for row in pair
+            if row is not None
+        ]
+        return list(dict.fromkeys(interleaved))[:limit]
+
+    def _reachability_summary(self, session_id: str, symbol_id: int) -> dict:
+        conn = self._reader(session_id)
+        depth = self.config.graph.reachability_depth
+        generation = self._generation(conn)
+        row = conn.execute(
+            "SELECT * FROM reachability WHERE symbol_id = ? AND generation = ? AND depth = ?",
+            (symbol_id, generation, depth),
+        ).fetchone()
+        if row is not None:
+            return {
+                "fan_in": row["fan_in"],
+                "fan_out": row["fan_out"],
+                "callers": json.loads(row["callers"]),
+                "callees": json.loads(row["callees"]),
+            }
+
+        fan_in, fan_out = conn.execute(
+            """
+            SELECT
+                (SELECT COUNT(DISTINCT source_id) FROM edge_rows WHERE target_id = :symbol AND type = 'calls'),
+                (SELECT COUNT(DISTINCT target_name_id) FROM edge_rows WHERE source_id = :symbol AND type = 'calls')
+            """,
+            {"symbol": symbol_id},
+        ).fetchone()
+        summary = {
+            "fan_in": int(fan_in),
+            "fan_out": int(fan_out),
+            "callers": self._transitive_calls(conn, symbol_id, depth, reverse=True),
+            "callees": self._transitive_calls(conn, symbol_id, depth, reverse=False),
+        }
+        with self._get_pool(session_id).writer() as writer, writer:
+            writer.execute(
+                """
+                INSERT OR REPLACE INTO reachability (symbol_id, generation, depth, fan_in, fan_out, callers, callees)
+                SELECT ?, ?, ?, ?, ?, ?, ?
+                WHERE (SELECT COALESCE(MAX(value), 0) FROM graph_meta WHERE key = 'generation') = ?
+                """,
+                (
+                    symbol_id,
+                    generation,
+                    depth,
+                    summary["fan_in"],
+                    summary["fan_out"],
+                    json.dumps(summary["callers"], separators=(",", ":")),
+                    json.dumps(summary["callees"], separators=(",", ":")),
+                    generation,
+                ),
+            )
+        return summary
+
+    def _transitive_calls(
+        self,
+        conn: sqlite3.Connection,
+        symbol_id: int,
+        depth: int,
+        reverse: bool,
+    ) -> list[list[int]]:
+        near, far = ("target_id", "source_id") if reverse else ("source_id", "target_id")
+        rows = conn.execute(
+            f"""
+            WITH RECURSIVE reached (symbol_id, hops) AS (
+                SELECT ?, 0
+                UNION
+                SELECT edge_rows.{far}, reached.hops + 1
+                FROM edge_rows
+                JOIN reached ON edge_rows.{near} = reached.symbol_id
+                WHERE edge_rows.type = 'calls'
+                  AND edge_rows.target_id IS NOT NULL
+                  AND reached.hops < ?
+            )
+            SELECT symbol_id, MIN(hops) AS hops FROM reached
+            WHERE symbol_id != ?
+            GROUP BY symbol_id
+            ORDER BY hops, symbol_id
+            """,
+            (symbol_id, depth, symbol_id),
+        ).fetchall()
+        return [[row["symbol_id"], row["hops"]] for row in rows]
+
+    def _reachable_nodes(self, conn: sqlite3.Connection, reached: list[list[int]], limit: int) -> list[dict]:
+        page = reached[:limit]
+        if not page:
+            return []
+        hops_by_id = {symbol_id: hops for symbol_id, hops in page}
+        rows = conn.execute(
+            f"{NODE_SELECT} WHERE symbols.id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(hops_by_id)),),
+        ).fetchall()
+        nodes = [{**self._node_dict(row), "depth": hops_by_id[row["rowid"]]} for row in rows]
+        nodes.sort(key=lambda item: (item["depth"], item["id"]))
+        return nodes
+
+    def _external_node(self, target: str) -> dict:
+        return {
+            "id": target,
+            "type": "external",
+            "name": target,
+            "file_path": "",
+            "line_start": None,
+            "line_end": None,
+            "metadata": "{}",
+        }
+
+    def _node_dict(self, row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "type": row["type"],
+            "name": row["name"],
+            "file_path": row["file_path"],
+            "line_start": row["line_start"],
+            "line_end": row["line_end"],
+            "metadata": row["metadata"],
+        }
+
+    def _edge_dict(self, row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "source": row["source"],
+            "target": row["target"],
+            "type": row["type"],
+            "metadata": row["metadata"],
+        }
+
+    def _variable_dict(self, row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "scope": row["scope"],
+            "file_path": row["file_path"],
+            "metadata": row["metadata"],
+        }
+
     def _candidate_function_names(self, function_name: str) -> list[str]:
         normalized = function_name.strip()
         if not normalized:
@@ -258,19 +1267,74 @@ class SqliteGraphStore:
 
         return list(candidates)
 
-    def get_variables_for_scope(self, session_id: str, function_name: str) -> list[dict]:
-        conn = self._get_connection(session_id)
+    def _search_nodes(self, conn: sqlite3.Connection, term: str, limit: int) -> list[sqlite3.Row]:
+        if self._fts_available and len(term) >= 3:
+            for match_query in (self._fts_phrase(term), self._fts_trigrams(term)):
+                rows = conn.execute(
+                    f"""
+                    {NODE_SELECT}
+                    JOIN nodes_fts ON nodes_fts.rowid = symbols.id
+                    WHERE nodes_fts MATCH ?
+                    ORDER BY bm25(nodes_fts, 1.0, 10.0, 2.0)
+                    LIMIT ?
+                    """,
+                    (match_query, limit),
+                ).fetchall()
+                if rows:
+                    return rows
+            return []
+
+        wildcard = f"%{term}%"
+        return conn.execute(
+            f"""
+            {NODE_SELECT}
+            WHERE symbols.type IS NOT NULL
+              AND (LOWER(symbols.symbol_key) LIKE ?
+                   OR LOWER(files.path) LIKE ?
+                   OR LOWER(symbols.name) LIKE ?)
+            LIMIT ?
+            """,
+            (wildcard, wildcard, wildcard, limit),
+        ).fetchall()
+
+    def _fts_phrase(self, term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    def _fts_trigrams(self, term: str) -> str:
+        trigrams = dict.fromkeys(term[index : index + 3] for index in range(len(term) - 2))
+        return " OR ".join(self._fts_phrase(item) for item in trigrams)
+
+    def get_variables_for_scope(
+        self,
+        session_id: str,
+        function_name: str,
+        scope_ids: list[int] | None = None,
+    ) -> list[dict]:
+        conn = self._reader(session_id)
+        limit = self.config.graph.graph_page_size
+        if scope_ids is None:
+            symbol_ids = [row["rowid"] for row in self._seed_rows(conn, function_name, limit)]
+        else:
+            symbol_ids = scope_ids
+        if not symbol_ids:
+            return []
+
         rows = conn.execute(
-            "SELECT * FROM variables WHERE scope LIKE ? LIMIT ?",
-            (f"%{function_name}%", self.config.graph.graph_page_size),
+            f"""
+            {VARIABLE_SELECT}
+            WHERE variable_rows.scope_id IN (SELECT value FROM json_each(?))
+            ORDER BY variable_rows.scope_id, variable_rows.line
+            LIMIT ?
+            """,
+            (json.dumps(symbol_ids), limit),
         ).fetchall()
-        return [dict(row) for row in rows]
+        return [self._variable_dict(row) for row in rows]
 
     def get_graph_stats(self, session_id: str) -> dict:
-        conn = self._get_connection(session_id)
-        node_count = conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
-        edge_count = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
-        variable_count = conn.execute("SELECT COUNT(*) FROM variables").fetchone()[0]
+        conn = self._reader(session_id)
+        node_count = conn.execute("SELECT COUNT(*) FROM symbols WHERE type IS NOT NULL").fetchone()[0]
+        edge_count = conn.execute("SELECT COUNT(*) FROM edge_rows").fetchone()[0]
+        variable_count = conn.execute("SELECT COUNT(*) FROM variable_rows").fetchone()[0]
         return {
             "nodes": int(node_count),
             "edges": int(edge_count),
@@ -285,10 +1349,20 @@ class SqliteGraphStore:
             "edges": len(edges),
         }
 
+    def get_pool_stats(self, session_id: str) -> dict:
+        return self._get_pool(session_id).stats()
+
+    def loaded_pool_stats(self) -> dict[str, dict]:
+        with self._pools_lock:
+            pools = dict(self._pools)
+        return {session_id: pool.stats() for session_id, pool in pools.items()}
+
     def reset_session(self, session_id: str) -> None:
-        conn = self._connections.pop(session_id, None)
-        if conn is not None:
-            conn.close()
+        with self._pools_lock:
+            pool = self._pools.pop(session_id, None)
+        if pool is not None:
+            pool.close()
         db_path = self._session_db_path(session_id)
-        if db_path.exists():
-            db_path.unlink()
+        for path in (db_path, db_path.with_name(f"{db_path.name}-wal"), db_path.with_name(f"{db_path.name}-shm")):
+            if path.exists():
+                path.unlink()
@@ -0,0 +1,517 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from backend.config.settings import AppConfig
+from backend.utils.metrics import STAGE_SECONDS
+from backend.utils.sqlite_pool import SqliteConnectionPool
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+@lru_cache(maxsize=65536)
+def _identifier_terms(identifier: str) -> tuple[str, ...]:
+    lowered = identifier.lower()
+    terms = [lowered] if len(lowered) >= 2 else []
+    parts = [
+        part.lower()
+        for piece in identifier.split("_")
+        for part in CAMEL_BOUNDARY_PATTERN.split(piece)
+        if len(part) >= 2
+    ]
+    if len(parts) > 1:
+        terms.extend(parts)
+    return tuple(terms)
+
+
+def tokenize_code(text: str) -> list[str]:
+    return [term for identifier in IDENTIFIER_PATTERN.findall(text or "") for term in _identifier_terms(identifier)]
+
+
+def count_terms(text: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for identifier in IDENTIFIER_PATTERN.findall(text or ""):
+        for term in _identifier_terms(identifier):
+            counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+class Bm25Store:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.search_limit = self.config.lexical.search_limit
+        self._pools: dict[str, SqliteConnectionPool] = {}
+        self._indexes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _session_db_path(self, session_id: str) -> Path:
+        return Path(self.config.lexical.index_dir) / session_id / "bm25.db"
+
+    def _get_pool(self, session_id: str) -> SqliteConnectionPool:
+        existing = self._pools.get(session_id)
+        if existing is not None:
+            return existing
+
+        with self._lock:
+            existing = self._pools.get(session_id)
+            if existing is None:
+                existing = SqliteConnectionPool(
+                    self._session_db_path(session_id),
+                    busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+                    initializer=self._init_schema,
+                )
+                self._pools[session_id] = existing
+            return existing
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bm25_docs (
+                id INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                file_path TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                row TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_bm25_docs_file ON bm25_docs(file_path)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bm25_postings (
+                term TEXT PRIMARY KEY,
+                doc_ids BLOB NOT NULL,
+                term_freqs BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bm25_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+        )
+        conn.commit()
+
+    def _get_index(self, session_id: str) -> dict:
+        existing = self._indexes.get(session_id)
+        if existing is not None:
+            return existing
+
+        pool = self._get_pool(session_id)
+        with self._lock:
+            existing = self._indexes.get(session_id)
+            if existing is not None:
+                return existing
+            conn = pool.reader()
+            doc_rows = conn.execute("SELECT id, chunk_id, length, deleted FROM bm25_docs ORDER BY id").fetchall()
+            postings = {
+                row["term"]: (
+                    np.cumsum(self._unpack(row["doc_ids"]), dtype=np.uint32),
+                    self._unpack(row["term_freqs"]).astype(np.uint16),
+                )
+                for row in conn.execute("SELECT term, doc_ids, term_freqs FROM bm25_postings")
+            }
+            # Retired documents keep their ids in the postings, so the arrays must cover those too.
+            size = max(
+                (doc_rows[-1]["id"] + 1) if doc_rows else 0,
+                max((int(doc_ids[-1]) + 1 for doc_ids, _ in postings.values() if len(doc_ids)), default=0),
+            )
+            lengths = np.zeros(size, dtype=np.float32)
+            live = np.zeros(size, dtype=bool)
+            chunk_ids: dict[str, int] = {}
+            for row in doc_rows:
+                lengths[row["id"]] = row["length"]
+                live[row["id"]] = not row["deleted"]
+                chunk_ids[row["chunk_id"]] = row["id"]
+            stale = np.zeros(size, dtype=bool)
+            for doc_ids, _ in postings.values():
+                stale[doc_ids] = True
+            stale &= ~live
+            generation_row = conn.execute("SELECT value FROM bm25_meta WHERE key = 'generation'").fetchone()
+            index = {
+                "lock": threading.Lock(),
+                "snapshot": self._snapshot(postings, lengths, live, stale),
+                "chunk_ids": chunk_ids,
+                "generation": int(generation_row["value"]) if generation_row is not None else 0,
+            }
+            self._indexes[session_id] = index
+            return index
+
+    def add_documents(self, session_id: str, rows: list[dict]) -> int:
+        index = self._get_index(session_id)
+        pool = self._get_pool(session_id)
+        with index["lock"], pool.writer() as conn, conn:
+            snapshot = index["snapshot"]
+            first_id = len(snapshot["lengths"])
+            candidates: dict[str, tuple[dict, str]] = {}
+            for row in rows:
+                chunk_id = row.get("id")
+                if not chunk_id or chunk_id in candidates:
+                    continue
+                encoded = json.dumps(
+                    {
+                        "content": row.get("content"),
+                        "file_path": row.get("file_path"),
+                        "function_name": row.get("function_name"),
+                        "type": row.get("type"),
+                        "metadata": row.get("metadata"),
+                    },
+                    ensure_ascii=False,
+                )
+                candidates[chunk_id] = (row, encoded)
+
+            # Known chunks are skipped when unchanged and live, revived when unchanged but tombstoned,
+            # and otherwise retired so the new content gets a fresh doc id and fresh postings.
+            known = [chunk_id for chunk_id in candidates if chunk_id in index["chunk_ids"]]
+            stored = {
+                stored_row["chunk_id"]: stored_row
+                for stored_row in conn.execute(
+                    """
+                    SELECT id, chunk_id, deleted, row FROM bm25_docs
+                    WHERE chunk_id IN (SELECT value FROM json_each(?))
+                    """,
+                    (json.dumps(known),),
+                )
+            }
+            revived: list[int] = []
+            retired: list[int] = []
+            for chunk_id in known:
+                stored_row = stored.get(chunk_id)
+                if stored_row is None:
+                    continue
+                if stored_row["row"] == candidates[chunk_id][1]:
+                    if stored_row["deleted"]:
+                        revived.append(stored_row["id"])
+                    del candidates[chunk_id]
+                else:
+                    retired.append(stored_row["id"])
+
+            doc_records: list[tuple] = []
+            new_chunk_ids: dict[str, int] = {}
+            flat_terms: list[str] = []
+            flat_freqs: list[int] = []
+            flat_docs: list[int] = []
+            for chunk_id, (row, encoded) in candidates.items():
+                counts = count_terms(row.get("content") or "")
+                doc_id = first_id + len(doc_records)
+                new_chunk_ids[chunk_id] = doc_id
+                flat_terms.extend(counts)
+                flat_freqs.extend(counts.values())
+                flat_docs.extend([doc_id] * len(counts))
+                doc_records.append(
+                    (doc_id, chunk_id, str(row.get("file_path") or ""), sum(counts.values()), encoded)
+                )
+            if not doc_records and not revived:
+                return 0
+
+            if revived:
+                conn.execute(
+                    "UPDATE bm25_docs SET deleted = 0 WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(revived),),
+                )
+            if retired:
+                conn.execute(
+                    "DELETE FROM bm25_docs WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(retired),),
+                )
+            if not doc_records:
+                live = snapshot["live"].copy()
+                live[revived] = True
+                stale = snapshot["stale"].copy()
+                stale[revived] = False
+                index["snapshot"] = self._snapshot(snapshot["postings"], snapshot["lengths"], live, stale)
+                self._bump_generation(conn, index)
+                return len(revived)
+
+            conn.executemany(
+                "INSERT INTO bm25_docs (id, chunk_id, file_path, length, row) VALUES (?, ?, ?, ?, ?)",
+                doc_records,
+            )
+            next_id = first_id + len(doc_records)
+            lengths = np.zeros(next_id, dtype=np.float32)
+            lengths[:first_id] = snapshot["lengths"]
+            lengths[first_id:] = [record[3] for record in doc_records]
+            live = np.ones(next_id, dtype=bool)
+            live[:first_id] = snapshot["live"]
+            live[revived] = True
+            live[retired] = False
+            stale = np.zeros(next_id, dtype=bool)
+            stale[:first_id] = snapshot["stale"]
+            stale[revived] = False
+            stale[retired] = True
+
+            # Group the (term, doc, freq) triples by term; the stable sort keeps doc ids ascending.
+            vocabulary: dict[str, int] = {}
+            term_ids = np.fromiter(
+                (vocabulary.setdefault(term, len(vocabulary)) for term in flat_terms),
+                dtype=np.int64,
+                count=len(flat_terms),
+            )
+            order = np.argsort(term_ids, kind="stable")
+            docs = np.array(flat_docs, dtype=np.uint32)[order]
+            freqs = np.minimum(np.array(flat_freqs, dtype=np.int64), 65535).astype(np.uint16)[order]
+            bounds = np.concatenate(([0], np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)))))
+
+            postings = dict(snapshot["postings"])
+            merged: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+            for term, term_id in vocabulary.items():
+                new_ids = docs[bounds[term_id] : bounds[term_id + 1]]
+                new_freqs = freqs[bounds[term_id] : bounds[term_id + 1]]
+                existing = postings.get(term)
+                if existing is not None:
+                    new_ids = np.concatenate((existing[0], new_ids))
+                    new_freqs = np.concatenate((existing[1], new_freqs))
+                merged[term] = (new_ids, new_freqs)
+            conn.executemany(
+                "INSERT OR REPLACE INTO bm25_postings (term, doc_ids, term_freqs) VALUES (?, ?, ?)",
+                [
+                    (term, self._pack(np.diff(doc_ids, prepend=np.uint32(0))), self._pack(term_freqs))
+                    for term, (doc_ids, term_freqs) in merged.items()
+                ],
+            )
+            postings.update(merged)
+            index["chunk_ids"].update(new_chunk_ids)
+            snapshot = self._snapshot(postings, lengths, live, stale)
+            if self._needs_compaction(snapshot):
+                snapshot = self._compact(conn, index, snapshot)
+            index["snapshot"] = snapshot
+            self._bump_generation(conn, index)
+            return len(doc_records) + len(revived)
+
+    def _pack(self, values: np.ndarray) -> bytes:
+        # One width byte, then the values in the narrowest unsigned type that holds them.
+        peak = int(values.max()) if len(values) else 0
+        dtype = np.uint8 if peak <= 0xFF else np.uint16 if peak <= 0xFFFF else np.uint32
+        return bytes([np.dtype(dtype).itemsize]) + values.astype(dtype).tobytes()
+
+    def _unpack(self, blob: bytes) -> np.ndarray:
+        dtype = {1: np.uint8, 2: np.uint16, 4: np.uint32}[blob[0]]
+        return np.frombuffer(blob, dtype=dtype, offset=1)
+
+    def _snapshot(self, postings: dict, lengths: np.ndarray, live: np.ndarray, stale: np.ndarray) -> dict:
+        # Searches read one snapshot reference, so postings never point past the lengths they see.
+        # Writers build a new snapshot and publish it with a single assignment. `stale` marks dead ids
+        # that postings still reference; purged ids are neither live nor stale.
+        document_count = int(live.sum())
+        stale_count = int(stale.sum())
+        return {
+            "postings": postings,
+            "lengths": lengths,
+            "live": live,
+            "stale": stale,
+            "document_count": document_count,
+            "stale_count": stale_count,
+            "has_deleted": stale_count > 0,
+            "average_length": float(lengths[live].mean()) if document_count else 1.0,
+        }
+
+    def _needs_compaction(self, snapshot: dict) -> bool:
+        stale_count = snapshot["stale_count"]
+        total = snapshot["document_count"] + stale_count
+        return stale_count > 0 and stale_count >= self.config.lexical.compact_dead_ratio * total
+
+    def _compact(self, conn: sqlite3.Connection, index: dict, snapshot: dict) -> dict:
+        # Purges tombstoned rows and dead postings. Doc ids are kept, so a concurrent search never
+        # resolves an id from its snapshot to a different row; only the per-document arrays keep slots.
+        live = snapshot["live"]
+        purged = [row["chunk_id"] for row in conn.execute("SELECT chunk_id FROM bm25_docs WHERE deleted = 1")]
+        conn.execute("DELETE FROM bm25_docs WHERE deleted = 1")
+        postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        rewritten: list[tuple[str, bytes, bytes]] = []
+        emptied: list[str] = []
+        for term, (doc_ids, term_freqs) in snapshot["postings"].items():
+            keep = live[doc_ids]
+            if keep.all():
+                postings[term] = (doc_ids, term_freqs)
+                continue
+            if not keep.any():
+                emptied.append(term)
+                continue
+            doc_ids, term_freqs = doc_ids[keep], term_freqs[keep]
+            postings[term] = (doc_ids, term_freqs)
+            rewritten.append((term, self._pack(np.diff(doc_ids, prepend=np.uint32(0))), self._pack(term_freqs)))
+        conn.executemany(
+            "INSERT OR REPLACE INTO bm25_postings (term, doc_ids, term_freqs) VALUES (?, ?, ?)",
+            rewritten,
+        )
+        conn.execute(
+            "DELETE FROM bm25_postings WHERE term IN (SELECT value FROM json_each(?))",
+            (json.dumps(emptied),),
+        )
+        for chunk_id in purged:
+            index["chunk_ids"].pop(chunk_id, None)
+        lengths = snapshot["lengths"].copy()
+        lengths[~live] = 0.0
+        return self._snapshot(postings, lengths, live, np.zeros(len(live), dtype=bool))
+
+    def delete_file(self, session_id: str, file_path: str) -> int:
+        return self.delete_files(session_id, [file_path])
+
+    def delete_files(self, session_id: str, file_paths: list[str]) -> int:
+        if not file_paths:
+            return 0
+        index = self._get_index(session_id)
+        pool = self._get_pool(session_id)
+        encoded_paths = json.dumps(list(file_paths))
+        with index["lock"], pool.writer() as conn, conn:
+            doc_ids = [
+                row["id"]
+                for row in conn.execute(
+                    """
+                    SELECT id FROM bm25_docs
+                    WHERE file_path IN (SELECT value FROM json_each(?)) AND deleted = 0
+                    """,
+                    (encoded_paths,),
+                )
+            ]
+            if not doc_ids:
+                return 0
+            conn.execute(
+                "UPDATE bm25_docs SET deleted = 1 WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(doc_ids),),
+            )
+            snapshot = index["snapshot"]
+            live = snapshot["live"].copy()
+            live[doc_ids] = False
+            stale = snapshot["stale"].copy()
+            stale[doc_ids] = True
+            index["snapshot"] = self._snapshot(snapshot["postings"], snapshot["lengths"], live, stale)
+            self._bump_generation(conn, index)
+            return len(doc_ids)
+
+    def _bump_generation(self, conn: sqlite3.Connection, index: dict) -> None:
+        conn.execute(
+            """
+            INSERT INTO bm25_meta (key, value) VALUES ('generation', 1)
+            ON CONFLICT (key) DO UPDATE SET value = value + 1
+            """
+        )
+        index["generation"] += 1
+
+    def file_paths(self, session_id: str) -> list[str]:
+        rows = self._get_pool(session_id).reader().execute(
+            "SELECT DISTINCT file_path FROM bm25_docs WHERE deleted = 0"
+        ).fetchall()
+        return [row["file_path"] for row in rows]
+
+    def get_generation(self, session_id: str) -> int:
+        return int(self._get_index(session_id)["generation"])
+
+    def memory_stats(self) -> dict[str, int]:
+        with self._lock:
+            indexes = dict(self._indexes)
+        snapshots = {session_id: index["snapshot"] for session_id, index in indexes.items()}
+        return {
+            session_id: int(
+                snapshot["lengths"].nbytes
+                + snapshot["live"].nbytes
+                + sum(doc_ids.nbytes + freqs.nbytes for doc_ids, freqs in snapshot["postings"].values())
+            )
+            for session_id, snapshot in snapshots.items()
+        }
+
+    def total_documents(self, session_id: str) -> int:
+        return self._get_index(session_id)["snapshot"]["document_count"]
+
+    @STAGE_SECONDS.time(stage="lexical_search")
+    def search(
+        self,
+        session_id: str,
+        query: str,
+        filters: dict | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        snapshot = self._get_index(session_id)["snapshot"]
+        limit = limit or self.search_limit
+        postings = snapshot["postings"]
+        lengths = snapshot["lengths"]
+        live = snapshot["live"]
+        has_deleted = snapshot["has_deleted"]
+        terms = [term for term in dict.fromkeys(tokenize_code(query)) if term in postings]
+        document_count = snapshot["document_count"]
+        if not terms or document_count == 0:
+            return []
+
+        k1 = self.config.lexical.k1
+        b = self.config.lexical.b
+        average_length = snapshot["average_length"] or 1.0
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        for term in terms:
+            doc_ids, term_freqs = postings[term]
+            # Tombstoned and retired documents stay in the postings until compaction; they must not
+            # count towards the term's document frequency.
+            frequency = int(np.count_nonzero(live[doc_ids])) if has_deleted else len(doc_ids)
+            if frequency == 0:
+                continue
+            idf = math.log(1.0 + (document_count - frequency + 0.5) / (frequency + 0.5))
+            freqs = term_freqs.astype(np.float32)
+            norms = k1 * (1.0 - b + b * lengths[doc_ids] / average_length)
+            scores[doc_ids] += idf * freqs * (k1 + 1.0) / (freqs + norms)
+        if has_deleted:
+            scores[~live] = 0.0
+
+        candidates = np.flatnonzero(scores)
+        if filters and any(value is not None for value in filters.values()):
+            top = candidates[np.argsort(-scores[candidates], kind="stable")]
+        elif len(candidates) > limit:
+            top = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        conn = self._get_pool(session_id).reader()
+        output: list[dict] = []
+        for start in range(0, len(top), limit):
+            batch = [int(doc_id) for doc_id in top[start : start + limit]]
+            rows = {
+                row["id"]: row
+                for row in conn.execute(
+                    "SELECT id, chunk_id, row FROM bm25_docs WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(batch),),
+                )
+            }
+            for doc_id in batch:
+                row = rows.get(doc_id)
+                if row is None:
+                    continue
+                payload = json.loads(row["row"])
+                metadata = payload.get("metadata") or {}
+                if filters and not self._matches_filters(metadata, filters):
+                    continue
+                output.append({"id": row["chunk_id"], "score": float(scores[doc_id]), **payload, "metadata": metadata})
+                if len(output) >= limit:
+                    return output
+        return output
+
+    def reset_session(self, session_id: str) -> None:
+        with self._lock:
+            pool = self._pools.pop(session_id, None)
+            self._indexes.pop(session_id, None)
+        if pool is not None:
+            pool.close()
+        db_path = self._session_db_path(session_id)
+        for path in (db_path, db_path.with_name(f"{db_path.name}-wal"), db_path.with_name(f"{db_path.name}-shm")):
+            if path.exists():
+                path.unlink()
+
+    def _matches_filters(self, metadata: dict, filters: dict) -> bool:
+        for key, expected in filters.items():
+            if expected is None:
+                continue
+            actual = metadata.get(key)
+            if actual is None:
+                return False
+            if str(actual).strip().lower() != str(expected).strip().lower():
+                return False
+        return True
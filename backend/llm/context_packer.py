@@ -0,0 +1,181 @@
+import json
+import math
+import os
+from collections import deque
+
+from backend.config.settings import AppConfig
+
+CHARS_PER_TOKEN = 4
+
+
+class ContextPacker:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+
+    def estimate_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def pack(self, function_name: str, context: dict, repo_path: str | None = None) -> str:
+        nodes = self._unique(context.get("graph_nodes") or [], key=lambda node: node.get("id"))
+        edges = self._unique(
+            context.get("graph_edges") or [],
+            key=lambda edge: (edge.get("source"), edge.get("target"), edge.get("type")),
+        )
+        hits = self._unique(
+            context.get("semantic_hits") or [],
+            key=lambda hit: (hit.get("file_path"), (hit.get("content") or "").strip()),
+        )
+        variables = self._unique(
+            context.get("variables") or [],
+            key=lambda variable: (variable.get("scope"), variable.get("name")),
+        )
+        root = self._path_root(repo_path, nodes, hits)
+        depths = self._node_depths(function_name, nodes, edges)
+
+        short_ids = {node["id"]: f"n{position}" for position, node in enumerate(nodes, start=1)}
+        node_priority = {node["id"]: 100 - 10 * depths.get(node["id"], 5) for node in nodes}
+
+        # (priority, section, order, text, node ids the line refers to); sections render in a fixed order
+        # regardless of priority. Referencing lines rank below their nodes, so nodes are always decided first.
+        items: list[tuple[int, int, int, str, tuple[str, ...]]] = []
+        for order, node in enumerate(nodes):
+            items.append((node_priority[node["id"]], 0, order, self._node_line(node, short_ids, root), ()))
+        for order, edge in enumerate(edges):
+            source, target = edge.get("source"), edge.get("target")
+            if source not in short_ids or target not in short_ids:
+                continue
+            priority = min(node_priority[source], node_priority[target]) - 1
+            items.append((priority, 1, order, self._edge_line(edge, short_ids), (source, target)))
+        for order, (scope, names) in enumerate(self._variables_by_scope(variables).items()):
+            priority = node_priority.get(scope, 60) - 2
+            label = short_ids.get(scope, scope or "module")
+            requires = (scope,) if scope in short_ids else ()
+            items.append((priority, 2, order, f"{label}: {', '.join(names)}", requires))
+        for order, hit in enumerate(hits):
+            items.append((90 - 5 * order, 3, order, self._hit_block(hit, order + 1, root), ()))
+
+        headings = [
+            "Call graph nodes (id kind name location):",
+            "Call graph edges:",
+            "Variables by scope:",
+            "Related code:",
+        ]
+        budget = self.config.llm.context_token_budget
+        selected: list[tuple[int, int, int, str, tuple[str, ...]]] = []
+        kept_nodes: set[str] = set()
+        used = sum(self.estimate_tokens(heading) + 1 for heading in headings)
+        # Items are kept or dropped whole; a line is only kept when every node it names was kept.
+        for item in sorted(items, key=lambda entry: (-entry[0], entry[1], entry[2])):
+            if any(node_id not in kept_nodes for node_id in item[4]):
+                continue
+            cost = self.estimate_tokens(item[3]) + 1
+            if used + cost > budget:
+                continue
+            selected.append(item)
+            used += cost
+            if item[1] == 0:
+                kept_nodes.add(nodes[item[2]]["id"])
+
+        sections: list[str] = []
+        for section, heading in enumerate(headings):
+            lines = [
+                entry[3]
+                for entry in sorted(selected, key=lambda entry: entry[2])
+                if entry[1] == section
+            ]
+            if lines:
+                sections.append("\n".join([heading, *lines]))
+        return "\n\n".join(sections) if sections else "No graph or code context was retrieved."
+
+    def _unique(self, rows: list[dict], key) -> list[dict]:
+        seen: set = set()
+        output: list[dict] = []
+        for row in rows:
+            marker = key(row)
+            if marker in seen:
+                continue
+            seen.add(marker)
+            output.append(row)
+        return output
+
+    def _path_root(self, repo_path: str | None, nodes: list[dict], hits: list[dict]) -> str:
+        if repo_path:
+            return os.path.abspath(repo_path)
+        paths = [row.get("file_path") for row in [*nodes, *hits] if row.get("file_path")]
+        absolute = [os.path.abspath(path) for path in paths]
+        if len(absolute) < 2:
+            return os.path.dirname(absolute[0]) if absolute else ""
+        try:
+            return os.path.commonpath(absolute)
+        except ValueError:
+            return ""
+
+    def _relative(self, file_path: str | None, root: str) -> str:
+        if not file_path:
+            return ""
+        if not root:
+            return file_path
+        relative = os.path.relpath(os.path.abspath(file_path), root)
+        return file_path if relative.startswith("..") else relative.replace("\\", "/")
+
+    def _node_depths(self, function_name: str, nodes: list[dict], edges: list[dict]) -> dict[str, int]:
+        target = function_name.strip().lower()
+        seeds = [node["id"] for node in nodes if (node.get("name") or "").lower() == target]
+        if not seeds:
+            seeds = [node["id"] for node in nodes[:1]]
+        neighbours: dict[str, list[str]] = {}
+        for edge in edges:
+            neighbours.setdefault(edge.get("source"), []).append(edge.get("target"))
+            neighbours.setdefault(edge.get("target"), []).append(edge.get("source"))
+
+        depths = {seed: 0 for seed in seeds}
+        queue = deque(seeds)
+        while queue:
+            current = queue.popleft()
+            for neighbour in neighbours.get(current, []):
+                if neighbour not in depths:
+                    depths[neighbour] = depths[current] + 1
+                    queue.append(neighbour)
+        return depths
+
+    def _node_line(self, node: dict, short_ids: dict[str, str], root: str) -> str:
+        location = self._relative(node.get("file_path"), root)
+        if location and node.get("line_start"):
+            location = f"{location}:{node['line_start']}"
+            if node.get("line_end") and node["line_end"] != node["line_start"]:
+                location = f"{location}-{node['line_end']}"
+        return " ".join(
+            part for part in (short_ids[node["id"]], node.get("type") or "", node.get("name") or node["id"], location) if part
+        )
+
+    def _edge_line(self, edge: dict, short_ids: dict[str, str]) -> str:
+        line = self._metadata(edge.get("metadata")).get("line")
+        suffix = f" @{line}" if line else ""
+        return f"{short_ids[edge['source']]} -{edge.get('type') or 'calls'}-> {short_ids[edge['target']]}{suffix}"
+
+    def _variables_by_scope(self, variables: list[dict]) -> dict[str, list[str]]:
+        grouped: dict[str, list[str]] = {}
+        for variable in variables:
+            line = self._metadata(variable.get("metadata")).get("line")
+            name = f"{variable.get('name')}@{line}" if line else str(variable.get("name"))
+            grouped.setdefault(variable.get("scope") or "module", []).append(name)
+        return grouped
+
+    def _hit_block(self, hit: dict, rank: int, root: str) -> str:
+        location = self._relative(hit.get("file_path"), root) or hit.get("type") or "external"
+        offset = self._metadata(hit.get("metadata")).get("offset")
+        if offset is not None:
+            location = f"{location} @{offset}"
+        content = (hit.get("content") or "").strip()
+        return f"[h{rank}] {location}\n{content}"
+
+    def _metadata(self, value: object) -> dict:
+        if isinstance(value, dict):
+            return value
+        if isinstance(value, str) and value:
+            try:
+                parsed = json.loads(value)
+            except json.JSONDecodeError:
+                return {}
+            return parsed if isinstance(parsed, dict) else {}
+        return {}
@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from backend.config.settings import AppConfig
+from backend.utils.sqlite_pool import SqliteConnectionPool
+
+
+class ExplanationCache:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.enabled = self.config.llm.cache_enabled
+        self.ttl_seconds = self.config.llm.cache_ttl_seconds
+        self.max_entries = self.config.llm.cache_max_entries
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bypassed": 0,
+        }
+        self.pool: SqliteConnectionPool | None = None
+        if self.enabled:
+            self.pool = SqliteConnectionPool(
+                Path(self.config.llm.cache_path),
+                busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+                initializer=self._init_schema,
+            )
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS explanation_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                template_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_explanation_cache_created ON explanation_cache(created_at)")
+        conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        if self.pool is None:
+            return None
+        row = self.pool.reader().execute(
+            "SELECT response, created_at FROM explanation_cache WHERE cache_key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        if self.ttl_seconds > 0 and time.time() - row["created_at"] > self.ttl_seconds:
+            self._count("expired")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(row["response"])
+
+    def put(self, key: str, model: str, template_version: str, response: dict) -> None:
+        if self.pool is None:
+            return
+        now = time.time()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO explanation_cache (cache_key, model, template_version, response, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, model, template_version, json.dumps(response, ensure_ascii=False), now),
+            )
+            evicted = 0
+            if self.ttl_seconds > 0:
+                evicted += conn.execute(
+                    "DELETE FROM explanation_cache WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                ).rowcount
+            if self.max_entries > 0:
+                evicted += conn.execute(
+                    """
+                    DELETE FROM explanation_cache
+                    WHERE cache_key IN (
+                        SELECT cache_key FROM explanation_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+        self._count("stores")
+        self._count("evictions", evicted)
+
+    def record_bypass(self) -> None:
+        self._count("bypassed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["hits"] / lookups, 4) if lookups else 0.0
+        metrics["enabled"] = self.pool is not None
+        metrics["entries"] = 0
+        if self.pool is not None:
+            metrics["entries"] = self.pool.reader().execute("SELECT COUNT(*) FROM explanation_cache").fetchone()[0]
+        return metrics
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
@@ -1,76 +1,346 @@
+import asyncio
+import hashlib
 import os
 import json
+import threading
+import time
+from collections.abc import Iterator
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 
 from backend.config.settings import AppConfig
+from backend.llm.context_packer import ContextPacker
+from backend.llm.explanation_cache import ExplanationCache
+from backend.llm.json_field_stream import JsonFieldStream
+from backend.utils.circuit_breaker import CircuitBreakerRegistry
+from backend.utils.metrics import ERRORS, STAGE_SECONDS
+from backend.utils.retry import Deadline, DeadlineExceeded, aretry_call, retry_call
+from backend.utils.tracing import span
+
+
+PROMPT_TEMPLATE_VERSION = "2"
+EXPLANATION_FIELDS = ("summary", "execution_flow", "dependencies", "variables", "improvements", "confidence_score")
 
 
 class ExplanationEngine:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(
+        self,
+        config: AppConfig,
+        cache: ExplanationCache | None = None,
+        breakers: CircuitBreakerRegistry | None = None,
+    ) -> None:
         self.config = config
         api_key = os.getenv(self.config.llm.api_key_env_var, "")
+        # Retries are owned by retry_call/aretry_call so they share the deadline and breaker.
         self.client = OpenAI(
             base_url=self.config.llm.base_url,
             api_key=api_key,
+            timeout=self.config.runtime.request_timeout_seconds,
+            max_retries=0,
         )
+        # One async client for the process, so upstream calls share a keep-alive connection pool.
+        max_concurrency = max(1, self.config.llm.max_concurrency)
+        self.async_client = AsyncOpenAI(
+            base_url=self.config.llm.base_url,
+            api_key=api_key,
+            timeout=self.config.runtime.request_timeout_seconds,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                ),
+            ),
+        )
+        self.packer = ContextPacker(config)
+        self.cache = cache
+        self.breaker = breakers.get(f"llm:{self.config.llm.base_url}") if breakers is not None else None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._stats_lock = threading.Lock()
+        self._upstream_stats = {"upstream_calls": 0, "coalesced": 0, "failures": 0}
 
-    def explain(self, function_name: str, context: dict) -> dict:
-        prompt = self._build_prompt(function_name, context)
-        response_text = ""
-        try:
-            response = self.client.chat.completions.create(
-                model=self.config.llm.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._system_instruction(),
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-            )
-            response_text = (response.choices[0].message.content or "").strip()
-        except Exception:
-            return self._fallback_response(
-                f"Execution-aware explanation for '{function_name}' is currently unavailable because the LLM service could not be reached."
+    def explain(
+        self,
+        function_name: str,
+        context: dict,
+        repo_path: str | None = None,
+        bypass_cache: bool = False,
+    ) -> dict:
+        with span("llm.explain", function=function_name):
+            with span("llm.build_prompt"):
+                prompt = self._build_prompt(function_name, context, repo_path)
+            return self._explain_prompt(
+                prompt,
+                bypass_cache,
+                f"Execution-aware explanation for '{function_name}' is currently unavailable because the LLM service could not be reached.",
             )
 
-        return self._normalize_response(response_text)
+    def explain_snippet(self, code: str, language: str, bypass_cache: bool = False) -> dict:
+        prompt = self._build_snippet_prompt(code, language)
+        return self._explain_prompt(
+            prompt,
+            bypass_cache,
+            "Snippet explanation is currently unavailable because the LLM service could not be reached.",
+        )
+
+    def stream_explain(
+        self,
+        function_name: str,
+        context: dict,
+        repo_path: str | None = None,
+        bypass_cache: bool = False,
+    ) -> Iterator[dict]:
+        prompt = self._build_prompt(function_name, context, repo_path)
+        return self._stream_prompt(
+            prompt,
+            bypass_cache,
+            f"Execution-aware explanation for '{function_name}' is currently unavailable because the LLM service could not be reached.",
+        )
 
-    def explain_snippet(self, code: str, language: str) -> dict:
+    def stream_explain_snippet(self, code: str, language: str, bypass_cache: bool = False) -> Iterator[dict]:
         prompt = self._build_snippet_prompt(code, language)
+        return self._stream_prompt(
+            prompt,
+            bypass_cache,
+            "Snippet explanation is currently unavailable because the LLM service could not be reached.",
+        )
+
+    async def aexplain(
+        self,
+        function_name: str,
+        context: dict,
+        repo_path: str | None = None,
+        bypass_cache: bool = False,
+        raise_errors: bool = False,
+    ) -> dict:
+        with span("llm.explain", function=function_name):
+            with span("llm.build_prompt"):
+                prompt = self._build_prompt(function_name, context, repo_path)
+            return await self._aexplain_prompt(
+                prompt,
+                bypass_cache,
+                f"Execution-aware explanation for '{function_name}' is currently unavailable because the LLM service could not be reached.",
+                raise_errors,
+            )
+
+    async def aexplain_snippet(self, code: str, language: str, bypass_cache: bool = False) -> dict:
+        prompt = self._build_snippet_prompt(code, language)
+        return await self._aexplain_prompt(
+            prompt,
+            bypass_cache,
+            "Snippet explanation is currently unavailable because the LLM service could not be reached.",
+        )
+
+    def is_cached(self, function_name: str, context: dict, repo_path: str | None = None) -> bool:
+        if self.cache is None:
+            return False
+        prompt = self._build_prompt(function_name, context, repo_path)
+        return self.cache.get(self._prompt_key(prompt)) is not None
+
+    def estimate_prompt_tokens(self, function_name: str, context: dict, repo_path: str | None = None) -> int:
+        prompt = self._build_prompt(function_name, context, repo_path)
+        return self.packer.estimate_tokens(self._system_instruction()) + self.packer.estimate_tokens(prompt)
+
+    def get_upstream_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._upstream_stats)
+        stats["in_flight"] = len(self._in_flight)
+        stats["max_concurrency"] = max(1, self.config.llm.max_concurrency)
+        stats["circuit"] = self.breaker.snapshot() if self.breaker is not None else None
+        return stats
+
+    async def _aexplain_prompt(
+        self,
+        prompt: str,
+        bypass_cache: bool,
+        unavailable_message: str,
+        raise_errors: bool = False,
+    ) -> dict:
+        # The cache is SQLite-backed; its reads and writer-locked puts must not block the event loop.
+        cache_key, cached = await asyncio.to_thread(self._cached_response, prompt, bypass_cache)
+        if cached is not None:
+            return cached
+
+        # Identical prompts already in flight share one upstream call.
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._acomplete(cache_key, prompt))
+            self._in_flight[cache_key] = in_flight
+            in_flight.add_done_callback(lambda done: self._forget_in_flight(cache_key, done))
+        else:
+            self._count_upstream("coalesced")
+
+        try:
+            return await asyncio.shield(in_flight)
+        except Exception:
+            if raise_errors:
+                raise
+            return self._fallback_response(unavailable_message)
+
+    async def _acomplete(self, cache_key: str, prompt: str) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.config.llm.max_concurrency))
+        deadline = Deadline(self.config.runtime.deadline_seconds)
+        async with self._semaphore:
+            if deadline.expired():
+                raise DeadlineExceeded("Deadline expired while waiting for an upstream slot.")
+            self._count_upstream("upstream_calls")
+            try:
+                with STAGE_SECONDS.time(stage="llm_call"), span("llm.upstream"):
+                    response = await aretry_call(
+                        lambda: self.async_client.chat.completions.create(
+                            model=self.config.llm.model,
+                            messages=self._messages(prompt),
+                            timeout=self._attempt_timeout(deadline),
+                        ),
+                        **self._retry_options(deadline),
+                    )
+            except Exception:
+                self._count_upstream("failures")
+                ERRORS.inc(component="llm")
+                raise
+        response_text = (response.choices[0].message.content or "").strip()
+        return await asyncio.to_thread(self._finish_response, cache_key, response_text)
+
+    def _forget_in_flight(self, cache_key: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(cache_key) is future:
+            del self._in_flight[cache_key]
+        if not future.cancelled():
+            future.exception()
+
+    def _count_upstream(self, name: str) -> None:
+        with self._stats_lock:
+            self._upstream_stats[name] += 1
+
+    def _explain_prompt(self, prompt: str, bypass_cache: bool, unavailable_message: str) -> dict:
+        cache_key, cached = self._cached_response(prompt, bypass_cache)
+        if cached is not None:
+            return cached
+
         response_text = ""
+        deadline = Deadline(self.config.runtime.deadline_seconds)
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.llm.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._system_instruction(),
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-            )
+            with STAGE_SECONDS.time(stage="llm_call"), span("llm.upstream"):
+                response = retry_call(
+                    lambda: self.client.chat.completions.create(
+                        model=self.config.llm.model,
+                        messages=self._messages(prompt),
+                        timeout=self._attempt_timeout(deadline),
+                    ),
+                    **self._retry_options(deadline),
+                )
             response_text = (response.choices[0].message.content or "").strip()
         except Exception:
-            return self._fallback_response(
-                "Snippet explanation is currently unavailable because the LLM service could not be reached."
+            ERRORS.inc(component="llm")
+            return self._fallback_response(unavailable_message)
+
+        return self._finish_response(cache_key, response_text)
+
+    def _stream_prompt(self, prompt: str, bypass_cache: bool, unavailable_message: str) -> Iterator[dict]:
+        cache_key, cached = self._cached_response(prompt, bypass_cache)
+        if cached is not None:
+            for name in EXPLANATION_FIELDS:
+                yield {"event": "field", "name": name, "value": cached.get(name)}
+            yield {"event": "final", "explanation": cached, "cached": True}
+            return
+
+        parser = JsonFieldStream()
+        parts: list[str] = []
+        deadline = Deadline(self.config.runtime.deadline_seconds)
+        started = time.perf_counter()
+        try:
+            # Only opening the stream is retried; a retry after tokens were sent would duplicate them.
+            stream = retry_call(
+                lambda: self.client.chat.completions.create(
+                    model=self.config.llm.model,
+                    messages=self._messages(prompt),
+                    stream=True,
+                    timeout=self._attempt_timeout(deadline),
+                ),
+                **self._retry_options(deadline),
             )
-        return self._normalize_response(response_text)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                parts.append(delta)
+                yield {"event": "token", "text": delta}
+                for name, value in parser.feed(delta):
+                    if name in EXPLANATION_FIELDS:
+                        yield {"event": "field", "name": name, "value": self._normalize_field(name, value)}
+        except Exception:
+            ERRORS.inc(component="llm")
+            yield {"event": "final", "explanation": self._fallback_response(unavailable_message), "cached": False}
+            return
+
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_stream")
+        result = self._finish_response(cache_key, "".join(parts).strip())
+        yield {"event": "final", "explanation": result, "cached": False}
+
+    def _retry_options(self, deadline: Deadline) -> dict:
+        return {
+            "attempts": self.config.runtime.retry_attempts,
+            "initial_backoff_seconds": self.config.runtime.retry_backoff_seconds,
+            "multiplier": self.config.runtime.retry_backoff_multiplier,
+            "max_backoff_seconds": self.config.runtime.retry_max_backoff_seconds,
+            "deadline": deadline,
+            "breaker": self.breaker,
+        }
+
+    def _attempt_timeout(self, deadline: Deadline) -> float:
+        return max(0.001, deadline.clamp(float(self.config.runtime.request_timeout_seconds)))
+
+    def _prompt_key(self, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.config.llm.model, PROMPT_TEMPLATE_VERSION, self._system_instruction(), prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
 
-    def _build_prompt(self, function_name: str, context: dict) -> str:
-        context_json = json.dumps(context, ensure_ascii=False, default=str)
+    def _cached_response(self, prompt: str, bypass_cache: bool) -> tuple[str, dict | None]:
+        cache_key = self._prompt_key(prompt)
+        if self.cache is None:
+            return cache_key, None
+        if bypass_cache:
+            self.cache.record_bypass()
+            return cache_key, None
+        with span("llm.cache_lookup") as current:
+            cached = self.cache.get(cache_key)
+            if current is not None:
+                current.set(hit=cached is not None)
+        return cache_key, cached
+
+    def _finish_response(self, cache_key: str, response_text: str) -> dict:
+        result = self._normalize_response(response_text)
+        # Fallbacks for unparseable output are not cached so the next call can retry the model.
+        if self.cache is not None and self._safe_json_parse(self._strip_code_fences(response_text)):
+            self.cache.put(cache_key, self.config.llm.model, PROMPT_TEMPLATE_VERSION, result)
+        return result
+
+    def _messages(self, prompt: str) -> list[dict]:
+        return [
+            {
+                "role": "system",
+                "content": self._system_instruction(),
+            },
+            {
+                "role": "user",
+                "content": prompt,
+            },
+        ]
+
+    def _build_prompt(self, function_name: str, context: dict, repo_path: str | None = None) -> str:
+        # The packer already fits the context to the token budget; slicing here would cut items mid-way.
+        packed_context = self.packer.pack(function_name, context, repo_path)
         return (
             "Explain a function using execution-aware context.\n"
             f"Target function: {function_name}\n"
-            "Retrieved context (JSON):\n"
-            f"{context_json[: self.config.llm.max_context_chars]}"
+            "Retrieved context:\n"
+            f"{packed_context}"
         )
 
     def _build_snippet_prompt(self, code: str, language: str) -> str:
@@ -97,14 +367,12 @@ class ExplanationEngine:
         if not parsed:
             return self._fallback_response(cleaned or "No explanation content returned by model.")
 
-        return {
-            "summary": self._to_clean_text(parsed.get("summary")),
-            "execution_flow": self._to_clean_text(parsed.get("execution_flow")),
-            "dependencies": self._to_clean_text(parsed.get("dependencies")),
-            "variables": self._to_clean_text(parsed.get("variables")),
-            "improvements": self._to_clean_text(parsed.get("improvements")),
-            "confidence_score": self._normalize_confidence(parsed.get("confidence_score")),
-        }
+        return {name: self._normalize_field(name, parsed.get(name)) for name in EXPLANATION_FIELDS}
+
+    def _normalize_field(self, name: str, value: object) -> object:
+        if name == "confidence_score":
+            return self._normalize_confidence(value)
+        return self._to_clean_text(value)
 
     def _fallback_response(self, summary: str) -> dict:
         return {
@@ -0,0 +1,75 @@
+import json
+
+
+class JsonFieldStream:
+    def __init__(self) -> None:
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._key: str | None = None
+        self._expect_value = False
+        self._value_start = -1
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        self._text += chunk
+        fields: list[tuple[str, object]] = []
+        text = self._text
+        while self._position < len(text):
+            position = self._position
+            char = text[position]
+            self._position += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(fields, text[self._string_start : position + 1])
+                continue
+
+            if self._expect_value and not char.isspace():
+                self._expect_value = False
+                self._value_start = position
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1 and self._value_start >= 0:
+                    self._emit(fields, text[self._value_start : position])
+                self._depth -= 1
+                if self._depth == 1 and self._value_start >= 0:
+                    self._emit(fields, text[self._value_start : position + 1])
+            elif self._depth == 1 and char == ":" and self._key is not None and self._value_start < 0:
+                self._expect_value = True
+            elif self._depth == 1 and char == "," and self._value_start >= 0:
+                self._emit(fields, text[self._value_start : position])
+        return fields
+
+    def _close_string(self, fields: list[tuple[str, object]], literal: str) -> None:
+        if self._key is None:
+            try:
+                self._key = json.loads(literal)
+            except json.JSONDecodeError:
+                self._key = None
+        elif self._value_start == self._string_start:
+            self._emit(fields, literal)
+
+    def _emit(self, fields: list[tuple[str, object]], literal: str) -> None:
+        key = self._key
+        self._key = None
+        self._value_start = -1
+        if key is None:
+            return
+        try:
+            fields.append((key, json.loads(literal.strip())))
+        except json.JSONDecodeError:
+            return
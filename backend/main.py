@@ -1,9 +1,30 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.api.compression import CompressionMiddleware
 from backend.api.routes import router
+from backend.api.tracing import TracingMiddleware
+from backend.config.settings import load_config
 
 app = FastAPI(title="Execution Aware RAG Code Explainer")
+config = load_config()
+
+# Added first so it sits inside compression and sees the uncompressed JSON body.
+if config.tracing.enabled:
+    app.add_middleware(
+        TracingMiddleware,
+        profile_slow_ms=config.tracing.profile_slow_ms,
+        profile_interval_ms=config.tracing.profile_interval_ms,
+        profile_dir=config.tracing.profile_dir,
+    )
+
+if config.api.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.api.compression_min_bytes,
+        gzip_level=config.api.gzip_level,
+        brotli_quality=config.api.brotli_quality,
+    )
 
 app.add_middleware(
     CORSMiddleware,
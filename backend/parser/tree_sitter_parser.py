@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -55,19 +56,24 @@ class TreeSitterCodeParser:
             yield path
 
     def parse_repository(
-        self, repo_path: Path
+        self,
+        repo_path: Path,
+        on_file_parsed: Callable[[int, int], None] | None = None,
     ) -> tuple[list[ParsedSymbol], list[ParsedEdge], list[ParsedVariable], list[dict]]:
         symbols: list[ParsedSymbol] = []
         edges: list[ParsedEdge] = []
         variables: list[ParsedVariable] = []
         chunks: list[dict] = []
 
-        for file_path in self.iter_source_files(repo_path):
+        source_files = list(self.iter_source_files(repo_path))
+        for parsed_count, file_path in enumerate(source_files, start=1):
             file_symbols, file_edges, file_variables, file_chunks = self.parse_file(file_path)
             symbols.extend(file_symbols)
             edges.extend(file_edges)
             variables.extend(file_variables)
             chunks.extend(file_chunks)
+            if on_file_parsed is not None:
+                on_file_parsed(parsed_count, len(source_files))
 
         self._resolve_call_edge_targets(symbols, edges)
 
@@ -1,15 +1,42 @@
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import shutil
+import tempfile
 from pathlib import Path
+from urllib.parse import urlparse
 
-from git import Repo
+from git import Git, GitCommandError
 
 from backend.config.settings import AppConfig
-from backend.utils.retry import retry_call
+from backend.utils.circuit_breaker import CircuitBreakerRegistry
+from backend.utils.retry import Deadline, is_retryable, retry_call
+
+TRANSIENT_GIT_ERRORS = (
+    "could not resolve host",
+    "connection timed out",
+    "operation timed out",
+    "connection reset",
+    "connection refused",
+    "early eof",
+    "unexpected disconnect",
+    "rpc failed",
+    "the remote end hung up",
+    "http 429",
+    "http 502",
+    "http 503",
+    "http 504",
+)
+
+
+def _is_retryable_git_error(exc: Exception) -> bool:
+    if is_retryable(exc):
+        return True
+    message = f"{getattr(exc, 'stderr', '')} {exc}".lower()
+    return any(marker in message for marker in TRANSIENT_GIT_ERRORS)
 
 
 class RepositoryCloner:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(self, config: AppConfig, breakers: CircuitBreakerRegistry | None = None) -> None:
         self.config = config
+        self.breakers = breakers
 
     def clone(self, repo_url: str, branch: str | None = None) -> Path:
         clone_root = Path(self.config.github.clone_dir).resolve()
@@ -20,24 +47,47 @@ class RepositoryCloner:
         if target_path.exists():
             return target_path
 
-        def _clone() -> Path:
-            kwargs: dict[str, str] = {}
-            if branch:
-                kwargs["branch"] = branch
-            Repo.clone_from(repo_url, str(target_path), **kwargs)
-            return target_path
+        # The clone timeout bounds the whole call, retries included.
+        deadline = Deadline(self.config.github.clone_timeout_seconds)
 
-        def _with_timeout() -> Path:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(_clone)
+        def _clone() -> Path:
+            # Each attempt clones into its own staging directory that is renamed into place only on
+            # success, so a failed or killed attempt never leaves a half-written checkout behind.
+            Git.check_unsafe_protocols(repo_url)
+            staging = Path(tempfile.mkdtemp(prefix=f".{repo_name}-", dir=clone_root))
+            try:
+                branch_args = ["--branch", branch] if branch else []
+                try:
+                    # GitPython SIGKILLs git once the remaining budget is spent.
+                    Git(str(clone_root)).clone(
+                        *branch_args,
+                        "--",
+                        repo_url,
+                        str(staging),
+                        kill_after_timeout=deadline.remaining(),
+                    )
+                except GitCommandError as exc:
+                    if deadline.expired():
+                        raise TimeoutError("Repository clone timed out.") from exc
+                    raise
                 try:
-                    return future.result(timeout=self.config.github.clone_timeout_seconds)
-                except FuturesTimeoutError as exc:
-                    raise TimeoutError("Repository clone timed out.") from exc
+                    staging.rename(target_path)
+                except OSError:
+                    # A concurrent clone of the same repository finished first.
+                    if not target_path.exists():
+                        raise
+                return target_path
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
 
+        host = urlparse(repo_url).hostname or repo_url
         return retry_call(
-            fn=_with_timeout,
+            fn=_clone,
             attempts=self.config.runtime.retry_attempts,
             initial_backoff_seconds=self.config.runtime.retry_backoff_seconds,
             multiplier=self.config.runtime.retry_backoff_multiplier,
+            retryable=_is_retryable_git_error,
+            deadline=deadline,
+            max_backoff_seconds=self.config.runtime.retry_max_backoff_seconds,
+            breaker=self.breakers.get(f"git:{host}") if self.breakers is not None else None,
         )
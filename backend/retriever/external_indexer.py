@@ -1,25 +1,31 @@
 from collections.abc import Iterable
 import csv
 from pathlib import Path
+from urllib.parse import urlparse
 
 import requests
 
 from backend.config.settings import AppConfig
+from backend.utils.circuit_breaker import CircuitBreakerRegistry
+from backend.utils.retry import Deadline, retry_call
 
 
 class ExternalKnowledgeIndexer:
-    def __init__(self, config: AppConfig) -> None:
+    def __init__(self, config: AppConfig, breakers: CircuitBreakerRegistry | None = None) -> None:
         self.config = config
+        self.breakers = breakers
 
     def fetch_docs(self) -> Iterable[dict]:
         if not self.config.external_knowledge.enabled:
             return []
         chunks = []
         chunks.extend(self._fetch_csv_rows())
-        timeout = self.config.runtime.request_timeout_seconds
         for url in self.config.external_knowledge.docs_urls:
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
+            # A docs host that keeps failing (or whose circuit is open) is skipped so indexing still completes.
+            try:
+                response = self._fetch_url(url)
+            except Exception:  # noqa: BLE001
+                continue
             chunks.append(
                 {
                     "id": f"docs:{url}",
@@ -32,6 +38,26 @@ class ExternalKnowledgeIndexer:
             )
         return chunks
 
+    def _fetch_url(self, url: str) -> requests.Response:
+        deadline = Deadline(self.config.runtime.deadline_seconds)
+        timeout = float(self.config.runtime.request_timeout_seconds)
+
+        def _get() -> requests.Response:
+            response = requests.get(url, timeout=deadline.clamp(timeout))
+            response.raise_for_status()
+            return response
+
+        host = urlparse(url).hostname or url
+        return retry_call(
+            fn=_get,
+            attempts=self.config.runtime.retry_attempts,
+            initial_backoff_seconds=self.config.runtime.retry_backoff_seconds,
+            multiplier=self.config.runtime.retry_backoff_multiplier,
+            deadline=deadline,
+            max_backoff_seconds=self.config.runtime.retry_max_backoff_seconds,
+            breaker=self.breakers.get(f"docs:{host}") if self.breakers is not None else None,
+        )
+
     def _fetch_csv_rows(self) -> list[dict]:
         csv_path = Path(self.config.external_knowledge.csv_path)
         if not csv_path.exists() or not csv_path.is_file():
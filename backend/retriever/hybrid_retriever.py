@@ -1,31 +1,322 @@
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from backend.config.settings import AppConfig
 from backend.embeddings.minilm_embedder import MiniLmEmbedder
 from backend.graph.sqlite_graph import SqliteGraphStore
+from backend.lexical.bm25_store import Bm25Store
+from backend.retriever.retrieval_cache import RetrievalCache
+from backend.utils.metrics import ERRORS, STAGE_SECONDS
+from backend.utils.tracing import bind_context, span
 from backend.vector.faiss_store import FaissVectorStore
 
 
 class HybridRetriever:
     def __init__(
         self,
+        config: AppConfig,
         graph_store: SqliteGraphStore,
         vector_store: FaissVectorStore,
         embedder: MiniLmEmbedder,
+        lexical_store: Bm25Store | None = None,
+        cache: RetrievalCache | None = None,
     ) -> None:
+        self.config = config
         self.graph_store = graph_store
         self.vector_store = vector_store
         self.embedder = embedder
+        self.lexical_store = lexical_store
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.retrieval.max_workers),
+            thread_name_prefix="retriever",
+        )
 
     def retrieve(self, session_id: str, function_name: str, filters: dict | None = None) -> dict:
-        graph_nodes, graph_edges = self.graph_store.get_function_graph(session_id, function_name)
-        semantic_hits: list[dict] = []
-        try:
-            vector_query = self.embedder.embed_text(function_name)
-            semantic_hits = self.vector_store.search(session_id, vector_query, filters=filters)
-        except Exception:
-            semantic_hits = []
-        variable_rows = self.graph_store.get_variables_for_scope(session_id, function_name)
+        with span("retrieve", function=function_name) as current:
+            context = self._cached_retrieve(session_id, function_name, filters)
+            if current is not None:
+                current.set(cache=context["retrieval"].get("cache", "off"), partial=context["retrieval"]["partial"])
+            return context
+
+    def _cached_retrieve(self, session_id: str, function_name: str, filters: dict | None) -> dict:
+        if self.cache is None:
+            return self._retrieve(session_id, function_name, filters)
+
+        started = time.perf_counter()
+        key = self.cache.make_key(session_id, function_name, filters)
+        generation = self.index_generation(session_id)
+        with span("retrieve.cache_lookup"):
+            cached = self.cache.get(key, generation)
+        if cached is not None:
+            return {
+                **cached,
+                "retrieval": {
+                    "timings": {"total_ms": round((time.perf_counter() - started) * 1000, 3)},
+                    "timed_out": [],
+                    "failed": [],
+                    "partial": False,
+                    "cache": "hit",
+                },
+            }
+
+        context = self._retrieve(session_id, function_name, filters)
+        self._store(key, generation, session_id, context)
+        return context
+
+    def retrieve_batch(
+        self,
+        session_id: str,
+        function_names: list[str],
+        filters: dict | None = None,
+    ) -> Iterator[tuple[str, dict | None, str | None]]:
+        batch_size = max(1, self.config.retrieval.batch_size)
+        for start in range(0, len(function_names), batch_size):
+            batch = function_names[start : start + batch_size]
+            generation = self.index_generation(session_id) if self.cache is not None else ""
+            keys: dict[str, str] = {}
+            misses: list[str] = []
+            for function_name in batch:
+                if self.cache is None:
+                    misses.append(function_name)
+                    continue
+                keys[function_name] = self.cache.make_key(session_id, function_name, filters)
+                cached = self.cache.get(keys[function_name], generation)
+                if cached is None:
+                    misses.append(function_name)
+                    continue
+                retrieval = {"timings": {}, "timed_out": [], "failed": [], "partial": False, "cache": "hit"}
+                yield function_name, {**cached, "retrieval": retrieval}, None
+
+            # One encode call and one FAISS search for the whole batch; per-function
+            # retrieval falls back to embedding on its own if the batch call fails.
+            vector_queries: list[list[float] | None] = [None] * len(misses)
+            global_hits: list[list[dict] | None] = [None] * len(misses)
+            try:
+                with STAGE_SECONDS.time(stage="embed_query"), span("embed_query", batch=len(misses)):
+                    embeddings = self.embedder.embed_texts(misses)
+                vector_queries = list(embeddings)
+                global_hits = list(self.vector_store.search_batch(session_id, embeddings, filters=filters))
+            except Exception:
+                pass
+
+            # Graph-scoped vector search needs each function's graph first; resolving the graphs up
+            # front lets every scoped search run in one batched pass as well.
+            graphs: list[tuple[list[int], tuple[list[dict], list[dict]]] | None] = [None] * len(misses)
+            scoped_hits: list[list[dict] | None] = [None] * len(misses)
+            if self.config.retrieval.vector_scope == "graph" and misses and vector_queries[0] is not None:
+                try:
+                    graph_futures = [
+                        self._executor.submit(bind_context(self._resolve_graph), session_id, function_name)
+                        for function_name in misses
+                    ]
+                    graphs = [future.result() for future in graph_futures]
+                    scoped_hits = list(
+                        self.vector_store.search_batch(
+                            session_id,
+                            vector_queries,
+                            filters=filters,
+                            file_paths=[self._graph_file_paths(graph[1][0]) for graph in graphs],
+                        )
+                    )
+                except Exception:
+                    graphs = [None] * len(misses)
+                    scoped_hits = [None] * len(misses)
+
+            for function_name, vector_query, hits, graph, scoped in zip(
+                misses, vector_queries, global_hits, graphs, scoped_hits, strict=True
+            ):
+                try:
+                    context = self._retrieve(
+                        session_id,
+                        function_name,
+                        filters,
+                        vector_query=vector_query,
+                        global_hits=hits,
+                        seed_ids=graph[0] if graph is not None else None,
+                        graph=graph[1] if graph is not None else None,
+                        scoped_hits=scoped,
+                    )
+                except Exception as exc:
+                    yield function_name, None, str(exc) or exc.__class__.__name__
+                    continue
+                if self.cache is not None:
+                    self._store(keys[function_name], generation, session_id, context)
+                yield function_name, context, None
+
+    def _store(self, key: str, generation: str, session_id: str, context: dict) -> None:
+        context["retrieval"]["cache"] = "miss"
+        if not context["retrieval"]["partial"]:
+            payload = {name: value for name, value in context.items() if name != "retrieval"}
+            self.cache.put(key, generation, session_id, payload)
+
+    def index_generation(self, session_id: str) -> str:
+        generations = [
+            self.graph_store.get_generation(session_id),
+            self.vector_store.get_generation(session_id),
+        ]
+        if self.lexical_store is not None:
+            generations.append(self.lexical_store.get_generation(session_id))
+        return ":".join(str(generation) for generation in generations)
+
+    def _retrieve(
+        self,
+        session_id: str,
+        function_name: str,
+        filters: dict | None,
+        vector_query: list[float] | None = None,
+        global_hits: list[dict] | None = None,
+        seed_ids: list[int] | None = None,
+        graph: tuple[list[dict], list[dict]] | None = None,
+        scoped_hits: list[dict] | None = None,
+    ) -> dict:
+        started = time.perf_counter()
+        deadline = started + self.config.retrieval.stage_timeout_seconds
+        # Graph and variable stages share one resolution of the query to seed symbols.
+        if seed_ids is None:
+            with span("retrieve.seeds"):
+                seed_ids = self.graph_store.resolve_seed_ids(session_id, function_name)
+        seeds_elapsed = time.perf_counter() - started
+        stages: dict[str, tuple[Callable[[], object], object]] = {
+            "graph": (
+                (lambda: graph)
+                if graph is not None
+                else lambda: self.graph_store.get_function_graph(session_id, function_name, seed_ids=seed_ids),
+                ([], []),
+            ),
+            "vector": (
+                lambda: self._semantic_hits(
+                    session_id,
+                    function_name,
+                    filters,
+                    futures["graph"],
+                    deadline,
+                    vector_query,
+                    global_hits,
+                    scoped_hits,
+                ),
+                [],
+            ),
+            "variables": (
+                lambda: self.graph_store.get_variables_for_scope(session_id, function_name, scope_ids=seed_ids),
+                [],
+            ),
+        }
+        if self.lexical_store is not None:
+            stages["lexical"] = (
+                lambda: self.lexical_store.search(session_id, function_name, filters=filters),
+                [],
+            )
+        # The vector stage waits on the graph future, so graph is submitted first.
+        futures: dict[str, Future] = {}
+        for name, (fn, _) in stages.items():
+            futures[name] = self._executor.submit(bind_context(self._timed), name, fn)
+
+        results: dict[str, object] = {}
+        timings: dict[str, float] = {"seeds_ms": round(seeds_elapsed * 1000, 3)}
+        timed_out: list[str] = []
+        failed: list[str] = []
+        for name, future in futures.items():
+            try:
+                results[name], elapsed = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except FuturesTimeoutError:
+                future.cancel()
+                results[name] = stages[name][1]
+                elapsed = time.perf_counter() - started
+                timed_out.append(name)
+            except Exception:
+                if name not in {"vector", "lexical"}:
+                    raise
+                results[name] = stages[name][1]
+                elapsed = time.perf_counter() - started
+                failed.append(name)
+            timings[f"{name}_ms"] = round(elapsed * 1000, 3)
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        STAGE_SECONDS.observe(timings["total_ms"] / 1000, stage="retrieval")
+        if timed_out or failed:
+            ERRORS.inc(len(timed_out) + len(failed), component="retrieval")
+
+        graph_nodes, graph_edges = results["graph"]
         return {
             "graph_nodes": graph_nodes,
             "graph_edges": graph_edges,
-            "semantic_hits": semantic_hits,
-            "variables": variable_rows,
+            "semantic_hits": self._fuse_hits(results["vector"], results.get("lexical", [])),
+            "variables": results["variables"],
+            "retrieval": {
+                "timings": timings,
+                "timed_out": timed_out,
+                "failed": failed,
+                "partial": bool(timed_out or failed),
+            },
         }
+
+    def _semantic_hits(
+        self,
+        session_id: str,
+        function_name: str,
+        filters: dict | None,
+        graph_future: Future,
+        deadline: float,
+        vector_query: list[float] | None = None,
+        global_hits: list[dict] | None = None,
+        scoped_hits: list[dict] | None = None,
+    ) -> list[dict]:
+        if vector_query is None:
+            with STAGE_SECONDS.time(stage="embed_query"), span("embed_query"):
+                vector_query = self.embedder.embed_text(function_name)
+        if self.config.retrieval.vector_scope != "graph":
+            if global_hits is not None:
+                return global_hits
+            return self.vector_store.search(session_id, vector_query, filters=filters)
+
+        if scoped_hits is not None:
+            hits = list(scoped_hits)
+        else:
+            (graph_nodes, _), _ = graph_future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            file_paths = self._graph_file_paths(graph_nodes)
+            hits = (
+                self.vector_store.search(session_id, vector_query, filters=filters, file_paths=file_paths)
+                if file_paths
+                else []
+            )
+        limit = self.vector_store.search_limit
+        if len(hits) < limit:
+            seen = {hit["id"] for hit in hits}
+            if global_hits is None:
+                global_hits = self.vector_store.search(session_id, vector_query, filters=filters)
+            hits.extend(hit for hit in global_hits if hit["id"] not in seen)
+        return hits[:limit]
+
+    def _resolve_graph(
+        self,
+        session_id: str,
+        function_name: str,
+    ) -> tuple[list[int], tuple[list[dict], list[dict]]]:
+        seed_ids = self.graph_store.resolve_seed_ids(session_id, function_name)
+        return seed_ids, self.graph_store.get_function_graph(session_id, function_name, seed_ids=seed_ids)
+
+    def _graph_file_paths(self, graph_nodes: list[dict]) -> list[str]:
+        return [node["file_path"] for node in graph_nodes if node.get("file_path")]
+
+    def _fuse_hits(self, vector_hits: list[dict], lexical_hits: list[dict]) -> list[dict]:
+        if not lexical_hits:
+            return vector_hits
+        rrf_k = self.config.retrieval.rrf_k
+        fused: dict[str, dict] = {}
+        scores: dict[str, float] = {}
+        for hits in (vector_hits, lexical_hits):
+            for rank, hit in enumerate(hits, start=1):
+                fused.setdefault(hit["id"], hit)
+                scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (rrf_k + rank)
+        ranked = sorted(fused, key=lambda hit_id: scores[hit_id], reverse=True)
+        return [
+            {**fused[hit_id], "score": round(scores[hit_id], 6)}
+            for hit_id in ranked[: self.vector_store.search_limit]
+        ]
+
+    def _timed(self, name: str, fn: Callable[[], object]) -> tuple[object, float]:
+        started = time.perf_counter()
+        with span(f"retrieve.{name}"):
+            result = fn()
+        return result, time.perf_counter() - started
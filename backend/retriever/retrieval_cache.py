@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from backend.config.settings import AppConfig
+from backend.utils.sqlite_pool import SqliteConnectionPool
+
+
+class RetrievalCache:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.max_entries = max(0, self.config.retrieval.cache_max_entries)
+        self.disk_max_entries = max(0, self.config.retrieval.cache_disk_max_entries)
+        self._entries: OrderedDict[str, tuple[str, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "stores": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+        }
+        self.pool: SqliteConnectionPool | None = None
+        if self.config.retrieval.cache_path:
+            self.pool = SqliteConnectionPool(
+                Path(self.config.retrieval.cache_path),
+                busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+                initializer=self._init_schema,
+            )
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS retrieval_cache (
+                cache_key TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                generation TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_retrieval_cache_session ON retrieval_cache(session_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_retrieval_cache_stored ON retrieval_cache(stored_at)")
+        conn.commit()
+
+    def make_key(self, session_id: str, function_name: str, filters: dict | None) -> str:
+        normalized_filters = sorted(
+            (str(key), str(value).strip().lower())
+            for key, value in (filters or {}).items()
+            if value is not None
+        )
+        raw = json.dumps(
+            [session_id, " ".join(function_name.split()).lower(), normalized_filters],
+            separators=(",", ":"),
+        )
+        return f"{session_id}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str, generation: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    self._entries.move_to_end(key)
+                    self._metrics["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._metrics["stale"] += 1
+
+        payload = self._disk_get(key, generation)
+        if payload is not None:
+            self._remember(key, generation, payload)
+            with self._lock:
+                self._metrics["disk_hits"] += 1
+            return payload
+
+        with self._lock:
+            self._metrics["misses"] += 1
+        return None
+
+    def put(self, key: str, generation: str, session_id: str, payload: dict) -> None:
+        self._remember(key, generation, payload)
+        with self._lock:
+            self._metrics["stores"] += 1
+        if self.pool is None or self.disk_max_entries == 0:
+            return
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO retrieval_cache (cache_key, session_id, generation, payload, stored_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, session_id, generation, json.dumps(payload, ensure_ascii=False, default=str), time.time()),
+            )
+            # Rows from the session's older index generations can never hit again.
+            stale = conn.execute(
+                "DELETE FROM retrieval_cache WHERE session_id = ? AND generation != ?",
+                (session_id, generation),
+            ).rowcount
+            overflow = conn.execute(
+                """
+                DELETE FROM retrieval_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM retrieval_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.disk_max_entries,),
+            ).rowcount
+        with self._lock:
+            self._metrics["disk_evictions"] += stale + overflow
+
+    def invalidate(self, session_id: str) -> None:
+        prefix = f"{session_id}:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.pool is None:
+            return
+        with self.pool.writer() as conn, conn:
+            conn.execute("DELETE FROM retrieval_cache WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = len(self._entries)
+        lookups = metrics["hits"] + metrics["disk_hits"] + metrics["misses"]
+        metrics["hit_rate"] = round((metrics["hits"] + metrics["disk_hits"]) / lookups, 4) if lookups else 0.0
+        metrics["max_entries"] = self.max_entries
+        metrics["disk_enabled"] = self.pool is not None
+        return metrics
+
+    def _remember(self, key: str, generation: str, payload: dict) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = (generation, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def _disk_get(self, key: str, generation: str) -> dict | None:
+        if self.pool is None:
+            return None
+        row = self.pool.reader().execute(
+            "SELECT generation, payload FROM retrieval_cache WHERE cache_key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row["generation"] != generation:
+            self._disk_evict_stale(key, row["generation"])
+            return None
+        try:
+            payload = json.loads(row["payload"])
+        except json.JSONDecodeError:
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def _disk_evict_stale(self, key: str, generation: str) -> None:
+        with self.pool.writer() as conn, conn:
+            # The generation check keeps a concurrent put of a fresh row from being deleted.
+            deleted = conn.execute(
+                "DELETE FROM retrieval_cache WHERE cache_key = ? AND generation = ?",
+                (key, generation),
+            ).rowcount
+        with self._lock:
+            self._metrics["disk_evictions"] += deleted
@@ -0,0 +1,131 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from starlette.concurrency import iterate_in_threadpool
+
+from backend.config.settings import AppConfig
+from backend.llm.explanation_engine import ExplanationEngine
+from backend.retriever.hybrid_retriever import HybridRetriever
+from backend.services.explain_batch_store import ExplainBatchStore
+
+
+class ExplainBatchService:
+    def __init__(
+        self,
+        config: AppConfig,
+        retriever: HybridRetriever,
+        llm_engine: ExplanationEngine,
+        job_store: ExplainBatchStore,
+    ) -> None:
+        self.config = config
+        self.retriever = retriever
+        self.llm_engine = llm_engine
+        self.job_store = job_store
+
+    def prepare_job(
+        self,
+        session_id: str,
+        function_names: list[str],
+        filters: dict,
+        job_id: str | None = None,
+    ) -> dict:
+        if job_id:
+            job = self.job_store.get_job(job_id)
+            if job is None or job["session_id"] != session_id:
+                raise ValueError("Unknown job_id for this session.")
+            return job
+
+        names = list(dict.fromkeys(name.strip() for name in function_names if name and name.strip()))
+        if not names:
+            raise ValueError("Provide at least one function name.")
+        if len(names) > self.config.llm.batch_max_functions:
+            raise ValueError(f"At most {self.config.llm.batch_max_functions} functions can be explained per batch.")
+        return self.job_store.get_job(self.job_store.create_job(session_id, names, filters))  # type: ignore[return-value]
+
+    async def run(self, job: dict, repo_path: str | None, bypass_cache: bool = False) -> AsyncIterator[dict]:
+        job_id = job["job_id"]
+        completed = await asyncio.to_thread(self.job_store.completed_results, job_id)
+        remaining = [name for name in job["function_names"] if name not in completed]
+        yield {
+            "event": "job",
+            "job_id": job_id,
+            "total": job["total"],
+            "completed": len(completed),
+            "remaining": len(remaining),
+        }
+        for function_name in job["function_names"]:
+            if function_name in completed:
+                yield {"event": "result", **completed[function_name], "resumed": True}
+
+        # Retrieval is pulled lazily so at most max_concurrency explanations (and their
+        # packed contexts) are held at once; the engine's semaphore bounds upstream calls.
+        window = max(1, self.config.llm.max_concurrency)
+        pending: set[asyncio.Task] = set()
+        failures = 0
+        finished = False
+        retrievals = iterate_in_threadpool(
+            self.retriever.retrieve_batch(job["session_id"], remaining, job["filters"]),
+        )
+        try:
+            async for function_name, context, error in retrievals:
+                pending.add(
+                    asyncio.ensure_future(
+                        self._explain(job_id, function_name, context, error, repo_path, bypass_cache),
+                    )
+                )
+                if len(pending) >= window:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    done = {task for task in pending if task.done()}
+                    pending -= done
+                for task in done:
+                    result = task.result()
+                    failures += result["status"] != "ok"
+                    yield {"event": "result", **result, "resumed": False}
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    failures += result["status"] != "ok"
+                    yield {"event": "result", **result, "resumed": False}
+            finished = True
+        finally:
+            for task in pending:
+                task.cancel()
+            status = ("partial" if failures else "completed") if finished else "interrupted"
+            await asyncio.to_thread(self.job_store.set_status, job_id, status)
+
+        yield {"event": "done", "job_id": job_id, "status": status, "failed": failures}
+
+    async def _explain(
+        self,
+        job_id: str,
+        function_name: str,
+        context: dict | None,
+        error: str | None,
+        repo_path: str | None,
+        bypass_cache: bool,
+    ) -> dict:
+        if context is None:
+            return {"function_name": function_name, "status": "error", "error": f"Retrieval failed: {error}"}
+        try:
+            explanation = await self.llm_engine.aexplain(
+                function_name,
+                context,
+                repo_path=repo_path,
+                bypass_cache=bypass_cache,
+                raise_errors=True,
+            )
+        except Exception as exc:  # noqa: BLE001
+            return {"function_name": function_name, "status": "error", "error": str(exc) or exc.__class__.__name__}
+
+        # Only successful results are persisted, so resuming a job retries the failures.
+        result = {
+            "function_name": function_name,
+            "status": "ok",
+            "explanation": explanation,
+            "retrieval": context.get("retrieval"),
+        }
+        await asyncio.to_thread(self.job_store.record_result, job_id, function_name, result)
+        return result
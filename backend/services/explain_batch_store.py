@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.config.settings import AppConfig
+from backend.utils.sqlite_pool import SqliteConnectionPool
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ExplainBatchStore:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.pool = SqliteConnectionPool(
+            Path(self.config.llm.batch_jobs_path),
+            busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+            initializer=self._init_schema,
+        )
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS explain_batch_jobs (
+                job_id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                function_names TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS explain_batch_results (
+                job_id TEXT NOT NULL,
+                function_name TEXT NOT NULL,
+                result TEXT NOT NULL,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (job_id, function_name)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_explain_batch_jobs_session ON explain_batch_jobs(session_id)")
+        conn.commit()
+
+    def create_job(self, session_id: str, function_names: list[str], filters: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = _utc_now_iso()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO explain_batch_jobs (job_id, session_id, function_names, filters, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'running', ?, ?)
+                """,
+                (job_id, session_id, json.dumps(function_names), json.dumps(filters), now, now),
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> dict | None:
+        row = self.pool.reader().execute(
+            """
+            SELECT jobs.*, (
+                SELECT COUNT(*) FROM explain_batch_results AS results WHERE results.job_id = jobs.job_id
+            ) AS completed
+            FROM explain_batch_jobs AS jobs
+            WHERE jobs.job_id = ?
+            """,
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        function_names = json.loads(row["function_names"])
+        return {
+            "job_id": row["job_id"],
+            "session_id": row["session_id"],
+            "function_names": function_names,
+            "filters": json.loads(row["filters"]),
+            "status": row["status"],
+            "total": len(function_names),
+            "completed": row["completed"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def completed_results(self, job_id: str) -> dict[str, dict]:
+        rows = self.pool.reader().execute(
+            "SELECT function_name, result FROM explain_batch_results WHERE job_id = ?",
+            (job_id,),
+        ).fetchall()
+        return {row["function_name"]: json.loads(row["result"]) for row in rows}
+
+    def record_result(self, job_id: str, function_name: str, result: dict) -> None:
+        now = _utc_now_iso()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO explain_batch_results (job_id, function_name, result, completed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (job_id, function_name, json.dumps(result, ensure_ascii=False), now),
+            )
+            conn.execute("UPDATE explain_batch_jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+
+    def set_status(self, job_id: str, status: str) -> None:
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                "UPDATE explain_batch_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (status, _utc_now_iso(), job_id),
+            )
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.config.settings import AppConfig
+from backend.graph.sqlite_graph import SqliteGraphStore
+from backend.llm.explanation_engine import ExplanationEngine
+from backend.retriever.hybrid_retriever import HybridRetriever
+
+WARM_NICENESS = 10
+INTERACTIVE_BACKOFF_SECONDS = 0.5
+
+
+def _lower_thread_priority() -> None:
+    # Linux schedules threads individually, so this only deprioritises the warmer thread.
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WARM_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class ExplanationWarmer:
+    def __init__(
+        self,
+        config: AppConfig,
+        graph_store: SqliteGraphStore,
+        retriever: HybridRetriever,
+        llm_engine: ExplanationEngine,
+    ) -> None:
+        self.config = config
+        self.graph_store = graph_store
+        self.retriever = retriever
+        self.llm_engine = llm_engine
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="explanation-warmer",
+            initializer=_lower_thread_priority,
+        )
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+
+    @property
+    def enabled(self) -> bool:
+        cache = self.llm_engine.cache
+        return self.config.llm.warm_enabled and cache is not None and cache.enabled
+
+    def schedule(self, session_id: str, repo_path: str | None = None) -> dict:
+        if not self.enabled:
+            return {"session_id": session_id, "state": "disabled"}
+        self.cancel(session_id)
+        job = {
+            "session_id": session_id,
+            "state": "queued",
+            "cancel": threading.Event(),
+            "generation": self.graph_store.get_generation(session_id),
+            "candidates": 0,
+            "warmed": 0,
+            "already_cached": 0,
+            "tokens_used": 0,
+            "elapsed_seconds": 0.0,
+        }
+        with self._lock:
+            self._jobs[session_id] = job
+        self._executor.submit(self._run, job, repo_path)
+        return self._public(job)
+
+    def cancel(self, session_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(session_id)
+        if job is not None and job["state"] in {"queued", "running"}:
+            job["cancel"].set()
+            job["state"] = "cancelled"
+
+    def status(self, session_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(session_id)
+        if job is None:
+            return {"session_id": session_id, "state": "idle" if self.enabled else "disabled"}
+        return self._public(job)
+
+    def _run(self, job: dict, repo_path: str | None) -> None:
+        cancel: threading.Event = job["cancel"]
+        if cancel.is_set():
+            return
+        job["state"] = "running"
+        session_id = job["session_id"]
+        started = time.monotonic()
+        deadline = started + self.config.llm.warm_time_budget_seconds
+        token_budget = self.config.llm.warm_token_budget
+        state = "completed"
+        try:
+            candidates = self.graph_store.get_hot_functions(session_id, self.config.llm.warm_top_n)
+            job["candidates"] = len(candidates)
+            for function_name in dict.fromkeys(node["name"] for node in candidates if node.get("name")):
+                if not self._wait_for_idle_upstream(cancel, deadline):
+                    break
+                if self.graph_store.get_generation(session_id) != job["generation"]:
+                    cancel.set()
+                    break
+                context = self.retriever.retrieve(session_id, function_name)
+                if self.llm_engine.is_cached(function_name, context, repo_path):
+                    job["already_cached"] += 1
+                    continue
+                prompt_tokens = self.llm_engine.estimate_prompt_tokens(function_name, context, repo_path)
+                if job["tokens_used"] + prompt_tokens > token_budget:
+                    state = "budget_exhausted"
+                    break
+                explanation = self.llm_engine.explain(function_name, context, repo_path=repo_path)
+                job["tokens_used"] += prompt_tokens + self.llm_engine.packer.estimate_tokens(json.dumps(explanation))
+                job["warmed"] += 1
+            if state == "completed" and time.monotonic() >= deadline:
+                state = "budget_exhausted"
+        except Exception as exc:  # noqa: BLE001
+            state = "failed"
+            job["error"] = str(exc)
+        job["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        job["state"] = "cancelled" if cancel.is_set() else state
+
+    def _wait_for_idle_upstream(self, cancel: threading.Event, deadline: float) -> bool:
+        # Interactive explanations in flight take precedence over warming.
+        while not cancel.is_set() and time.monotonic() < deadline:
+            if not self.llm_engine.get_upstream_stats()["in_flight"]:
+                return True
+            cancel.wait(INTERACTIVE_BACKOFF_SECONDS)
+        return False
+
+    def _public(self, job: dict) -> dict:
+        return {key: value for key, value in job.items() if key not in {"cancel", "generation"}}
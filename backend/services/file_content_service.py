@@ -0,0 +1,116 @@
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from backend.config.settings import AppConfig
+
+INDEX_SCAN_BYTES = 8 * 1024 * 1024
+
+
+class FileContentService:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.max_entries = max(0, self.config.api.file_index_cache_entries)
+        self._line_starts: OrderedDict[str, tuple[int, int, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def read_lines(self, path: Path, start_line: int, end_line: int | None = None) -> dict:
+        if start_line < 1:
+            raise ValueError("start_line must be >= 1.")
+        if end_line is not None and end_line < start_line:
+            raise ValueError("end_line must be >= start_line.")
+        stat = path.stat()
+        max_lines = max(1, self.config.api.file_max_range_lines)
+        requested_end = start_line + max_lines - 1 if end_line is None else min(end_line, start_line + max_lines - 1)
+
+        line_starts = self._get_line_starts(path, stat.st_mtime_ns, stat.st_size)
+        total_lines = len(line_starts)
+        last_line = min(requested_end, total_lines)
+        if start_line > total_lines:
+            content = ""
+        else:
+            byte_start = int(line_starts[start_line - 1])
+            byte_end = int(line_starts[last_line]) if last_line < total_lines else stat.st_size
+            content = self._read_slice(path, byte_start, byte_end).decode("utf-8", errors="ignore")
+        return {
+            "content": content,
+            "start_line": start_line,
+            "end_line": max(start_line - 1, last_line),
+            "total_lines": total_lines,
+            "total_bytes": stat.st_size,
+            "has_more": last_line < total_lines,
+        }
+
+    def read_bytes(self, path: Path, byte_start: int, byte_end: int | None = None) -> dict:
+        if byte_start < 0:
+            raise ValueError("byte_start must be >= 0.")
+        if byte_end is not None and byte_end < byte_start:
+            raise ValueError("byte_end must be >= byte_start.")
+        size = path.stat().st_size
+        max_bytes = max(1, self.config.api.file_max_range_bytes)
+        end = byte_start + max_bytes if byte_end is None else min(byte_end, byte_start + max_bytes)
+        end = min(end, size)
+        start = min(byte_start, size)
+        return {
+            "content": self._read_slice(path, start, end).decode("utf-8", errors="ignore"),
+            "byte_start": start,
+            "byte_end": end,
+            "total_bytes": size,
+            "has_more": end < size,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._metrics,
+                "entries": len(self._line_starts),
+                "max_entries": self.max_entries,
+                "indexed_lines": int(sum(len(entry[2]) for entry in self._line_starts.values())),
+            }
+
+    def _read_slice(self, path: Path, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[start:end]
+
+    def _get_line_starts(self, path: Path, mtime_ns: int, size: int) -> np.ndarray:
+        key = str(path)
+        with self._lock:
+            cached = self._line_starts.get(key)
+            if cached is not None and cached[0] == mtime_ns and cached[1] == size:
+                self._line_starts.move_to_end(key)
+                self._metrics["hits"] += 1
+                return cached[2]
+            self._metrics["misses"] += 1
+
+        line_starts = self._build_line_starts(path, size)
+        if self.max_entries == 0:
+            return line_starts
+        with self._lock:
+            self._line_starts[key] = (mtime_ns, size, line_starts)
+            self._line_starts.move_to_end(key)
+            while len(self._line_starts) > self.max_entries:
+                self._line_starts.popitem(last=False)
+                self._metrics["evictions"] += 1
+        return line_starts
+
+    def _build_line_starts(self, path: Path, size: int) -> np.ndarray:
+        if size == 0:
+            return np.zeros(0, dtype=np.int64)
+        parts = [np.zeros(1, dtype=np.int64)]
+        with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Scanned in windows so the temporary comparison array stays bounded for very large files.
+            for offset in range(0, size, INDEX_SCAN_BYTES):
+                window = np.frombuffer(mapped, dtype=np.uint8, count=min(INDEX_SCAN_BYTES, size - offset), offset=offset)
+                parts.append(np.flatnonzero(window == 10).astype(np.int64) + offset + 1)
+                del window
+        line_starts = np.concatenate(parts)
+        # A trailing newline ends the last line rather than starting an empty one.
+        if line_starts[-1] >= size:
+            line_starts = line_starts[:-1]
+        return line_starts
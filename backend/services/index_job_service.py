@@ -0,0 +1,149 @@
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from backend.config.settings import AppConfig
+from backend.services.index_job_store import IndexJobStore
+from backend.services.indexing_service import IndexingService
+from backend.services.repo_session_manager import RepoSessionManager
+from backend.services.repo_structure_service import RepoStructureService
+
+PROGRESS_FLUSH_SECONDS = 0.5
+
+
+class IndexJobCancelled(BaseException):
+    # BaseException so the per-stage `except Exception` handlers in IndexingService do not swallow it.
+    pass
+
+
+class IndexJobService:
+    def __init__(
+        self,
+        config: AppConfig,
+        indexing_service: IndexingService,
+        structure_service: RepoStructureService,
+        session_manager: RepoSessionManager,
+        job_store: IndexJobStore,
+    ) -> None:
+        self.config = config
+        self.indexing_service = indexing_service
+        self.structure_service = structure_service
+        self.session_manager = session_manager
+        self.job_store = job_store
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.jobs.max_workers),
+            thread_name_prefix="index-job",
+        )
+        self._lock = threading.Lock()
+        self._session_locks: dict[str, threading.Lock] = {}
+        self._cancel_events: dict[str, threading.Event] = {}
+
+    def submit(
+        self,
+        session_id: str,
+        repo_url: str | None = None,
+        branch: str | None = None,
+        reindex: bool = False,
+    ) -> dict:
+        with self._lock:
+            # One active job per session: a second submit returns the job already queued or running.
+            active = self.job_store.active_for_session(session_id)
+            if active is not None:
+                return active
+            job = self.job_store.create(
+                session_id,
+                {"repo_url": repo_url, "branch": branch, "reindex": reindex},
+            )
+            self._cancel_events[job["job_id"]] = threading.Event()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self.job_store.get(job_id)
+
+    def cancel(self, job_id: str) -> dict | None:
+        job = self.job_store.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event is not None and job["status"] in {"queued", "running"}:
+            event.set()
+            # _run is the only writer of terminal states; a job that finished since it was read keeps them.
+            self.job_store.update(job_id, status="cancelling", expected_statuses=("queued", "running"))
+        return self.job_store.get(job_id)
+
+    def cancel_session(self, session_id: str) -> None:
+        active = self.job_store.active_for_session(session_id)
+        if active is not None:
+            self.cancel(active["job_id"])
+
+    @contextmanager
+    def exclusive_session(self, session_id: str) -> Iterator[None]:
+        # Cancellation is only observed between stages, so callers that rewrite the session's stores
+        # must also wait for the running job to release the session before touching them.
+        self.cancel_session(session_id)
+        with self._session_lock(session_id):
+            yield
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        with self._lock:
+            return self._session_locks.setdefault(session_id, threading.Lock())
+
+    def _run(self, job: dict) -> None:
+        job_id = job["job_id"]
+        session_id = job["session_id"]
+        params = job["params"]
+        with self._lock:
+            cancel = self._cancel_events[job_id]
+        progress_state = {"stage": None, "flushed_at": 0.0, "stages": {}}
+
+        def _progress(stage: str, counters: dict) -> None:
+            if cancel.is_set():
+                raise IndexJobCancelled()
+            progress_state["stages"][stage] = counters
+            now = time.monotonic()
+            if stage != progress_state["stage"] or now - progress_state["flushed_at"] >= PROGRESS_FLUSH_SECONDS:
+                progress_state["stage"] = stage
+                progress_state["flushed_at"] = now
+                self.job_store.update(job_id, stage=stage, progress=progress_state["stages"])
+
+        try:
+            with self._session_lock(session_id):
+                if cancel.is_set():
+                    raise IndexJobCancelled()
+                self.job_store.update(job_id, status="running", expected_statuses=("queued",))
+                result = self.indexing_service.index_repository(
+                    session_id=session_id,
+                    repo_url=params.get("repo_url"),
+                    branch=params.get("branch"),
+                    reindex=bool(params.get("reindex")),
+                    progress=_progress,
+                )
+                if result.get("status") == "indexed" or params.get("reindex"):
+                    session = self.session_manager.get_session(session_id)
+                    if session is not None:
+                        _progress("structure", {})
+                        self.structure_service.extract_repo_structure(
+                            Path(session.repo_path),
+                            session_id,
+                            force_refresh=True,
+                        )
+        except IndexJobCancelled:
+            self.job_store.update(job_id, status="cancelled", progress=progress_state["stages"])
+        except Exception as exc:  # noqa: BLE001
+            self.job_store.update(job_id, status="failed", progress=progress_state["stages"], error=str(exc))
+        else:
+            self.job_store.update(
+                job_id,
+                status="completed",
+                stage="done",
+                progress=progress_state["stages"],
+                result=result,
+            )
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.config.settings import AppConfig
+from backend.utils.sqlite_pool import SqliteConnectionPool
+
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "interrupted")
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class IndexJobStore:
+    def __init__(self, config: AppConfig) -> None:
+        self.config = config
+        self.pool = SqliteConnectionPool(
+            Path(self.config.jobs.path),
+            busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+            initializer=self._init_schema,
+        )
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS index_jobs (
+                job_id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress TEXT NOT NULL DEFAULT '{}',
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                finished_at TEXT
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_index_jobs_session ON index_jobs(session_id, status)")
+        # Jobs that were active when the previous process exited cannot resume.
+        placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+        conn.execute(
+            f"""
+            UPDATE index_jobs SET status = 'interrupted', updated_at = ?, finished_at = ?
+            WHERE status IN ({placeholders})
+            """,
+            (_utc_now_iso(), _utc_now_iso(), *ACTIVE_STATUSES),
+        )
+        conn.commit()
+
+    def _row_to_job(self, row: sqlite3.Row | None) -> dict | None:
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "session_id": row["session_id"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "progress": json.loads(row["progress"]),
+            "params": json.loads(row["params"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    def create(self, session_id: str, params: dict) -> dict:
+        job_id = uuid.uuid4().hex
+        now = _utc_now_iso()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO index_jobs (job_id, session_id, status, params, created_at, updated_at)
+                VALUES (?, ?, 'queued', ?, ?, ?)
+                """,
+                (job_id, session_id, json.dumps(params), now, now),
+            )
+        return self.get(job_id)  # type: ignore[return-value]
+
+    def get(self, job_id: str) -> dict | None:
+        row = self.pool.reader().execute("SELECT * FROM index_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def active_for_session(self, session_id: str) -> dict | None:
+        placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+        row = self.pool.reader().execute(
+            f"""
+            SELECT * FROM index_jobs
+            WHERE session_id = ? AND status IN ({placeholders})
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (session_id, *ACTIVE_STATUSES),
+        ).fetchone()
+        return self._row_to_job(row)
+
+    def update(
+        self,
+        job_id: str,
+        status: str | None = None,
+        stage: str | None = None,
+        progress: dict | None = None,
+        result: dict | None = None,
+        error: str | None = None,
+        expected_statuses: tuple[str, ...] | None = None,
+    ) -> bool:
+        assignments = ["updated_at = ?"]
+        now = _utc_now_iso()
+        values: list = [now]
+        for column, value in (
+            ("status", status),
+            ("stage", stage),
+            ("progress", json.dumps(progress) if progress is not None else None),
+            ("result", json.dumps(result, ensure_ascii=False) if result is not None else None),
+            ("error", error),
+        ):
+            if value is not None:
+                assignments.append(f"{column} = ?")
+                values.append(value)
+        if status in TERMINAL_STATUSES:
+            assignments.append("finished_at = ?")
+            values.append(now)
+        condition = "job_id = ?"
+        values.append(job_id)
+        if expected_statuses is not None:
+            # Compare-and-set: the write is skipped if the job moved on since the caller read it.
+            condition += f" AND status IN ({', '.join('?' for _ in expected_statuses)})"
+            values.extend(expected_statuses)
+        with self.pool.writer() as conn, conn:
+            updated = conn.execute(
+                f"UPDATE index_jobs SET {', '.join(assignments)} WHERE {condition}",
+                values,
+            ).rowcount
+        return updated > 0
@@ -1,15 +1,27 @@
+import hashlib
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
 from pathlib import Path
 
 from backend.config.settings import AppConfig
 from backend.embeddings.minilm_embedder import MiniLmEmbedder
 from backend.graph.sqlite_graph import SqliteGraphStore
-from backend.parser.tree_sitter_parser import TreeSitterCodeParser
+from backend.lexical.bm25_store import Bm25Store
+from backend.parser.tree_sitter_parser import ParsedEdge, ParsedSymbol, ParsedVariable, TreeSitterCodeParser
 from backend.repository.cloner import RepositoryCloner
 from backend.retriever.external_indexer import ExternalKnowledgeIndexer
+from backend.services.explanation_warmer import ExplanationWarmer
 from backend.services.repo_session_manager import RepoSessionManager
+from backend.utils.metrics import ERRORS, INDEXED_CHUNKS, INDEXED_VECTORS, STAGE_SECONDS
 from backend.vector.faiss_store import FaissVectorStore
 
 
+IndexProgress = Callable[[str, dict], None]
+
+
 class IndexingService:
     def __init__(
         self,
@@ -19,8 +31,10 @@ class IndexingService:
         graph_store: SqliteGraphStore,
         embedder: MiniLmEmbedder,
         vector_store: FaissVectorStore,
+        lexical_store: Bm25Store,
         external_indexer: ExternalKnowledgeIndexer,
         session_manager: RepoSessionManager,
+        warmer: ExplanationWarmer | None = None,
     ) -> None:
         self.config = config
         self.cloner = cloner
@@ -28,8 +42,10 @@ class IndexingService:
         self.graph_store = graph_store
         self.embedder = embedder
         self.vector_store = vector_store
+        self.lexical_store = lexical_store
         self.external_indexer = external_indexer
         self.session_manager = session_manager
+        self.warmer = warmer
 
     def index_repository(
         self,
@@ -37,19 +53,26 @@ class IndexingService:
         repo_url: str | None = None,
         branch: str | None = None,
         reindex: bool = False,
+        progress: IndexProgress | None = None,
     ) -> dict:
         session = self.session_manager.get_session(session_id)
         if session is None:
             raise ValueError("Invalid session_id.")
 
         if repo_url:
+            self._report(progress, "cloning", {"repo_url": repo_url})
             repo_path = self.cloner.clone(repo_url, branch)
             if Path(session.repo_path).resolve() != repo_path.resolve():
                 raise ValueError("Session repository does not match the provided repo_url.")
         else:
             repo_path = Path(session.repo_path)
 
-        return self.index_local_path(session_id=session_id, repo_path=repo_path, reindex=reindex)
+        return self.index_local_path(
+            session_id=session_id,
+            repo_path=repo_path,
+            reindex=reindex,
+            progress=progress,
+        )
 
     def seed_external_knowledge_if_empty(self, session_id: str) -> dict:
         if not self.config.external_knowledge.enabled:
@@ -90,7 +113,13 @@ class IndexingService:
             "vector_count": self.vector_store.total_vectors(session_id),
         }
 
-    def index_local_path(self, session_id: str, repo_path: Path, reindex: bool = False) -> dict:
+    def index_local_path(
+        self,
+        session_id: str,
+        repo_path: Path,
+        reindex: bool = False,
+        progress: IndexProgress | None = None,
+    ) -> dict:
         session = self.session_manager.get_session(session_id)
         if session is None:
             raise ValueError("Invalid session_id.")
@@ -109,19 +138,56 @@ class IndexingService:
                 "indexed_external_embeddings": 0,
                 "partial_indexing": False,
                 "warnings": [],
+                "explanation_warmup": "skipped",
+                "timings": {},
             }
 
-        nodes, edges, variables, chunks = self.parser.parse_repository(repo_path)
-        self.graph_store.upsert_graph(session_id, nodes, edges, variables)
+        if self.warmer is not None:
+            self.warmer.cancel(session_id)
+
+        timings: dict[str, float] = {}
+        self._report(progress, "parsing", {"files_parsed": 0, "files_total": None})
+        with self._timed_stage("parse", timings):
+            nodes, edges, variables, chunks = self.parser.parse_repository(
+                repo_path,
+                on_file_parsed=lambda parsed, total: self._report(
+                    progress,
+                    "parsing",
+                    {"files_parsed": parsed, "files_total": total},
+                ),
+            )
+        INDEXED_CHUNKS.inc(len(chunks))
+        self._report(progress, "graph", {"nodes": len(nodes), "edges": len(edges), "variables": len(variables)})
+        with self._timed_stage("graph_upsert", timings):
+            self._sync_graph(session_id, nodes, edges, variables)
+        with self._timed_stage("reachability", timings):
+            self.graph_store.precompute_reachability(session_id)
+        self._report(progress, "lexical", {"chunks_total": len(chunks)})
+        with self._timed_stage("lexical_index", timings):
+            # Tombstone every previously indexed file first; add_documents revives unchanged chunks and
+            # re-indexes edited ones, so only removed files and chunks stay deleted.
+            self.lexical_store.delete_files(session_id, self.lexical_store.file_paths(session_id))
+            self.lexical_store.add_documents(session_id, chunks)
 
         embedded_chunks: list[dict] = []
         embedding_errors: list[str] = []
         try:
-            embedded_chunks = self.embedder.embed_batch(chunks)
-            self.vector_store.insert_embeddings(session_id, embedded_chunks)
+            with self._timed_stage("embed", timings):
+                embedded_chunks = self._embed_with_progress(chunks, progress)
+            self._report(progress, "vectors", {"vectors_written": 0, "vectors_total": len(embedded_chunks)})
+            with self._timed_stage("vector_insert", timings):
+                self.vector_store.insert_embeddings(session_id, embedded_chunks)
+            INDEXED_VECTORS.inc(len(embedded_chunks))
+            self._report(
+                progress,
+                "vectors",
+                {"vectors_written": len(embedded_chunks), "vectors_total": len(embedded_chunks)},
+            )
         except Exception as exc:  # noqa: BLE001
+            ERRORS.inc(component="indexing")
             embedding_errors.append(str(exc))
 
+        self._report(progress, "external", {})
         external_chunks = list(self.external_indexer.fetch_docs())
         external_embeddings_count = 0
         if external_chunks:
@@ -129,10 +195,15 @@ class IndexingService:
                 external_embeddings = self.embedder.embed_batch(external_chunks)
                 self.vector_store.insert_embeddings(session_id, external_embeddings)
                 external_embeddings_count = len(external_embeddings)
+                INDEXED_VECTORS.inc(external_embeddings_count)
             except Exception as exc:  # noqa: BLE001
+                ERRORS.inc(component="indexing")
                 embedding_errors.append(str(exc))
 
         self.session_manager.mark_indexed(session_id, indexed=True)
+        warm_state = "disabled"
+        if self.warmer is not None:
+            warm_state = self.warmer.schedule(session_id, str(repo_path))["state"]
 
         return {
             "repo": str(repo_path),
@@ -147,4 +218,89 @@ class IndexingService:
             "indexed_external_embeddings": external_embeddings_count,
             "partial_indexing": len(embedding_errors) > 0,
             "warnings": embedding_errors,
+            "explanation_warmup": warm_state,
+            "timings": timings,
         }
+
+    def _sync_graph(
+        self,
+        session_id: str,
+        nodes: list[ParsedSymbol],
+        edges: list[ParsedEdge],
+        variables: list[ParsedVariable],
+    ) -> None:
+        files = self._group_by_file(nodes, edges, variables)
+        digests = {
+            file_path: hashlib.blake2b(
+                json.dumps([[asdict(item) for item in rows] for rows in file_rows], sort_keys=True).encode("utf-8"),
+                digest_size=16,
+            ).hexdigest()
+            for file_path, file_rows in files.items()
+        }
+        existing = self.graph_store.get_file_digests(session_id)
+        if not existing:
+            self.graph_store.upsert_graph(session_id, nodes, edges, variables)
+            self.graph_store.set_file_digests(session_id, digests)
+            return
+
+        # Re-indexing only touches files whose parsed rows changed or disappeared.
+        for file_path in existing.keys() - files.keys():
+            self.graph_store.delete_file(session_id, file_path)
+        for file_path, (file_nodes, file_edges, file_variables) in files.items():
+            if existing.get(file_path) != digests[file_path]:
+                self.graph_store.replace_file(
+                    session_id,
+                    file_path,
+                    file_nodes,
+                    file_edges,
+                    file_variables,
+                    digest=digests[file_path],
+                )
+
+    def _group_by_file(
+        self,
+        nodes: list[ParsedSymbol],
+        edges: list[ParsedEdge],
+        variables: list[ParsedVariable],
+    ) -> dict[str, tuple[list[ParsedSymbol], list[ParsedEdge], list[ParsedVariable]]]:
+        files: dict[str, tuple[list[ParsedSymbol], list[ParsedEdge], list[ParsedVariable]]] = {}
+        symbol_files: dict[str, str] = {}
+        for node in nodes:
+            files.setdefault(node.file_path, ([], [], []))[0].append(node)
+            symbol_files[node.id] = node.file_path
+        for edge in edges:
+            file_path = symbol_files.get(edge.source)
+            if file_path is None and edge.source.startswith("module:"):
+                # Import edges hang off the file's module key, which has no parsed node once the file
+                # defines functions or classes.
+                file_path = edge.source[len("module:") :]
+            if file_path is not None:
+                files.setdefault(file_path, ([], [], []))[1].append(edge)
+        for variable in variables:
+            files.setdefault(variable.file_path, ([], [], []))[2].append(variable)
+        return files
+
+    def _embed_with_progress(self, chunks: list[dict], progress: IndexProgress | None) -> list[dict]:
+        if progress is None:
+            return self.embedder.embed_batch(chunks)
+        embedded: list[dict] = []
+        step = max(1, self.config.indexing.batch_size)
+        self._report(progress, "embedding", {"chunks_embedded": 0, "chunks_total": len(chunks)})
+        for start in range(0, len(chunks), step):
+            embedded.extend(self.embedder.embed_batch(chunks[start : start + step]))
+            self._report(progress, "embedding", {"chunks_embedded": len(embedded), "chunks_total": len(chunks)})
+        return embedded
+
+    @contextmanager
+    def _timed_stage(self, stage: str, timings: dict[str, float]) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+            timings[f"{stage}_ms"] = round(elapsed * 1000, 3)
+
+    def _report(self, progress: IndexProgress | None, stage: str, counters: dict) -> None:
+        if progress is not None:
+            progress(stage, counters)
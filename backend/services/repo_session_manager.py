@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from backend.config.settings import AppConfig
+from backend.utils.sqlite_pool import SqliteConnectionPool
 
 
 def _utc_now_iso() -> str:
@@ -36,13 +37,14 @@ class RepoSessionManager:
         self.config = config
         sqlite_path = Path(self.config.sqlite.path)
         self.session_db_path = sqlite_path.parent / "sessions.db"
-        self.session_db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.session_db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._init_schema()
+        self.pool = SqliteConnectionPool(
+            self.session_db_path,
+            busy_timeout_ms=self.config.sqlite.busy_timeout_ms,
+            initializer=self._init_schema,
+        )
 
-    def _init_schema(self) -> None:
-        self.conn.execute(
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS repo_sessions (
                 session_id TEXT PRIMARY KEY,
@@ -58,7 +60,7 @@ class RepoSessionManager:
             )
             """
         )
-        self.conn.execute(
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS session_repo_structure (
                 session_id TEXT PRIMARY KEY,
@@ -67,7 +69,7 @@ class RepoSessionManager:
             )
             """
         )
-        self.conn.commit()
+        conn.commit()
 
     def _repo_id(self, repo_path: Path) -> str:
         normalized = str(repo_path.resolve()).replace("\\", "/").lower()
@@ -91,73 +93,74 @@ class RepoSessionManager:
         )
 
     def _touch(self, session_id: str) -> None:
-        self.conn.execute(
-            "UPDATE repo_sessions SET last_accessed = ? WHERE session_id = ?",
-            (_utc_now_iso(), session_id),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                "UPDATE repo_sessions SET last_accessed = ? WHERE session_id = ?",
+                (_utc_now_iso(), session_id),
+            )
 
     def create_session(self, repo_path: Path) -> RepoSession:
         resolved_repo_path = repo_path.resolve()
         repo_id = self._repo_id(resolved_repo_path)
         now = _utc_now_iso()
 
-        existing = self.conn.execute(
-            "SELECT * FROM repo_sessions WHERE repo_id = ? ORDER BY created_at DESC LIMIT 1",
-            (repo_id,),
-        ).fetchone()
+        with self.pool.writer() as conn:
+            existing = conn.execute(
+                "SELECT * FROM repo_sessions WHERE repo_id = ? ORDER BY created_at DESC LIMIT 1",
+                (repo_id,),
+            ).fetchone()
+
+            conn.execute("UPDATE repo_sessions SET status = 'closed' WHERE status = 'active'")
 
-        self.conn.execute("UPDATE repo_sessions SET status = 'closed' WHERE status = 'active'")
+            if existing:
+                conn.execute(
+                    """
+                    UPDATE repo_sessions
+                    SET status = 'active', last_accessed = ?
+                    WHERE session_id = ?
+                    """,
+                    (now, existing["session_id"]),
+                )
+                conn.commit()
+                refreshed = conn.execute(
+                    "SELECT * FROM repo_sessions WHERE session_id = ?",
+                    (existing["session_id"],),
+                ).fetchone()
+                return self._row_to_session(refreshed)  # type: ignore[return-value]
 
-        if existing:
-            self.conn.execute(
+            session_id = str(uuid.uuid4())
+            ast_cache_path = Path("./data/cache") / session_id / "ast"
+            ast_cache_path.mkdir(parents=True, exist_ok=True)
+            vector_namespace = f"execution_aware_chunks_{session_id}"
+            graph_namespace = session_id
+
+            conn.execute(
                 """
-                UPDATE repo_sessions
-                SET status = 'active', last_accessed = ?
-                WHERE session_id = ?
+                INSERT INTO repo_sessions (
+                    session_id, repo_id, repo_path, vector_namespace, graph_namespace,
+                    ast_cache_path, created_at, last_accessed, status, indexed
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active', 0)
                 """,
-                (now, existing["session_id"]),
+                (
+                    session_id,
+                    repo_id,
+                    str(resolved_repo_path),
+                    vector_namespace,
+                    graph_namespace,
+                    str(ast_cache_path.resolve()),
+                    now,
+                    now,
+                ),
             )
-            self.conn.commit()
-            refreshed = self.conn.execute(
+            conn.commit()
+            created = conn.execute(
                 "SELECT * FROM repo_sessions WHERE session_id = ?",
-                (existing["session_id"],),
+                (session_id,),
             ).fetchone()
-            return self._row_to_session(refreshed)  # type: ignore[return-value]
-
-        session_id = str(uuid.uuid4())
-        ast_cache_path = Path("./data/cache") / session_id / "ast"
-        ast_cache_path.mkdir(parents=True, exist_ok=True)
-        vector_namespace = f"execution_aware_chunks_{session_id}"
-        graph_namespace = session_id
-
-        self.conn.execute(
-            """
-            INSERT INTO repo_sessions (
-                session_id, repo_id, repo_path, vector_namespace, graph_namespace,
-                ast_cache_path, created_at, last_accessed, status, indexed
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active', 0)
-            """,
-            (
-                session_id,
-                repo_id,
-                str(resolved_repo_path),
-                vector_namespace,
-                graph_namespace,
-                str(ast_cache_path.resolve()),
-                now,
-                now,
-            ),
-        )
-        self.conn.commit()
-        created = self.conn.execute(
-            "SELECT * FROM repo_sessions WHERE session_id = ?",
-            (session_id,),
-        ).fetchone()
-        return self._row_to_session(created)  # type: ignore[return-value]
+            return self._row_to_session(created)  # type: ignore[return-value]
 
     def get_active_session(self) -> RepoSession | None:
-        row = self.conn.execute(
+        row = self.pool.reader().execute(
             "SELECT * FROM repo_sessions WHERE status = 'active' ORDER BY last_accessed DESC LIMIT 1"
         ).fetchone()
         session = self._row_to_session(row)
@@ -166,7 +169,7 @@ class RepoSessionManager:
         return session
 
     def get_session(self, session_id: str) -> RepoSession | None:
-        row = self.conn.execute(
+        row = self.pool.reader().execute(
             "SELECT * FROM repo_sessions WHERE session_id = ?",
             (session_id,),
         ).fetchone()
@@ -179,11 +182,11 @@ class RepoSessionManager:
         return self.create_session(repo_path)
 
     def close_session(self, session_id: str) -> None:
-        self.conn.execute(
-            "UPDATE repo_sessions SET status = 'closed', last_accessed = ? WHERE session_id = ?",
-            (_utc_now_iso(), session_id),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                "UPDATE repo_sessions SET status = 'closed', last_accessed = ? WHERE session_id = ?",
+                (_utc_now_iso(), session_id),
+            )
 
     def reset_session(self, session_id: str) -> RepoSession | None:
         session = self.get_session(session_id)
@@ -205,33 +208,33 @@ class RepoSessionManager:
         ast_cache_path = Path("./data/cache") / session_id / "ast"
         ast_cache_path.mkdir(parents=True, exist_ok=True)
 
-        self.conn.execute(
-            """
-            UPDATE repo_sessions
-            SET indexed = 0,
-                ast_cache_path = ?,
-                last_accessed = ?,
-                status = 'active'
-            WHERE session_id = ?
-            """,
-            (str(ast_cache_path.resolve()), _utc_now_iso(), session_id),
-        )
-        self.conn.execute(
-            "DELETE FROM session_repo_structure WHERE session_id = ?",
-            (session_id,),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                UPDATE repo_sessions
+                SET indexed = 0,
+                    ast_cache_path = ?,
+                    last_accessed = ?,
+                    status = 'active'
+                WHERE session_id = ?
+                """,
+                (str(ast_cache_path.resolve()), _utc_now_iso(), session_id),
+            )
+            conn.execute(
+                "DELETE FROM session_repo_structure WHERE session_id = ?",
+                (session_id,),
+            )
         return self.get_session(session_id)
 
     def mark_indexed(self, session_id: str, indexed: bool = True) -> None:
-        self.conn.execute(
-            "UPDATE repo_sessions SET indexed = ?, last_accessed = ? WHERE session_id = ?",
-            (1 if indexed else 0, _utc_now_iso(), session_id),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                "UPDATE repo_sessions SET indexed = ?, last_accessed = ? WHERE session_id = ?",
+                (1 if indexed else 0, _utc_now_iso(), session_id),
+            )
 
     def get_cached_structure(self, session_id: str) -> dict | None:
-        row = self.conn.execute(
+        row = self.pool.reader().execute(
             "SELECT structure_json FROM session_repo_structure WHERE session_id = ?",
             (session_id,),
         ).fetchone()
@@ -242,16 +245,30 @@ class RepoSessionManager:
         except Exception:
             return None
 
+    def get_structure_updated_at(self, session_id: str) -> str | None:
+        row = self.pool.reader().execute(
+            "SELECT updated_at FROM session_repo_structure WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        return row["updated_at"] if row is not None else None
+
     def store_structure(self, session_id: str, structure: dict) -> None:
         serialized = json.dumps(structure, ensure_ascii=False)
-        self.conn.execute(
-            """
-            INSERT INTO session_repo_structure (session_id, structure_json, updated_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(session_id) DO UPDATE SET
-                structure_json = excluded.structure_json,
-                updated_at = excluded.updated_at
-            """,
-            (session_id, serialized, _utc_now_iso()),
-        )
-        self.conn.commit()
+        with self.pool.writer() as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO session_repo_structure (session_id, structure_json, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    structure_json = excluded.structure_json,
+                    updated_at = excluded.updated_at
+                """,
+                (session_id, serialized, _utc_now_iso()),
+            )
+
+    def count_sessions(self) -> dict[str, int]:
+        rows = self.pool.reader().execute("SELECT status, COUNT(*) AS total FROM repo_sessions GROUP BY status")
+        return {row["status"]: int(row["total"]) for row in rows}
+
+    def get_pool_stats(self) -> dict:
+        return self.pool.stats()
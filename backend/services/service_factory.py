@@ -3,30 +3,64 @@ from functools import lru_cache
 from backend.config.settings import load_config
 from backend.embeddings.minilm_embedder import MiniLmEmbedder
 from backend.graph.sqlite_graph import SqliteGraphStore
+from backend.lexical.bm25_store import Bm25Store
+from backend.llm.explanation_cache import ExplanationCache
 from backend.llm.explanation_engine import ExplanationEngine
 from backend.parser.tree_sitter_parser import TreeSitterCodeParser
 from backend.repository.cloner import RepositoryCloner
 from backend.retriever.external_indexer import ExternalKnowledgeIndexer
 from backend.retriever.hybrid_retriever import HybridRetriever
+from backend.retriever.retrieval_cache import RetrievalCache
+from backend.services.explain_batch_service import ExplainBatchService
+from backend.services.explain_batch_store import ExplainBatchStore
+from backend.services.explanation_warmer import ExplanationWarmer
+from backend.services.file_content_service import FileContentService
+from backend.services.index_job_service import IndexJobService
+from backend.services.index_job_store import IndexJobStore
 from backend.services.indexing_service import IndexingService
 from backend.services.repo_session_manager import RepoSessionManager
 from backend.services.repo_structure_service import RepoStructureService
+from backend.services.service_metrics import ServiceMetricsCollector
+from backend.utils.circuit_breaker import CircuitBreakerRegistry
+from backend.utils.metrics import REGISTRY
 from backend.vector.faiss_store import FaissVectorStore
 
 
 @lru_cache(maxsize=1)
 def get_services() -> dict:
     config = load_config()
-    cloner = RepositoryCloner(config)
+    breakers = CircuitBreakerRegistry(
+        config.runtime.breaker_failure_threshold,
+        config.runtime.breaker_reset_seconds,
+    )
+    cloner = RepositoryCloner(config, breakers)
     parser = TreeSitterCodeParser(config)
     graph_store = SqliteGraphStore(config)
     embedder = MiniLmEmbedder(config)
     vector_store = FaissVectorStore(config)
-    external_indexer = ExternalKnowledgeIndexer(config)
+    lexical_store = Bm25Store(config)
+    external_indexer = ExternalKnowledgeIndexer(config, breakers)
     session_manager = RepoSessionManager(config)
     structure_service = RepoStructureService(parser, session_manager)
-    retriever = HybridRetriever(graph_store, vector_store, embedder)
-    llm_engine = ExplanationEngine(config)
+    file_content_service = FileContentService(config)
+    retrieval_cache = RetrievalCache(config)
+    retriever = HybridRetriever(
+        config,
+        graph_store,
+        vector_store,
+        embedder,
+        lexical_store,
+        retrieval_cache,
+    )
+    explanation_cache = ExplanationCache(config)
+    llm_engine = ExplanationEngine(config, explanation_cache, breakers)
+    explain_batch_service = ExplainBatchService(
+        config,
+        retriever,
+        llm_engine,
+        ExplainBatchStore(config),
+    )
+    warmer = ExplanationWarmer(config, graph_store, retriever, llm_engine)
     indexing_service = IndexingService(
         config,
         cloner,
@@ -34,16 +68,47 @@ def get_services() -> dict:
         graph_store,
         embedder,
         vector_store,
+        lexical_store,
         external_indexer,
         session_manager,
+        warmer,
+    )
+    index_job_service = IndexJobService(
+        config,
+        indexing_service,
+        structure_service,
+        session_manager,
+        IndexJobStore(config),
+    )
+    REGISTRY.register_collector(
+        ServiceMetricsCollector(
+            config,
+            session_manager,
+            graph_store,
+            vector_store,
+            lexical_store,
+            retrieval_cache,
+            explanation_cache,
+            file_content_service,
+            llm_engine,
+            breakers,
+        )
     )
     return {
         "config": config,
+        "breakers": breakers,
         "indexing_service": indexing_service,
+        "index_job_service": index_job_service,
         "retriever": retriever,
+        "retrieval_cache": retrieval_cache,
         "llm_engine": llm_engine,
+        "explanation_cache": explanation_cache,
+        "explain_batch_service": explain_batch_service,
+        "explanation_warmer": warmer,
         "graph_store": graph_store,
         "vector_store": vector_store,
+        "lexical_store": lexical_store,
         "session_manager": session_manager,
         "structure_service": structure_service,
+        "file_content_service": file_content_service,
     }
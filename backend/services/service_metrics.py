@@ -0,0 +1,128 @@
+from backend.config.settings import AppConfig
+from backend.graph.sqlite_graph import SqliteGraphStore
+from backend.lexical.bm25_store import Bm25Store
+from backend.llm.explanation_cache import ExplanationCache
+from backend.llm.explanation_engine import ExplanationEngine
+from backend.retriever.retrieval_cache import RetrievalCache
+from backend.services.file_content_service import FileContentService
+from backend.services.repo_session_manager import RepoSessionManager
+from backend.utils.circuit_breaker import CircuitBreakerRegistry
+from backend.utils.metrics import Counter, Gauge
+from backend.vector.faiss_store import FaissVectorStore
+
+CACHE_EVENT_KEYS = ("hits", "disk_hits", "misses", "stale", "expired", "stores", "evictions", "disk_evictions", "bypassed")
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class ServiceMetricsCollector:
+    def __init__(
+        self,
+        config: AppConfig,
+        session_manager: RepoSessionManager,
+        graph_store: SqliteGraphStore,
+        vector_store: FaissVectorStore,
+        lexical_store: Bm25Store,
+        retrieval_cache: RetrievalCache,
+        explanation_cache: ExplanationCache,
+        file_content_service: FileContentService,
+        llm_engine: ExplanationEngine,
+        breakers: CircuitBreakerRegistry,
+    ) -> None:
+        self.config = config
+        self.session_manager = session_manager
+        self.graph_store = graph_store
+        self.vector_store = vector_store
+        self.lexical_store = lexical_store
+        self.retrieval_cache = retrieval_cache
+        self.explanation_cache = explanation_cache
+        self.file_content_service = file_content_service
+        self.llm_engine = llm_engine
+        self.breakers = breakers
+
+    def __call__(self) -> list:
+        return [
+            *self._session_metrics(),
+            *self._cache_metrics(),
+            *self._pool_metrics(),
+            *self._upstream_metrics(),
+            *self._breaker_metrics(),
+        ]
+
+    def _session_metrics(self) -> list:
+        sessions = Gauge("code_explainer_sessions", "Repository sessions by status.", ("status",))
+        for status, total in self.session_manager.count_sessions().items():
+            sessions.set(total, status=status)
+
+        vector_memory = self.vector_store.memory_stats()
+        lexical_memory = self.lexical_store.memory_stats()
+        loaded = Gauge("code_explainer_loaded_sessions", "Sessions with an index loaded in memory.", ("store",))
+        loaded.set(len(vector_memory), store="vector")
+        loaded.set(len(lexical_memory), store="lexical")
+        loaded.set(len(self.graph_store.loaded_pool_stats()), store="graph")
+
+        memory = Gauge(
+            "code_explainer_index_memory_bytes",
+            "Approximate in-memory index size per loaded session.",
+            ("store", "session_id"),
+        )
+        for store, sizes in (("vector", vector_memory), ("lexical", lexical_memory)):
+            for session_id, size in sizes.items():
+                memory.set(size, store=store, session_id=session_id)
+        return [sessions, loaded, memory]
+
+    def _cache_metrics(self) -> list:
+        events = Counter("code_explainer_cache_events_total", "Cache lookups and maintenance events.", ("cache", "event"))
+        entries = Gauge("code_explainer_cache_entries", "Entries currently held per cache.", ("cache",))
+        for cache, stats in (
+            ("retrieval", self.retrieval_cache.stats()),
+            ("explanation", self.explanation_cache.stats()),
+            ("file_line_index", self.file_content_service.stats()),
+        ):
+            for event in CACHE_EVENT_KEYS:
+                if event in stats:
+                    events.inc(stats[event], cache=cache, event=event)
+            entries.set(stats.get("entries", 0), cache=cache)
+        return [events, entries]
+
+    def _pool_metrics(self) -> list:
+        operations = Counter(
+            "code_explainer_sqlite_operations_total",
+            "Connections handed out by SQLite pools.",
+            ("pool", "operation"),
+        )
+        write_wait = Counter(
+            "code_explainer_sqlite_write_wait_seconds_total",
+            "Time spent waiting for the single SQLite writer.",
+            ("pool",),
+        )
+        pools = {"sessions": self.session_manager.get_pool_stats()}
+        pools.update(
+            {f"graph:{session_id}": stats for session_id, stats in self.graph_store.loaded_pool_stats().items()}
+        )
+        for pool, stats in pools.items():
+            operations.inc(stats["reads"], pool=pool, operation="read")
+            operations.inc(stats["writes"], pool=pool, operation="write")
+            write_wait.inc(stats["write_wait_seconds"], pool=pool)
+        return [operations, write_wait]
+
+    def _upstream_metrics(self) -> list:
+        stats = self.llm_engine.get_upstream_stats()
+        events = Counter("code_explainer_llm_upstream_events_total", "LLM upstream calls by outcome.", ("event",))
+        for event in ("upstream_calls", "coalesced", "failures"):
+            events.inc(stats.get(event, 0), event=event)
+        in_flight = Gauge("code_explainer_llm_in_flight", "Distinct LLM prompts currently awaiting the upstream.")
+        in_flight.set(stats.get("in_flight", 0))
+        return [events, in_flight]
+
+    def _breaker_metrics(self) -> list:
+        state = Gauge(
+            "code_explainer_circuit_state",
+            "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open).",
+            ("name",),
+        )
+        events = Counter("code_explainer_circuit_events_total", "Circuit breaker outcomes.", ("name", "event"))
+        for name, snapshot in self.breakers.stats().items():
+            state.set(CIRCUIT_STATE_VALUES.get(snapshot["state"], 0), name=name)
+            for event in ("successes", "failures", "rejected", "opened"):
+                events.inc(snapshot[event], name=name, event=event)
+        return [state, events]
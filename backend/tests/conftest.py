@@ -0,0 +1,11 @@
+import pytest
+
+from backend.config.settings import AppConfig, load_config
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch) -> AppConfig:
+    # Stores resolve their default paths relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MEGALLM_API_KEY", "test")
+    return load_config()
@@ -0,0 +1,45 @@
+from backend.lexical.bm25_store import Bm25Store
+
+
+def _chunk(chunk_id: str, content: str, file_path: str = "/r/a.py") -> dict:
+    return {"id": chunk_id, "content": content, "file_path": file_path, "type": "code", "metadata": {}}
+
+
+def _reindex(store: Bm25Store, rows: list[dict]) -> None:
+    store.delete_files("s", store.file_paths("s"))
+    store.add_documents("s", rows)
+
+
+def test_reindexing_changed_chunks_does_not_grow_postings(config):
+    store = Bm25Store(config)
+    _reindex(store, [_chunk("c1", "alpha beta"), _chunk("c2", "gamma")])
+    for version in range(10):
+        _reindex(store, [_chunk("c1", f"alpha beta v{version}"), _chunk("c2", "gamma")])
+
+    postings = store._get_index("s")["snapshot"]["postings"]
+    assert len(postings["alpha"][0]) <= 2
+    rows = store._get_pool("s").reader().execute("SELECT COUNT(*) AS n FROM bm25_docs").fetchone()
+    assert rows["n"] <= 4
+    assert [hit["id"] for hit in store.search("s", "alpha")] == ["c1"]
+
+
+def test_idf_ignores_tombstoned_documents(config):
+    config.lexical.compact_dead_ratio = 1.0
+    store = Bm25Store(config)
+    store.add_documents("s", [_chunk("c1", "shared rare"), _chunk("c2", "shared", "/r/b.py")])
+    store.add_documents("s", [_chunk(f"x{i}", "shared", f"/r/x{i}.py") for i in range(20)])
+    store.delete_files("s", [f"/r/x{i}.py" for i in range(20)])
+
+    store.add_documents("fresh", [_chunk("c1", "shared rare"), _chunk("c2", "shared", "/r/b.py")])
+    assert store.search("s", "shared rare") == store.search("fresh", "shared rare")
+
+
+def test_compacted_index_reloads_from_disk(config):
+    store = Bm25Store(config)
+    _reindex(store, [_chunk("c1", "alpha"), _chunk("c2", "beta", "/r/b.py")])
+    _reindex(store, [_chunk("c1", "alpha changed")])
+
+    reloaded = Bm25Store(config)
+    assert reloaded.total_documents("s") == 1
+    assert reloaded.search("s", "beta") == []
+    assert [hit["id"] for hit in reloaded.search("s", "alpha")] == ["c1"]
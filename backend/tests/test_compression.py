@@ -0,0 +1,46 @@
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from backend.api.compression import CompressionMiddleware
+from backend.api.conditional import cache_headers, etag_matches, make_etag, not_modified
+
+ETAG = make_etag("test")
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/large")
+    def large(if_none_match: str | None = Header(default=None)):
+        if etag_matches(if_none_match, ETAG):
+            return not_modified(ETAG)
+        return JSONResponse({"value": "x" * 4000}, headers=cache_headers(ETAG))
+
+    @app.get("/small")
+    def small(if_none_match: str | None = Header(default=None)):
+        if etag_matches(if_none_match, ETAG):
+            return not_modified(ETAG)
+        return JSONResponse({"value": 1}, headers=cache_headers(ETAG))
+
+    return TestClient(CompressionMiddleware(app))
+
+
+def test_encoded_body_gets_weak_etag_and_vary():
+    client = _client()
+    encoded = client.get("/large", headers={"accept-encoding": "gzip"})
+    identity = client.get("/large", headers={"accept-encoding": "identity"})
+
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["etag"] == f"W/{ETAG}"
+    assert identity.headers["etag"] == ETAG
+    assert encoded.headers["vary"] == identity.headers["vary"] == "Accept-Encoding"
+
+
+def test_not_modified_keeps_the_etag_form_of_its_200():
+    client = _client()
+    for path in ("/large", "/small"):
+        first = client.get(path, headers={"accept-encoding": "gzip"})
+        revalidated = client.get(path, headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == first.headers["etag"]
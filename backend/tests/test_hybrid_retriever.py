@@ -0,0 +1,79 @@
+import numpy as np
+
+from backend.retriever.hybrid_retriever import HybridRetriever
+from backend.vector.faiss_store import FaissVectorStore
+
+FUNCTIONS = ["alpha", "beta", "gamma"]
+
+
+class _Graph:
+    def resolve_seed_ids(self, session_id: str, function_name: str) -> list[int]:
+        return [FUNCTIONS.index(function_name)]
+
+    def get_function_graph(self, session_id: str, function_name: str, seed_ids=None):
+        return [{"id": function_name, "name": function_name, "file_path": f"/r/{function_name}.py"}], []
+
+    def get_variables_for_scope(self, session_id: str, function_name: str, scope_ids=None) -> list:
+        return []
+
+
+class _Embedder:
+    def embed_text(self, text: str) -> list[float]:
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [np.random.default_rng(FUNCTIONS.index(text)).random(8).tolist() for text in texts]
+
+
+def _vector_store(config) -> FaissVectorStore:
+    store = FaissVectorStore(config)
+    rng = np.random.default_rng(7)
+    store.insert_embeddings(
+        "s",
+        [
+            {
+                "id": f"{name}-{chunk}",
+                "embedding": rng.random(8).tolist(),
+                "content": f"{name} chunk {chunk}",
+                "file_path": f"/r/{name}.py",
+                "type": "code",
+                "metadata": {},
+            }
+            for name in FUNCTIONS
+            for chunk in range(30)
+        ],
+    )
+    return store
+
+
+def test_batched_scoped_search_matches_per_query_search(config):
+    store = _vector_store(config)
+    embeddings = _Embedder().embed_texts(FUNCTIONS)
+    batched = store.search_batch("s", embeddings, file_paths=[[f"/r/{name}.py"] for name in FUNCTIONS])
+    for name, embedding, hits in zip(FUNCTIONS, embeddings, batched, strict=True):
+        expected = store.search("s", embedding, file_paths=[f"/r/{name}.py"])
+        assert [hit["id"] for hit in hits] == [hit["id"] for hit in expected]
+
+
+def test_retrieve_batch_runs_graph_scoped_search_in_one_pass(config):
+    config.retrieval.vector_scope = "graph"
+    store = _vector_store(config)
+    calls = {"search": 0, "search_batch": 0}
+    search, search_batch = store.search, store.search_batch
+
+    def counted_search(*args, **kwargs):
+        calls["search"] += 1
+        return search(*args, **kwargs)
+
+    def counted_search_batch(*args, **kwargs):
+        calls["search_batch"] += 1
+        return search_batch(*args, **kwargs)
+
+    store.search, store.search_batch = counted_search, counted_search_batch
+    retriever = HybridRetriever(config, _Graph(), store, _Embedder())
+    results = list(retriever.retrieve_batch("s", FUNCTIONS))
+
+    assert [error for _, _, error in results] == [None, None, None]
+    for function_name, context, _ in results:
+        assert {hit["file_path"] for hit in context["semantic_hits"]} == {f"/r/{function_name}.py"}
+    assert calls == {"search": 0, "search_batch": 2}
@@ -0,0 +1,51 @@
+import threading
+
+from backend.services.index_job_service import IndexJobService
+from backend.services.index_job_store import IndexJobStore
+
+
+class _GatedIndexing:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def index_repository(self, **kwargs) -> dict:
+        self.release.wait(5)
+        return {"status": "reused"}
+
+
+def test_cancel_racing_completion_keeps_terminal_status(config):
+    job_store = IndexJobStore(config)
+    indexing = _GatedIndexing()
+    service = IndexJobService(config, indexing, None, None, job_store)
+    completed = threading.Event()
+    cancel_done = threading.Event()
+    read_job = job_store.get
+    write_job = job_store.update
+
+    def update(job_id, **kwargs):
+        updated = write_job(job_id, **kwargs)
+        if kwargs.get("status") == "completed":
+            # Hold the worker before it drops the job's cancel event so cancel sees it still registered.
+            completed.set()
+            cancel_done.wait(5)
+        return updated
+
+    def stale_get(job_id):
+        # cancel reads the job while it is still running and acts only after _run finished it.
+        job = read_job(job_id)
+        indexing.release.set()
+        completed.wait(5)
+        return job
+
+    job_store.update = update
+    job = service.submit("s")
+    job_store.get = stale_get
+    try:
+        service.cancel(job["job_id"])
+    finally:
+        job_store.get = read_job
+        cancel_done.set()
+    service._executor.shutdown(wait=True)
+
+    assert job_store.get(job["job_id"])["status"] == "completed"
+    assert job_store.active_for_session("s") is None
@@ -0,0 +1,56 @@
+from backend.graph.sqlite_graph import EDGE_SELECT, SqliteGraphStore
+from backend.parser.tree_sitter_parser import ParsedEdge, ParsedSymbol
+from backend.services.indexing_service import IndexingService
+
+
+def _parsed_a(line_offset: int) -> tuple[list[ParsedSymbol], list[ParsedEdge]]:
+    function_id = f"/r/a.py:run:{2 + line_offset}"
+    nodes = [ParsedSymbol(function_id, "function", "run", "/r/a.py", 2 + line_offset, 4 + line_offset)]
+    edges = [
+        ParsedEdge("module:/r/a.py->import:os:1", "module:/r/a.py", "os", "imports", {"line": 1}),
+        ParsedEdge(
+            f"{function_id}->call:helper:{3 + line_offset}",
+            function_id,
+            "/r/b.py:helper:1",
+            "calls",
+            {"line": 3 + line_offset},
+        ),
+    ]
+    return nodes, edges
+
+
+def _edges(store: SqliteGraphStore, session_id: str) -> set[tuple[str, str, str]]:
+    rows = store._reader(session_id).execute(EDGE_SELECT).fetchall()
+    return {(row["source"], row["target"], row["type"]) for row in rows}
+
+
+def test_resync_of_changed_file_keeps_its_import_edges(config):
+    store = SqliteGraphStore(config)
+    service = IndexingService(config, None, None, store, None, None, None, None, None)
+    helper = ParsedSymbol("/r/b.py:helper:1", "function", "helper", "/r/b.py", 1, 2)
+
+    nodes, edges = _parsed_a(0)
+    service._sync_graph("s", [*nodes, helper], edges, [])
+    assert ("module:/r/a.py", "os", "imports") in _edges(store, "s")
+
+    nodes, edges = _parsed_a(5)
+    service._sync_graph("s", [*nodes, helper], edges, [])
+    assert _edges(store, "s") == {
+        ("module:/r/a.py", "os", "imports"),
+        ("/r/a.py:run:7", "/r/b.py:helper:1", "calls"),
+    }
+
+
+def test_import_only_change_is_detected(config):
+    store = SqliteGraphStore(config)
+    service = IndexingService(config, None, None, store, None, None, None, None, None)
+
+    nodes, edges = _parsed_a(0)
+    service._sync_graph("s", nodes, edges, [])
+    before = store.get_file_digests("s")["/r/a.py"]
+
+    edges[0] = ParsedEdge("module:/r/a.py->import:sys:1", "module:/r/a.py", "sys", "imports", {"line": 1})
+    service._sync_graph("s", nodes, edges, [])
+    assert store.get_file_digests("s")["/r/a.py"] != before
+    assert ("module:/r/a.py", "sys", "imports") in _edges(store, "s")
+    assert ("module:/r/a.py", "os", "imports") not in _edges(store, "s")
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from backend.utils.circuit_breaker import CircuitBreaker
+from backend.utils.retry import retry_call
+
+
+class _BadRequest(Exception):
+    pass
+
+
+def _fail():
+    raise _BadRequest()
+
+
+def _retryable(exc: Exception) -> bool:
+    return not isinstance(exc, _BadRequest)
+
+
+def test_non_retryable_errors_do_not_reset_failures():
+    breaker = CircuitBreaker("upstream", failure_threshold=2, reset_timeout_seconds=60)
+    breaker.record_failure()
+    for _ in range(3):
+        with pytest.raises(_BadRequest):
+            retry_call(_fail, 1, 0, 1, retryable=_retryable, breaker=breaker)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_non_retryable_error_releases_half_open_probe_without_closing():
+    breaker = CircuitBreaker("upstream", failure_threshold=1, reset_timeout_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    with pytest.raises(_BadRequest):
+        retry_call(_fail, 1, 0, 1, retryable=_retryable, breaker=breaker)
+    assert breaker.state == "half_open"
+    assert retry_call(lambda: "ok", 1, 0, 1, breaker=breaker) == "ok"
+    assert breaker.state == "closed"
@@ -0,0 +1,14 @@
+from backend.benchmarks.graph_ingest import build_synthetic_graph
+from backend.graph.sqlite_graph import SqliteGraphStore
+
+
+def test_graph_page_size_is_clamped(config):
+    config.graph.graph_max_page_size = 5
+    store = SqliteGraphStore(config)
+    nodes, edges, variables = build_synthetic_graph(4, 5, 3)
+    store.upsert_graph("s", nodes, edges, variables)
+
+    page = store.get_function_graph_page("s", nodes[0].name, page_size=10_000)
+    assert page["page"]["page_size"] == 5
+    assert len(page["nodes"]) + len(page["edges"]) <= 5
+    assert page["page"]["has_more"]
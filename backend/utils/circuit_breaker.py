@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after_seconds: float) -> None:
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after_seconds:.1f}s.")
+        self.name = name
+        self.retry_after_seconds = retry_after_seconds
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._metrics = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                # One probe call is let through; its outcome closes or re-opens the circuit.
+                self._probe_in_flight = True
+                return
+            self._metrics["rejected"] += 1
+            retry_after = max(0.0, self._opened_at + self.reset_timeout_seconds - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._metrics["successes"] += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._state = "closed"
+
+    def release_probe(self) -> None:
+        # Neutral outcome (cancelled call, non-retryable error): frees the half-open slot without
+        # closing or re-opening the circuit.
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._metrics["failures"] += 1
+            self._consecutive_failures += 1
+            reopen = self._current_state() == "half_open"
+            self._probe_in_flight = False
+            if reopen or self._consecutive_failures >= self.failure_threshold:
+                if self._state != "open" or reopen:
+                    self._metrics["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_after = 0.0
+            if state == "open":
+                retry_after = max(0.0, self._opened_at + self.reset_timeout_seconds - time.monotonic())
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_after_seconds": round(retry_after, 3),
+                **self._metrics,
+            }
+
+    def _current_state(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            return "half_open"
+        return self._state
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout_seconds)
+                self._breakers[name] = breaker
+            return breaker
+
+    def stats(self) -> dict:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -1,25 +1,149 @@
-from collections.abc import Callable
-from time import sleep
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
 from typing import TypeVar
 
+from backend.utils.circuit_breaker import CircuitBreaker
+
 T = TypeVar("T")
 
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+# Matched by class name anywhere in the MRO so openai, httpx and requests errors are
+# classified without importing those packages here.
+RETRYABLE_EXCEPTION_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "TransportError",
+    "Timeout",
+    "ConnectionError",
+    "ChunkedEncodingError",
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds: float | None) -> None:
+        self.expires_at = None if seconds is None or seconds <= 0 else time.monotonic() + seconds
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def clamp(self, timeout: float) -> float:
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_EXCEPTION_NAMES for cls in type(exc).__mro__)
+
+
+def _backoff_delays(initial_backoff_seconds: float, multiplier: float, max_backoff_seconds: float | None):
+    current_backoff = initial_backoff_seconds
+    while True:
+        ceiling = current_backoff if max_backoff_seconds is None else min(current_backoff, max_backoff_seconds)
+        # Full jitter: concurrent callers that failed together do not retry in lockstep.
+        yield random.uniform(0, ceiling)
+        current_backoff *= multiplier
+
+
+def _record(breaker: CircuitBreaker | None, exc: Exception | None, retryable: Callable[[Exception], bool]) -> None:
+    if breaker is None:
+        return
+    if exc is None:
+        breaker.record_success()
+    elif retryable(exc):
+        breaker.record_failure()
+    else:
+        # Non-retryable errors (4xx, bad input) say nothing about upstream health either way.
+        breaker.release_probe()
+
 
 def retry_call(
     fn: Callable[[], T],
     attempts: int,
     initial_backoff_seconds: float,
     multiplier: float,
+    *,
+    retryable: Callable[[Exception], bool] = is_retryable,
+    deadline: Deadline | None = None,
+    max_backoff_seconds: float | None = None,
+    breaker: CircuitBreaker | None = None,
 ) -> T:
-    current_backoff = initial_backoff_seconds
-    latest_exception: Exception | None = None
-    for _ in range(attempts):
+    attempts = max(1, attempts)
+    delays = _backoff_delays(initial_backoff_seconds, multiplier, max_backoff_seconds)
+    for attempt in range(attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = fn()
+        except Exception as exc:  # noqa: BLE001
+            _record(breaker, exc, retryable)
+            if not retryable(exc) or attempt == attempts - 1:
+                raise
+            delay = next(delays)
+            if deadline is not None and deadline.clamp(delay) < delay:
+                raise DeadlineExceeded("Retry deadline exceeded.") from exc
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # Cancellation (IndexJobCancelled, KeyboardInterrupt) must not leave a half-open probe held.
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+        _record(breaker, None, retryable)
+        return result
+    raise RuntimeError("Retry call failed without exception details.")
+
+
+async def aretry_call(
+    fn: Callable[[], Awaitable[T]],
+    attempts: int,
+    initial_backoff_seconds: float,
+    multiplier: float,
+    *,
+    retryable: Callable[[Exception], bool] = is_retryable,
+    deadline: Deadline | None = None,
+    max_backoff_seconds: float | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    attempts = max(1, attempts)
+    delays = _backoff_delays(initial_backoff_seconds, multiplier, max_backoff_seconds)
+    for attempt in range(attempts):
+        if breaker is not None:
+            breaker.before_call()
         try:
-            return fn()
+            result = await fn()
         except Exception as exc:  # noqa: BLE001
-            latest_exception = exc
-            sleep(current_backoff)
-            current_backoff *= multiplier
-    if latest_exception is None:
-        raise RuntimeError("Retry call failed without exception details.")
-    raise latest_exception
+            _record(breaker, exc, retryable)
+            if not retryable(exc) or attempt == attempts - 1:
+                raise
+            delay = next(delays)
+            if deadline is not None and deadline.clamp(delay) < delay:
+                raise DeadlineExceeded("Retry deadline exceeded.") from exc
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # asyncio.CancelledError must not leave a half-open probe held.
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+        _record(breaker, None, retryable)
+        return result
+    raise RuntimeError("Retry call failed without exception details.")
@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SqliteConnectionPool:
+    def __init__(
+        self,
+        db_path: Path,
+        busy_timeout_ms: int,
+        initializer: Callable[[sqlite3.Connection], None] | None = None,
+    ) -> None:
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._readers: list[sqlite3.Connection] = []
+        self._reads = 0
+        self._writes = 0
+        self._write_wait_seconds = 0.0
+        self._max_write_wait_seconds = 0.0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = self._connect(read_only=False)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.execute("PRAGMA synchronous = NORMAL")
+        if initializer is not None:
+            initializer(self._writer)
+
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        timeout = self.busy_timeout_ms / 1000.0
+        if read_only:
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=timeout, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._local.conn = conn
+            with self._state_lock:
+                self._readers.append(conn)
+        with self._state_lock:
+            self._reads += 1
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        started = time.perf_counter()
+        with self._write_lock:
+            waited = time.perf_counter() - started
+            with self._state_lock:
+                self._writes += 1
+                self._write_wait_seconds += waited
+                self._max_write_wait_seconds = max(self._max_write_wait_seconds, waited)
+            yield self._writer
+
+    def stats(self) -> dict:
+        with self._state_lock:
+            return {
+                "reader_connections": len(self._readers),
+                "reads": self._reads,
+                "writes": self._writes,
+                "write_wait_seconds": round(self._write_wait_seconds, 6),
+                "max_write_wait_seconds": round(self._max_write_wait_seconds, 6),
+                "busy_timeout_ms": self.busy_timeout_ms,
+            }
+
+    def close(self) -> None:
+        with self._write_lock:
+            with self._state_lock:
+                readers = list(self._readers)
+                self._readers.clear()
+            for conn in readers:
+                conn.close()
+            self._writer.close()
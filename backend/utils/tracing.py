@@ -0,0 +1,95 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, attributes: dict | None = None, trace_id: str | None = None) -> None:
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.attributes = dict(attributes or {})
+        self.children: list[Span] = []
+        self.thread = threading.current_thread().name
+        self.started = time.perf_counter()
+        self.ended: float | None = None
+        self._lock = threading.Lock()
+
+    def child(self, name: str, attributes: dict | None = None) -> "Span":
+        span = Span(name, attributes, trace_id=self.trace_id)
+        # Children can be opened concurrently from retriever worker threads.
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    def set(self, **attributes: object) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        if self.ended is None:
+            self.ended = time.perf_counter()
+
+    @property
+    def duration_ms(self) -> float:
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        return round((ended - self.started) * 1000, 3)
+
+    def to_dict(self, origin: float | None = None) -> dict:
+        origin = self.started if origin is None else origin
+        with self._lock:
+            children = list(self.children)
+        return {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin) for child in children],
+        }
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, **attributes: object) -> Iterator[Span]:
+    root = Span(name, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.finish()
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: object) -> Iterator[Span | None]:
+    # Untraced requests pay one context-variable lookup and nothing else.
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = parent.child(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.set(error=type(exc).__name__)
+        raise
+    finally:
+        current.finish()
+        _current_span.reset(token)
+
+
+def bind_context(fn: Callable[..., T]) -> Callable[..., T]:
+    # Executor threads do not inherit context variables; this carries the active span across.
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
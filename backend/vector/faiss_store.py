@@ -5,6 +5,8 @@ import faiss  # type: ignore
 import numpy as np
 
 from backend.config.settings import AppConfig
+from backend.utils.metrics import STAGE_SECONDS
+from backend.utils.tracing import span
 
 
 class FaissVectorStore:
@@ -39,8 +41,12 @@ class FaissVectorStore:
             "dimension": None,
             "ids": [],
             "rows_by_id": {},
+            "generation": 0,
+            "positions_by_file": {},
         }
         self._load_existing_index(payload)
+        for position, row_id in enumerate(payload["ids"]):
+            self._track_position(payload, row_id, position)
         self._session_data[session_id] = payload
         return payload
 
@@ -50,9 +56,25 @@ class FaissVectorStore:
             return 0
         return int(data["index"].ntotal)
 
+    def memory_stats(self) -> dict[str, int]:
+        # Flat indexes hold one float32 per dimension per vector.
+        return {
+            session_id: int(data["index"].ntotal) * int(data["index"].d) * 4
+            for session_id, data in list(self._session_data.items())
+            if data["index"] is not None
+        }
+
     def is_empty(self, session_id: str) -> bool:
         return self.total_vectors(session_id) == 0
 
+    def get_generation(self, session_id: str) -> int:
+        return int(self._get_session_data(session_id)["generation"])
+
+    def _track_position(self, data: dict, row_id: str, position: int) -> None:
+        file_path = (data["rows_by_id"].get(row_id) or {}).get("file_path")
+        if file_path:
+            data["positions_by_file"].setdefault(str(file_path), []).append(position)
+
     def _normalize(self, vectors: np.ndarray) -> np.ndarray:
         normalized = vectors.copy()
         faiss.normalize_L2(normalized)
@@ -68,6 +90,7 @@ class FaissVectorStore:
             raw_metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
             data["dimension"] = int(raw_metadata.get("dimension") or 0) or None
             data["ids"] = [str(item) for item in raw_metadata.get("ids", [])]
+            data["generation"] = int(raw_metadata.get("generation") or 0)
             rows = raw_metadata.get("rows_by_id", {})
             if isinstance(rows, dict):
                 data["rows_by_id"] = {str(key): value for key, value in rows.items()}
@@ -94,6 +117,7 @@ class FaissVectorStore:
             "dimension": data["dimension"],
             "ids": data["ids"],
             "rows_by_id": data["rows_by_id"],
+            "generation": data["generation"],
         }
         metadata_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
 
@@ -135,10 +159,20 @@ class FaissVectorStore:
                 "type": row.get("type"),
                 "metadata": row.get("metadata"),
             }
+            self._track_position(data, row_id, len(data["ids"]) - 1)
 
+        data["generation"] += 1
         self._persist(data)
 
-    def search(self, session_id: str, embedding: list[float], filters: dict | None = None) -> list[dict]:
+    @STAGE_SECONDS.time(stage="vector_search")
+    @span("faiss.search")
+    def search(
+        self,
+        session_id: str,
+        embedding: list[float],
+        filters: dict | None = None,
+        file_paths: list[str] | None = None,
+    ) -> list[dict]:
         data = self._get_session_data(session_id)
         if not self.available or not embedding or data["index"] is None:
             return []
@@ -151,13 +185,106 @@ class FaissVectorStore:
             return []
 
         normalized_query = self._normalize(query)
-        limit = min(self.search_limit, data["index"].ntotal)
+        params = None
+        candidate_count = data["index"].ntotal
+        if file_paths is not None:
+            positions = [
+                position
+                for file_path in dict.fromkeys(file_paths)
+                for position in data["positions_by_file"].get(file_path, [])
+            ]
+            selector = faiss.IDSelectorBatch(np.array(positions, dtype=np.int64))
+            params = faiss.SearchParameters(sel=selector)
+            candidate_count = len(positions)
+
+        limit = min(self.search_limit, candidate_count)
         if limit <= 0:
             return []
 
-        scores, indices = data["index"].search(normalized_query, limit)
+        scores, indices = data["index"].search(normalized_query, limit, params=params)
+        return self._collect_hits(data, scores[0], indices[0], filters)
+
+    @STAGE_SECONDS.time(stage="vector_search")
+    @span("faiss.search_batch")
+    def search_batch(
+        self,
+        session_id: str,
+        embeddings: list[list[float]],
+        filters: dict | None = None,
+        file_paths: list[list[str]] | None = None,
+    ) -> list[list[dict]]:
+        data = self._get_session_data(session_id)
+        if not self.available or not embeddings or data["index"] is None:
+            return [[] for _ in embeddings]
+
+        queries = np.array(embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] == 0:
+            return [[] for _ in embeddings]
+
+        if data["dimension"] is not None and queries.shape[1] != data["dimension"]:
+            return [[] for _ in embeddings]
+
+        if file_paths is not None:
+            return self._search_scoped_batch(data, self._normalize(queries), file_paths, filters)
+
+        limit = min(self.search_limit, data["index"].ntotal)
+        if limit <= 0:
+            return [[] for _ in embeddings]
+
+        scores, indices = data["index"].search(self._normalize(queries), limit)
+        return [
+            self._collect_hits(data, row_scores, row_indices, filters)
+            for row_scores, row_indices in zip(scores, indices, strict=True)
+        ]
+
+    def _search_scoped_batch(
+        self,
+        data: dict,
+        queries: np.ndarray,
+        file_paths: list[list[str]],
+        filters: dict | None,
+    ) -> list[list[dict]]:
+        # FAISS applies one IDSelector to every query, so per-query scopes are scored in one pass over
+        # the union of their vectors instead. The flat inner-product index makes this exact.
+        scopes = [
+            np.unique(
+                np.array(
+                    [
+                        position
+                        for file_path in dict.fromkeys(paths)
+                        for position in data["positions_by_file"].get(file_path, [])
+                    ],
+                    dtype=np.int64,
+                )
+            )
+            for paths in file_paths
+        ]
+        union = np.unique(np.concatenate(scopes)) if scopes else np.array([], dtype=np.int64)
+        if not len(union):
+            return [[] for _ in scopes]
+
+        scores = queries @ data["index"].reconstruct_batch(union).T
+        output: list[list[dict]] = []
+        for row, positions in enumerate(scopes):
+            limit = min(self.search_limit, len(positions))
+            if limit <= 0:
+                output.append([])
+                continue
+            row_scores = scores[row, np.searchsorted(union, positions)]
+            top = np.argpartition(-row_scores, limit - 1)[:limit]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            output.append(self._collect_hits(data, row_scores[top], positions[top], filters))
+        return output
+
+    def _collect_hits(
+        self,
+        data: dict,
+        scores: np.ndarray,
+        indices: np.ndarray,
+        filters: dict | None,
+    ) -> list[dict]:
         output: list[dict] = []
-        for score, vector_index in zip(scores[0], indices[0], strict=False):
+        for score, vector_index in zip(scores, indices, strict=False):
             if vector_index < 0 or vector_index >= len(data["ids"]):
                 continue
             row_id = data["ids"][vector_index]
@@ -47,6 +47,63 @@ async function requestJson(path, options = {}) {
   return response.json();
 }
 
+async function requestEventStream(path, body, { onEvent, signal } = {}) {
+  const response = await fetch(`${API_BASE}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    const rawText = await response.text();
+    let message = rawText;
+    try {
+      message = normalizeErrorPayload(JSON.parse(rawText)) || rawText;
+    } catch {
+      message = rawText;
+    }
+    throw new Error(message || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let finalPayload = null;
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventName = 'message';
+      const dataLines = [];
+      frame.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) {
+          eventName = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          dataLines.push(line.slice(5).trim());
+        }
+      });
+      if (dataLines.length === 0) {
+        continue;
+      }
+      const data = JSON.parse(dataLines.join('\n'));
+      if (eventName === 'final') {
+        finalPayload = data;
+      }
+      onEvent?.(eventName, data);
+    }
+    if (done) {
+      break;
+    }
+  }
+  return finalPayload;
+}
+
 export async function indexRepo(repoUrl, branch, { signal } = {}) {
   throw new Error('Deprecated signature. Use indexRepoBySession(sessionId, options).');
 }
@@ -107,15 +164,51 @@ export async function getSessionStructure(sessionId, { signal } = {}) {
   return requestJson(`/session/structure?session_id=${encodeURIComponent(sessionId)}`, { signal });
 }
 
-export async function getSessionFileContent(sessionId, filePath, { signal } = {}) {
+export async function getSessionFileContent(sessionId, filePath, { startLine = null, endLine = null, signal } = {}) {
+  const rangeParams = [
+    startLine !== null ? `&start_line=${startLine}` : '',
+    endLine !== null ? `&end_line=${endLine}` : '',
+  ].join('');
   return requestJson(
-    `/session/file?session_id=${encodeURIComponent(sessionId)}&file_path=${encodeURIComponent(filePath)}`,
+    `/session/file?session_id=${encodeURIComponent(sessionId)}&file_path=${encodeURIComponent(filePath)}${rangeParams}`,
     { signal }
   );
 }
 
-export async function indexRepoBySession(sessionId, { repoUrl = null, branch = null, reindex = false, signal } = {}) {
-  return requestJson('/index_repo', {
+const INDEX_JOB_POLL_MS = 1000;
+const INDEX_JOB_TERMINAL_STATUSES = new Set(['completed', 'failed', 'cancelled', 'interrupted']);
+
+function waitFor(ms, signal) {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(new DOMException('Aborted', 'AbortError'));
+      return;
+    }
+    const timer = setTimeout(resolve, ms);
+    signal?.addEventListener(
+      'abort',
+      () => {
+        clearTimeout(timer);
+        reject(new DOMException('Aborted', 'AbortError'));
+      },
+      { once: true }
+    );
+  });
+}
+
+export async function getIndexJob(jobId, { signal } = {}) {
+  return requestJson(`/jobs/${encodeURIComponent(jobId)}`, { signal });
+}
+
+export async function cancelIndexJob(jobId, { signal } = {}) {
+  return requestJson(`/jobs/${encodeURIComponent(jobId)}/cancel`, { method: 'POST', signal });
+}
+
+export async function indexRepoBySession(
+  sessionId,
+  { repoUrl = null, branch = null, reindex = false, onProgress, signal } = {}
+) {
+  let job = await requestJson('/index_repo', {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({
@@ -126,6 +219,18 @@ export async function indexRepoBySession(sessionId, { repoUrl = null, branch = n
     }),
     signal,
   });
+
+  while (!INDEX_JOB_TERMINAL_STATUSES.has(job.status)) {
+    onProgress?.(job);
+    await waitFor(INDEX_JOB_POLL_MS, signal);
+    job = await getIndexJob(job.job_id, { signal });
+  }
+  onProgress?.(job);
+
+  if (job.status !== 'completed') {
+    throw new Error(job.error || `Indexing job ${job.status}.`);
+  }
+  return job.result;
 }
 
 export async function explainFunction(sessionId, functionName, { signal } = {}) {
@@ -146,17 +251,47 @@ export async function explainSnippet(sessionId, code, language, { signal } = {})
   });
 }
 
-export async function fetchGraph(sessionId, functionName, { forceRefresh = false, signal } = {}) {
+export async function streamExplainFunction(sessionId, functionName, { onEvent, signal } = {}) {
+  const finalPayload = await requestEventStream(
+    '/explain_function/stream',
+    { session_id: sessionId, function_name: functionName },
+    { onEvent, signal }
+  );
+  return finalPayload?.explanation ?? null;
+}
+
+export async function streamExplainSnippet(sessionId, code, language, { onEvent, signal } = {}) {
+  const finalPayload = await requestEventStream(
+    '/explain_snippet/stream',
+    { session_id: sessionId, code, language },
+    { onEvent, signal }
+  );
+  return finalPayload?.explanation ?? null;
+}
+
+export async function fetchGraph(sessionId, functionName, { forceRefresh = false, maxPages = 10, signal } = {}) {
   const cacheKey = `${sessionId}::${functionName.trim().toLowerCase()}`;
 
   if (!forceRefresh && graphCache.has(cacheKey)) {
     return graphCache.get(cacheKey);
   }
 
-  const graphData = await requestJson(
-    `/graph/${encodeURIComponent(functionName)}?session_id=${encodeURIComponent(sessionId)}`,
-    { signal }
-  );
+  const basePath = `/graph/${encodeURIComponent(functionName)}?session_id=${encodeURIComponent(sessionId)}`;
+  const graphData = { nodes: [], edges: [], page: null };
+  let cursor = null;
+
+  for (let pageIndex = 0; pageIndex < maxPages; pageIndex += 1) {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const page = await requestJson(`${basePath}${cursorParam}`, { signal });
+    graphData.nodes.push(...(page.nodes || []));
+    graphData.edges.push(...(page.edges || []));
+    graphData.page = page.page || null;
+    cursor = page.page?.has_more ? page.page.next_cursor : null;
+    if (!cursor) {
+      break;
+    }
+  }
+
   graphCache.set(cacheKey, graphData);
   return graphData;
 }
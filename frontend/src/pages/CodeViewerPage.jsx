@@ -4,10 +4,13 @@ import { useLocation } from 'react-router-dom';
 import { getSessionFileContent } from '../api';
 import { panelEnter } from '../animations/variants';
 import StatusMessage from '../components/StatusMessage';
+import Button from '../controls/Button';
 import useAbortableAction from '../hooks/useAbortableAction';
 import Panel from '../panel/Panel';
 import { useSessionContext } from '../session/SessionContext';
 
+const FILE_PAGE_LINES = 2000;
+
 function CodeViewerPage() {
   const location = useLocation();
   const { activeSession } = useSessionContext();
@@ -16,10 +19,41 @@ function CodeViewerPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [loadedFilePath, setLoadedFilePath] = useState('');
   const [content, setContent] = useState('');
+  const [nextLine, setNextLine] = useState(null);
+  const [totalLines, setTotalLines] = useState(0);
 
   const searchParams = useMemo(() => new URLSearchParams(location.search), [location.search]);
   const sessionId = searchParams.get('session_id') || activeSession?.session_id || '';
   const filePath = searchParams.get('file_path') || '';
+  const firstLine = Math.max(1, Number.parseInt(searchParams.get('line') || '1', 10) || 1);
+
+  async function fetchPage(startLine, signal) {
+    const payload = await getSessionFileContent(sessionId, filePath, {
+      startLine,
+      endLine: startLine + FILE_PAGE_LINES - 1,
+      signal,
+    });
+    setTotalLines(payload?.total_lines || 0);
+    setNextLine(payload?.has_more ? payload.end_line + 1 : null);
+    return payload;
+  }
+
+  async function loadMore() {
+    if (nextLine === null) {
+      return;
+    }
+    setIsLoading(true);
+    try {
+      const payload = await runAbortable((signal) => fetchPage(nextLine, signal));
+      setContent((current) => current + (payload?.content || ''));
+    } catch (err) {
+      if (err.name !== 'AbortError') {
+        setStatus({ type: 'error', text: err.message });
+      }
+    } finally {
+      setIsLoading(false);
+    }
+  }
 
   useEffect(() => {
     async function loadFile() {
@@ -27,13 +61,14 @@ function CodeViewerPage() {
         setStatus({ type: 'info', text: 'Missing file context. Open a file from the sidebar.' });
         setLoadedFilePath('');
         setContent('');
+        setNextLine(null);
         return;
       }
 
       setStatus({ type: 'info', text: 'Loading file content...' });
       setIsLoading(true);
       try {
-        const payload = await runAbortable((signal) => getSessionFileContent(sessionId, filePath, { signal }));
+        const payload = await runAbortable((signal) => fetchPage(firstLine, signal));
         setLoadedFilePath(payload?.file_path || filePath);
         setContent(payload?.content || '');
         setStatus({ type: 'success', text: 'File loaded.' });
@@ -43,6 +78,7 @@ function CodeViewerPage() {
         }
         setLoadedFilePath('');
         setContent('');
+        setNextLine(null);
         setStatus({ type: 'error', text: err.message });
       } finally {
         setIsLoading(false);
@@ -51,7 +87,7 @@ function CodeViewerPage() {
 
     loadFile();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [filePath, sessionId]);
+  }, [filePath, sessionId, firstLine]);
 
   return (
     <motion.section className="page" variants={panelEnter} initial="hidden" animate="visible">
@@ -61,6 +97,11 @@ function CodeViewerPage() {
       <Panel className="result-card code-viewer-panel">
         <h3>{loadedFilePath || 'No file selected'}</h3>
         <pre className="code-viewer-content" aria-busy={isLoading}>{content}</pre>
+        {nextLine !== null ? (
+          <Button type="button" variant="ghost" onClick={loadMore} disabled={isLoading}>
+            Load more (lines {firstLine}-{nextLine - 1} of {totalLines} shown)
+          </Button>
+        ) : null}
       </Panel>
     </motion.section>
   );
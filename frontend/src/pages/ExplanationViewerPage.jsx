@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import { useLocation } from 'react-router-dom';
-import { explainFunction, explainSnippet } from '../api';
+import { streamExplainFunction, streamExplainSnippet } from '../api';
 import { panelEnter } from '../animations/variants';
 import Button from '../controls/Button';
 import StatusMessage from '../components/StatusMessage';
@@ -85,6 +85,12 @@ function ExplanationViewerPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [activeSession?.session_id, location.search]);
 
+  function onExplanationEvent(eventName, data) {
+    if (eventName === 'field') {
+      setExplanation((previous) => ({ ...(previous || {}), [data.name]: data.value }));
+    }
+  }
+
   const explanationSections = [
     { title: 'Summary', value: explanation?.summary },
     { title: 'Execution Flow', value: explanation?.execution_flow },
@@ -111,7 +117,10 @@ function ExplanationViewerPage() {
     setStatus({ type: 'info', text: 'Generating function explanation...' });
     setIsFunctionLoading(true);
     try {
-      const result = await runAbortableFunctionExplain((signal) => explainFunction(activeSession.session_id, targetFunctionName, { signal }));
+      setExplanation(null);
+      const result = await runAbortableFunctionExplain((signal) =>
+        streamExplainFunction(activeSession.session_id, targetFunctionName, { onEvent: onExplanationEvent, signal })
+      );
       setExplanation(result);
       setStatus({ type: 'success', text: `Function explanation generated. ${formatConfidence(result?.confidence_score)}.` });
     } catch (err) {
@@ -133,7 +142,10 @@ function ExplanationViewerPage() {
     setStatus({ type: 'info', text: 'Generating snippet explanation...' });
     setIsSnippetLoading(true);
     try {
-      const result = await runAbortableSnippetExplain((signal) => explainSnippet(activeSession.session_id, snippet, 'python', { signal }));
+      setExplanation(null);
+      const result = await runAbortableSnippetExplain((signal) =>
+        streamExplainSnippet(activeSession.session_id, snippet, 'python', { onEvent: onExplanationEvent, signal })
+      );
       setExplanation(result);
       setStatus({ type: 'success', text: `Snippet explanation generated. ${formatConfidence(result?.confidence_score)}.` });
     } catch (err) {
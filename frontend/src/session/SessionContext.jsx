@@ -37,7 +37,7 @@ export function SessionProvider({ children }) {
     refreshActiveSession();
   }, []);
 
-  async function createOrSwitchAndIndex({ repoUrl, branch, signal }) {
+  async function createOrSwitchAndIndex({ repoUrl, branch, onProgress, signal }) {
     const created = await createSession({ repoUrl, branch, signal });
     const session = created?.session || null;
     if (!session?.session_id) {
@@ -46,7 +46,7 @@ export function SessionProvider({ children }) {
 
     clearGraphCache();
     setActiveSession(session);
-    const indexResult = await indexRepoBySession(session.session_id, { signal });
+    const indexResult = await indexRepoBySession(session.session_id, { onProgress, signal });
     const structurePayload = await getSessionStructure(session.session_id, { signal });
     setRepoStructure(structurePayload?.structure || null);
 